@@ -1,2 +1,16 @@
-import ui
-import presets
\ No newline at end of file
+'''
+mayaChecklist
+
+Review checklists for Maya. Nothing is imported here, so the core package
+(data model and file I/O) can be used without maya, pymel or Qt.
+
+=========================================================
+@command:
+-----------------------
+import mayaChecklist.ui.main
+mayaChecklist.ui.main.main()
+-----------------------
+
+=========================================================
+Maya Tanaka
+'''
@@ -0,0 +1,84 @@
+'''
+Add Items @ benchmarks
+
+Per item cost of adding notes one at a time against ChecklistTab.add_items
+and pasting a block of notes
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_add_items.py
+-----------------------
+
+@notes:
+*   "one by one" calls _add_item per note, every call is a separate insert
+    through the view, row filter, frame index, journal and search index.
+    "add_items" adds every note in one insert, "paste" also parses the
+    pasted text.
+*   Runs the checklist window offscreen against the stand-in maya package
+    in benchmarks/stubs, with journals in a temporary folder.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+SIZES = (100, 1000, 5000)
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    ui = common.setup_ui(temp_dir)
+    if (ui is None):
+        shutil.rmtree(temp_dir, ignore_errors = True)
+        return
+    app, ui_main = ui
+
+    try:
+        window = ui_main.MayaChecklistUI()
+        window.show()
+        app.processEvents()
+
+        state = {}
+
+        def new_tab():
+            if (window.current_tab):
+                window._delete_tab(window.tab_widget.currentIndex(), remember = False)
+            state['tab'] = window._add_tab()
+            app.processEvents()
+
+        print('{:>8} {:>16} {:>16} {:>16}'.format('items', 'one by one us', 'add_items us', 'paste us'))
+        for size in SIZES:
+            items = common.make_item_dicts(size)
+            pairs = [(item['frame'], item['text']) for item in items]
+            pasted = '\n'.join('{} {}'.format(frame, text) for frame, text in pairs)
+
+            def one_by_one():
+                for frame, text in pairs:
+                    state['tab']._add_item(frame = frame, text = text)
+                app.processEvents()
+
+            def bulk():
+                state['tab'].add_items(pairs)
+                app.processEvents()
+
+            def paste():
+                state['tab']._paste_items(pasted)
+                app.processEvents()
+
+            times = [common.best_of(func, setup = new_tab, repeat = 3) for func in (one_by_one, bulk, paste)]
+            print('{:>8} {:>16.1f} {:>16.1f} {:>16.1f}'.format(size, *[each / size * 1e6 for each in times]))
+
+        window.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+'''
+Merge @ benchmarks
+
+Cost of saving a shared checklist someone else changed: the three-way merge
+of base, ours and theirs, and applying the merged items back onto the open
+checklist
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_merge.py
+-----------------------
+
+@notes:
+*   Each side edits, deletes and adds EDITS items at random, some of the
+    edits land on the same items on both sides.
+*   The merge is O(n), the time per item should stay flat as the
+    checklist grows.
+*   "legacy" is the same merge against a theirs written before uids, its
+    items are matched to base by contents.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+common.setup_package()
+
+from mayaChecklist.core.checklist import ChecklistModel, ChecklistRecord, new_uid
+from mayaChecklist.core import merge
+
+SIZES = (1000, 10000, 50000)
+#   Fraction of items each side changes
+EDITS = 0.05
+
+
+def edit(items, rand):
+    '''
+    Returns a copy of items with some edited, deleted and added
+    '''
+    items = [dict(item) for item in items]
+    count = max(1, int(len(items) * EDITS))
+
+    for item in rand.sample(items, count):
+        item['check'] = not item['check']
+    for item in rand.sample(items, count):
+        item['text'] = item['text'] + ' (edited)'
+    for item in rand.sample(items, count):
+        items.remove(item)
+    for i in range(count):
+        row = rand.randrange(len(items) + 1)
+        items.insert(row, {'id' : new_uid(), 'frame' : str(1001 + i), 'frame_end' : None,
+            'text' : 'Added {}'.format(i), 'color' : 'Default', 'check' : False})
+
+    return items
+
+
+def main():
+    rand = random.Random(0)
+
+    print('{:>8} {:>10} {:>10} {:>10} {:>12} {:>10}'.format('items', 'merge ms', 'legacy ms', 'apply ms',
+        'merge us/item', 'conflicts'))
+    for size in SIZES:
+        base = [ChecklistRecord.from_dict(each).to_dict() for each in common.make_item_dicts(size, seed = size)]
+        ours = edit(base, rand)
+        theirs = edit(base, rand)
+        legacy = [dict((key, value) for key, value in item.items() if (key != 'id')) for item in theirs]
+
+        merge_time = common.best_of(lambda : merge.merge_items(base, ours, theirs))
+        legacy_time = common.best_of(lambda : merge.merge_items(base, ours, [dict(item) for item in legacy]))
+        items, conflicts = merge.merge_items(base, ours, theirs)
+
+        def setup():
+            setup.checklist = ChecklistModel([ChecklistRecord.from_dict(each) for each in ours])
+
+        apply_time = common.best_of(lambda : merge.apply_items(setup.checklist, items), setup = setup)
+        if ([record.to_dict() for record in setup.checklist] != [ChecklistRecord.from_dict(each).to_dict() for each in items]):
+            print('Applied checklist does not match the merge')
+            return 1
+
+        print('{:>8} {:>10.2f} {:>10.2f} {:>10.2f} {:>12.2f} {:>10}'.format(size,
+            merge_time * 1000.0, legacy_time * 1000.0, apply_time * 1000.0,
+            merge_time / size * 1e6, len(conflicts)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+'''
+Reload @ benchmarks
+
+Cost of bringing someone else's changes to a checklist file into an open
+tab: the keyed reload against closing the tab and opening the file again
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_reload.py
+-----------------------
+
+@notes:
+*   Every run changes CHANGED of the items in the file, then times
+    ChecklistTab.reload_source, which only touches the rows that differ,
+    and a full load into a new tab.
+*   Runs the checklist window offscreen against the stand-in maya package
+    in benchmarks/stubs, with journals in a temporary folder.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+SIZES = (1000, 10000, 50000)
+#   Fraction of the items changed in the file
+CHANGED = 0.01
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    ui = common.setup_ui(temp_dir)
+    if (ui is None):
+        shutil.rmtree(temp_dir, ignore_errors = True)
+        return
+    app, ui_main = ui
+
+    from mayaChecklist.core import storage
+    from mayaChecklist.core.checklist import ChecklistRecord
+
+    rand = random.Random(0)
+
+    try:
+        window = ui_main.MayaChecklistUI()
+        window.show()
+        app.processEvents()
+
+        def load(path):
+            tab = window._load_checklist(path)
+            while (tab.loader):
+                app.processEvents()
+            return tab
+
+        print('{:>8} {:>12} {:>12}'.format('items', 'reload ms', 'open ms'))
+        for size in SIZES:
+            path = os.path.join(temp_dir, 'reload_{}.json'.format(size))
+            storage.write_checklist(path,
+                [{'checklist_name' : 'Reload', 'save_directory' : path, 'preset' : False}] +
+                [ChecklistRecord.from_dict(each).to_dict() for each in common.make_item_dicts(size, seed = size)])
+            tab = load(path)
+
+            def change_file():
+                data = list(storage.iter_checklist(path))
+                for item in rand.sample(data[1:], max(1, int(size * CHANGED))):
+                    item['check'] = not item['check']
+                storage.write_checklist(path, data)
+
+            reload_time = common.best_of(tab.reload_source, setup = change_file, repeat = 3)
+            open_time = common.best_of(lambda : load(path), repeat = 3)
+
+            print('{:>8} {:>12.2f} {:>12.2f}'.format(size, reload_time * 1000.0, open_time * 1000.0))
+
+            while (window.tab_widget.count()):
+                window._delete_tab(0, remember = False)
+
+        window.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+'''
+Scene @ benchmarks
+
+Cost of storing checklists in the scene fileInfo: encoding, writing and
+reading them back, the size stored against the plain JSON file, and how
+many checklists a scene save rewrites after one of them is edited
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_scene.py
+-----------------------
+
+@notes:
+*   Runs against the stand-in maya.cmds in benchmarks/stubs, its fileInfo
+    is a dict so the times are the encoding and decoding alone.
+*   "dirty writes" stores TABS checklists in the scene, edits one and saves
+    the scene. Only the edited checklist should be written.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+common.setup_maya_stubs()
+common.setup_package()
+
+from mayaChecklist.core import scene
+
+SIZES = (1000, 10000, 50000)
+TABS = 20
+TAB_SIZE = 1000
+
+
+def bench_store():
+    store = scene.SceneChecklists()
+
+    print('{:>8} {:>10} {:>10} {:>10} {:>10}'.format('items', 'write ms', 'read ms', 'JSON KB', 'scene KB'))
+    for size in SIZES:
+        data = [{'checklist_name' : 'Bench {}'.format(size), 'save_directory' : '', 'preset' : False}]
+        data.extend(common.make_item_dicts(size, seed = size))
+        key = store.new_key()
+
+        write_time = common.best_of(lambda : store.write(key, data))
+        read_time = common.best_of(lambda : store.read(key))
+        stored = len(store.cmds.fileInfo(key, query = True)[0])
+
+        print('{:>8} {:>10.2f} {:>10.2f} {:>10.1f} {:>10.1f}'.format(size,
+            write_time * 1000.0, read_time * 1000.0, len(json.dumps(data)) / 1024.0, stored / 1024.0))
+
+
+def bench_dirty_writes():
+    temp_dir = tempfile.mkdtemp()
+    ui = common.setup_ui(temp_dir)
+    if (ui is None):
+        shutil.rmtree(temp_dir, ignore_errors = True)
+        return
+    app, ui_main = ui
+
+    import maya.cmds as mc
+
+    try:
+        window = ui_main.MayaChecklistUI()
+        window.show()
+        app.processEvents()
+
+        tabs = []
+        for i in range(TABS):
+            tab = window._add_tab('Scene {}'.format(i))
+            tab.add_items([(item['frame'], item['text']) for item in common.make_item_dicts(TAB_SIZE, seed = i)])
+            window._store_in_scene(True)
+            tabs.append(tab)
+
+        writes = []
+        original = ui_main.SCENE_CHECKLISTS.write
+        ui_main.SCENE_CHECKLISTS.write = lambda key, data : (writes.append(key), original(key, data))[1]
+
+        tabs[TABS // 2]._add_item(frame = '1001', text = 'Edited')
+        save_time = common.best_of(mc.save_scene, repeat = 1)
+
+        ui_main.SCENE_CHECKLISTS.write = original
+        print('dirty writes: {} of {} checklists written on save in {:.2f} ms'.format(len(writes),
+            TABS, save_time * 1000.0))
+
+        window.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+
+def main():
+    bench_store()
+    bench_dirty_writes()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+'''
+Search @ benchmarks
+
+Query times of the trigram search index over 100k notes, and how long the
+folder index takes to build, save and load
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_search.py
+-----------------------
+
+@notes:
+*   Notes are random sentences from a small animation review vocabulary,
+    so common words match thousands of notes.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+common.setup_package()
+
+from mayaChecklist.core import storage
+from mayaChecklist.core.search import TrigramIndex, FolderSearchIndex
+
+NOTE_COUNT = 100000
+
+FOLDER_FILES = 100
+FOLDER_NOTES = 1000
+
+WORDS = ('left', 'right', 'elbow', 'knee', 'wrist', 'ankle', 'shoulder', 'hip', 'spine', 'neck',
+    'head', 'jaw', 'brow', 'lid', 'finger', 'thumb', 'toe', 'heel', 'pop', 'pops', 'snap', 'slide',
+    'jitter', 'hitch', 'drift', 'penetration', 'arc', 'spacing', 'timing', 'contact', 'weight',
+    'overlap', 'settle', 'hold', 'ease', 'in', 'out', 'on', 'at', 'the', 'too', 'fast', 'slow',
+    'stiff', 'floaty', 'breaks', 'needs', 'more', 'less', 'fix', 'check', 'cleanup', 'gimbal')
+
+QUERIES = ('left elbow pop', 'gimbal', 'penetration heel', 'floaty', 'the', 'spacing on',
+    'nothing matches this', 'jaw snap')
+
+
+def make_note(rand):
+    return ' '.join(rand.choice(WORDS) for i in range(rand.randint(3, 9))).capitalize()
+
+
+def time_queries(index, repeat = 20):
+    print('{:>24} {:>8} {:>10}'.format('query', 'matches', 'best us'))
+    for query in QUERIES:
+        matches = len(index.search(query))
+        best = common.best_of(lambda : index.search(query, limit = 200), repeat = repeat)
+        print('{:>24} {:>8} {:>10.1f}'.format(query, matches, best * 1e6))
+
+
+def main():
+    rand = random.Random(0)
+
+    index = TrigramIndex()
+    notes = [make_note(rand) for i in range(NOTE_COUNT)]
+    build = common.best_of(lambda : [index.add(i, note) for i, note in enumerate(notes)], repeat = 1)
+    print('Indexed {} notes in {:.0f} ms'.format(NOTE_COUNT, build * 1000.0))
+    print('Search with a limit of 200 results:')
+    time_queries(index)
+
+    #   Incremental updates
+    edit = common.best_of(lambda : index.add(5, make_note(rand)), repeat = 100)
+    print('Re-index one note: {:.1f} us'.format(edit * 1e6))
+
+    temp_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(tempfile.gettempdir(), 'bench_search_index.json')
+    try:
+        for i in range(FOLDER_FILES):
+            items = common.make_item_dicts(FOLDER_NOTES, seed = i)
+            for item in items:
+                item['text'] = make_note(rand)
+            storage.write_checklist(os.path.join(temp_dir, 'shot{:03d}.json'.format(i)),
+                [{'checklist_name' : 'shot{:03d}'.format(i), 'save_directory' : '', 'preset' : False}] + items)
+
+        folder_index = FolderSearchIndex(cache_path)
+        folder_index.add_directory(temp_dir)
+        build = common.best_of(folder_index.refresh, repeat = 1)
+        print('Indexed {} files in {:.0f} ms, cache is {:.1f} MB'.format(FOLDER_FILES,
+            build * 1000.0, os.path.getsize(cache_path) / 1048576.0))
+
+        unchanged = common.best_of(folder_index.refresh, repeat = 3)
+        print('Refresh with nothing changed: {:.0f} ms'.format(unchanged * 1000.0))
+
+        def load():
+            FolderSearchIndex(cache_path).load()
+        print('Load cache: {:.0f} ms'.format(common.best_of(load, repeat = 3) * 1000.0))
+
+        #   The trigrams of a loaded cache are worked out on the first search
+        def load_and_search():
+            FolderSearchIndex(cache_path).search(QUERIES[0])
+        print('Load cache and search: {:.0f} ms'.format(common.best_of(load_and_search, repeat = 3) * 1000.0))
+    finally:
+        shutil.rmtree(temp_dir)
+        if (os.path.exists(cache_path)):
+            os.remove(cache_path)
+
+
+if __name__ == '__main__':
+    main()
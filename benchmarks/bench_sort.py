@@ -0,0 +1,165 @@
+'''
+Sort @ benchmarks
+
+Compares View > Sort before and after in-place reordering, and adding
+and editing items of a sorted checklist with ChecklistSort against sorting
+everything again
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_sort.py
+-----------------------
+
+@notes:
+*   "rebuild" is the old behaviour: clear the tab and add every item again.
+    "in place" reorders the existing records with ChecklistModel.sort.
+*   "sticky" sorts by frame, color and checkstate. "resort" adds or edits
+    one item at a time and sorts the whole checklist after each, "bisect"
+    inserts each new item at its sorted row and moves each edited item to
+    its sorted row with ChecklistSort.
+*   When a Qt binding and Qt.py are available the checklist is attached to
+    an offscreen QListView so the view's cost is included.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+common.setup_package()
+
+from mayaChecklist.core.checklist import ChecklistModel, ChecklistRecord
+from mayaChecklist.core.sorting import ChecklistSort
+
+SIZES = (1000, 10000)
+
+#   Items added and edited one at a time in the sticky benchmark
+STICKY_EDITS = 100
+STICKY_KEYS = ('frame', 'color', 'checkstate')
+
+SORT_KEYS = (
+    ('frame', lambda item : item.frame),
+    ('checkstate', lambda item : item.check),
+    ('color', lambda item : item.color)
+    )
+
+
+def attach_view(checklist):
+    '''
+    Shows the checklist in an offscreen list view, returns None without Qt
+    '''
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from Qt import QtWidgets
+        import mayaChecklist.ui.views as views
+    except ImportError:
+        return None
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    view = QtWidgets.QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(views.ChecklistListModel(checklist, view))
+    view.setItemDelegate(views.ChecklistItemDelegate(view))
+    view.resize(320, 500)
+    view.show()
+    app.processEvents()
+
+    return view
+
+
+def rebuild(checklist, key):
+    '''
+    Old _refresh_checklist: clear the tab, then add every item one by one
+    '''
+    items = sorted(checklist.items, key = key)
+    checklist.clear()
+
+    for item in items:
+        checklist.append(ChecklistRecord(frame = item.frame,
+            text = item.text,
+            color = item.color,
+            check = item.check))
+
+
+def in_place(checklist, key):
+    checklist.sort(key = key)
+
+
+def main():
+    print('{:>8} {:>12} {:>14} {:>14} {:>9}'.format('items', 'sort', 'rebuild ms', 'in place ms', 'speedup'))
+
+    for size in SIZES:
+        records = [ChecklistRecord.from_dict(each) for each in common.make_item_dicts(size)]
+        checklist = ChecklistModel(records)
+        view = attach_view(checklist)
+        rand = random.Random(size)
+
+        def shuffle():
+            items = list(checklist.items)
+            rand.shuffle(items)
+            checklist.reset(items)
+
+        for name, key in SORT_KEYS:
+            before = common.best_of(lambda : rebuild(checklist, key), setup = shuffle)
+            after = common.best_of(lambda : in_place(checklist, key), setup = shuffle)
+
+            print('{:>8} {:>12} {:>14.2f} {:>14.2f} {:>8.1f}x'.format(
+                size, name, before * 1000.0, after * 1000.0, before / max(after, 1e-9)))
+
+    print('')
+    sticky()
+
+    if (view is None):
+        print('(Qt not available, model only)')
+
+
+def sticky():
+    print('{:>8} {:>12} {:>14} {:>14} {:>9}'.format('items', 'sticky', 'resort ms', 'bisect ms', 'speedup'))
+
+    for size in SIZES:
+        records = [ChecklistRecord.from_dict(each) for each in common.make_item_dicts(size)]
+        checklist = ChecklistModel(records)
+        #   Kept so the view isn't deleted while it is in use
+        view = attach_view(checklist)
+        checklist_sort = ChecklistSort(checklist, STICKY_KEYS)
+        rand = random.Random(size)
+
+        def new_records():
+            return [ChecklistRecord(frame = str(rand.randrange(1001, 1200)), text = 'New') for i in range(STICKY_EDITS)]
+
+        def resort_add():
+            for record in new_records():
+                checklist.append(record)
+                checklist.sort(key = checklist_sort.key)
+
+        def bisect_add():
+            for record in new_records():
+                checklist_sort.add([record])
+
+        def resort_edit():
+            for i in range(STICKY_EDITS):
+                checklist.update(rand.randrange(len(checklist)), frame = str(rand.randrange(1001, 1200)))
+                checklist.sort(key = checklist_sort.key)
+            checklist_sort.changed = []
+
+        def bisect_edit():
+            for i in range(STICKY_EDITS):
+                checklist.update(rand.randrange(len(checklist)), frame = str(rand.randrange(1001, 1200)))
+                checklist_sort.place()
+
+        for name, before_func, after_func in (('add', resort_add, bisect_add), ('edit', resort_edit, bisect_edit)):
+            before = common.best_of(before_func, repeat = 3)
+            after = common.best_of(after_func, repeat = 3)
+
+            print('{:>8} {:>12} {:>14.2f} {:>14.2f} {:>8.1f}x'.format(
+                size, '{} {}'.format(name, STICKY_EDITS), before * 1000.0, after * 1000.0, before / max(after, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+'''
+Startup @ benchmarks
+
+Cold import times and time to first paint of the checklist window, checked
+against a budget so slow imports get caught
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_startup.py
+-----------------------
+
+@notes:
+*   Every measurement runs in a new Python process, so nothing is already
+    imported. The best of REPEAT runs is reported.
+*   maya is the stand-in package from benchmarks/stubs. The ui steps are
+    skipped when no Qt binding and Qt.py are available.
+*   Exits with 1 when a step goes over its budget.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import json
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+REPEAT = 5
+
+#   Seconds
+BUDGETS = (
+    ('package', 0.05),
+    ('core', 0.25),
+    ('ui', 1.0),
+    ('first_paint', 1.5)
+    )
+
+CORE_MODULES = ('checklist', 'storage', 'journal', 'registry', 'binary', 'frames', 'report')
+
+#   Modules that must not be imported until a window is built
+LAZY_MODULES = ('maya', 'maya.cmds', 'pymel', 'pymel.core')
+
+
+def measure(step):
+    '''
+    Runs in the child process, returns the seconds taken by step or None
+    '''
+    common.setup_maya_stubs()
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    if (step != 'package'):
+        common.setup_package()
+
+    start = common.timeit.default_timer()
+
+    if (step == 'package'):
+        common.setup_package()
+        import mayaChecklist
+
+    elif (step == 'core'):
+        for name in CORE_MODULES:
+            __import__('mayaChecklist.core.' + name)
+
+    elif (step == 'ui'):
+        try:
+            import mayaChecklist.ui.main
+        except ImportError:
+            return None
+        elapsed = common.timeit.default_timer() - start
+
+        eager = [name for name in LAZY_MODULES if (name in sys.modules)]
+        if (eager):
+            raise RuntimeError('Imported before the window was built: {}'.format(', '.join(eager)))
+        return elapsed
+
+    elif (step == 'first_paint'):
+        try:
+            from Qt import QtWidgets, QtCore
+            import mayaChecklist.ui.main as main
+        except ImportError:
+            return None
+
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        painted = []
+
+        class PaintFilter(QtCore.QObject):
+            def eventFilter(self, obj, event):
+                if ((not painted) and (event.type() == QtCore.QEvent.Paint) and
+                        (isinstance(obj, QtWidgets.QWidget)) and
+                        (obj.window().objectName() == main.MayaChecklistUI.OBJECTNAME)):
+                    painted.append(common.timeit.default_timer())
+                return False
+
+        paint_filter = PaintFilter()
+        app.installEventFilter(paint_filter)
+
+        #   Imports are not part of this step
+        start = common.timeit.default_timer()
+        main.main()
+        while (not painted):
+            app.processEvents()
+            if (common.timeit.default_timer() - start > 30):
+                return None
+
+        return painted[0] - start
+
+    return common.timeit.default_timer() - start
+
+
+def run_step(step):
+    '''
+    Measures step in new processes, returns the fastest run or None
+    '''
+    best = None
+    for i in range(REPEAT):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', step])
+        elapsed = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        if (elapsed is None):
+            return None
+        if ((best is None) or (elapsed < best)):
+            best = elapsed
+    return best
+
+
+def main():
+    print('{:>12} {:>10} {:>10}'.format('step', 'ms', 'budget ms'))
+
+    over = []
+    for step, budget in BUDGETS:
+        elapsed = run_step(step)
+        if (elapsed is None):
+            print('{:>12} {:>10} {:>10.0f}  (Qt not available)'.format(step, '-', budget * 1000.0))
+            continue
+
+        status = ''
+        if (elapsed > budget):
+            status = '  OVER BUDGET'
+            over.append(step)
+        print('{:>12} {:>10.1f} {:>10.0f}{}'.format(step, elapsed * 1000.0, budget * 1000.0, status))
+
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    if (sys.argv[1:2] == ['--child']):
+        print(json.dumps(measure(sys.argv[2])))
+    else:
+        sys.exit(main())
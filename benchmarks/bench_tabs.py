@@ -0,0 +1,144 @@
+'''
+Tabs @ benchmarks
+
+Stress test of the tab registry: opens, moves, switches and closes thousands
+of tabs in random order and checks after every step that the window still
+knows which tab is which
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_tabs.py
+-----------------------
+
+@notes:
+*   Runs the checklist window offscreen against the stand-in maya package
+    in benchmarks/stubs, with journals and the session file in a temporary
+    folder.
+*   Exits with 1 as soon as the registry and the tab widget disagree.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+STEPS = 5000
+#   Open tabs the random walk hovers around
+TARGET_TABS = 200
+
+
+def check(window, expected):
+    '''
+    Returns what is wrong with the tabs of window, None if nothing is
+    '''
+    widgets = window._tabs()
+    if (widgets != expected):
+        return 'tab order differs from the expected order'
+    if (len(window.tabs) != len(widgets)):
+        return 'registry has {} tabs, the tab widget {}'.format(len(window.tabs), len(widgets))
+    for tab in widgets:
+        if (tab not in window.tabs):
+            return 'tab {} is not registered'.format(tab.tab_name)
+        if (window.tabs.get(tab.tab_id) is not tab):
+            return 'tab id {} points at another tab'.format(tab.tab_id)
+    if (window.current_tab is not window.tab_widget.currentWidget()):
+        return 'current tab is not the shown tab'
+    if ((window.current_tab) and (not window.current_tab.materialized)):
+        return 'current tab is not built'
+    return None
+
+
+def run(window, app, rand):
+    tab_bar = window.tab_widget.tabBar()
+    expected = window._tabs()
+    counts = {'open' : 0, 'move' : 0, 'switch' : 0, 'close' : 0, 'edit' : 0}
+    serial = 0
+
+    for step in range(STEPS):
+        count = len(expected)
+        roll = rand.random()
+        open_chance = 0.5 if (count < TARGET_TABS) else 0.2
+
+        if ((not count) or (roll < open_chance)):
+            serial += 1
+            tab = window._add_tab('Tab {}'.format(serial), select = rand.random() < 0.5)
+            expected.append(tab)
+            counts['open'] += 1
+
+        elif (roll < open_chance + 0.2):
+            source = rand.randrange(count)
+            target = rand.randrange(count)
+            tab_bar.moveTab(source, target)
+            expected.insert(target, expected.pop(source))
+            counts['move'] += 1
+
+        elif (roll < open_chance + 0.35):
+            window.tab_widget.setCurrentIndex(rand.randrange(count))
+            counts['switch'] += 1
+
+        elif (roll < open_chance + 0.45):
+            #   Edits go to whatever tab is current
+            window.current_tab._add_item(frame = str(1001 + step), text = 'Note {}'.format(step))
+            counts['edit'] += 1
+
+        else:
+            index = rand.randrange(count)
+            window._delete_tab(index, remember = False)
+            expected.pop(index)
+            counts['close'] += 1
+
+        if (step % 100 == 0):
+            app.processEvents()
+
+        problem = check(window, expected)
+        if (problem):
+            print('Step {}: {}'.format(step, problem))
+            return counts, False
+
+    while (expected):
+        window._delete_tab(0, remember = False)
+        expected.pop(0)
+        counts['close'] += 1
+
+    app.processEvents()
+    problem = check(window, expected)
+    if (problem):
+        print('Closing every tab: {}'.format(problem))
+        return counts, False
+
+    return counts, True
+
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    ui = common.setup_ui(temp_dir)
+    if (ui is None):
+        shutil.rmtree(temp_dir, ignore_errors = True)
+        return 0
+    app, ui_main = ui
+
+    try:
+        window = ui_main.MayaChecklistUI()
+        start = common.timeit.default_timer()
+        counts, passed = run(window, app, random.Random(0))
+        elapsed = common.timeit.default_timer() - start
+        window.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+    print('{} steps in {:.2f} s: {}'.format(STEPS, elapsed,
+        ', '.join('{} {}'.format(counts[key], key) for key in sorted(counts))))
+    print('Registry consistent' if passed else 'Registry inconsistent')
+
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+'''
+Undo @ benchmarks
+
+Cost of undoing and redoing bulk edits of a 10k item checklist against the
+edit itself, and the history each edit keeps
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/bench_undo.py
+-----------------------
+
+@notes:
+*   "toggle storm" checks every item one call at a time, the toggles are
+    coalesced into a single command.
+*   When a Qt binding and Qt.py are available the checklist is attached to
+    an offscreen QListView so the view's cost is included.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+common.setup_package()
+
+from mayaChecklist.core.checklist import ChecklistModel, ChecklistRecord
+from mayaChecklist.core.undo import UndoStack
+
+from bench_sort import attach_view
+
+SIZE = 10000
+
+
+def main():
+    rand = random.Random(0)
+    items = common.make_item_dicts(SIZE)
+
+    checklist = ChecklistModel([ChecklistRecord.from_dict(each) for each in items])
+    view = attach_view(checklist)
+    undo_stack = UndoStack(checklist)
+
+    def toggle_storm():
+        for row in range(len(checklist)):
+            checklist.update(row, check = not checklist[row].check)
+
+    edits = (
+        ('add {}'.format(SIZE), lambda : checklist.extend([ChecklistRecord.from_dict(each) for each in items])),
+        ('delete {}'.format(SIZE), lambda : checklist.remove(0, SIZE - 1)),
+        ('sort', lambda : checklist.sort(key = lambda item : rand.random())),
+        ('toggle storm', toggle_storm),
+        ('clear', checklist.clear)
+        )
+
+    print('{:>14} {:>10} {:>10} {:>10} {:>12}'.format('edit', 'edit ms', 'undo ms', 'redo ms', 'history KB'))
+    for name, edit in edits:
+        undo_stack.clear()
+
+        edit_time = common.best_of(edit, repeat = 1)
+        history = undo_stack.size
+        undo_time = common.best_of(undo_stack.undo, repeat = 1)
+        redo_time = common.best_of(undo_stack.redo, repeat = 1)
+
+        print('{:>14} {:>10.2f} {:>10.2f} {:>10.2f} {:>12.1f}'.format(name,
+            edit_time * 1000.0, undo_time * 1000.0, redo_time * 1000.0, history / 1024.0))
+
+        #   Every edit starts from the full checklist
+        if (len(checklist) != SIZE):
+            checklist.reset([ChecklistRecord.from_dict(each) for each in items])
+
+    if (view is None):
+        print('(Qt not available, model only)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+'''
+Common @ benchmarks
+
+Shared helpers for the benchmark scripts
+
+=========================================================
+@notes:
+*   The repository folder is normally called mayaChecklist, the same way
+    it is installed in the Maya scripts folder. Other checkouts are
+    imported from their path.
+*   Benchmarks that build the ui run outside Maya against the stand-in
+    maya package in benchmarks/stubs, on the offscreen Qt platform, with
+    journals, the session file and studio presets in a temporary folder.
+*   Peak memory comes from tracemalloc, so it only counts Python
+    allocations, not what Qt allocates. It is None on Python 2.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import random
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stubs')
+
+COLORS = ('Default', '#733230', '#002D40', '#2C594F', '#998A2F')
+
+
+def setup_package():
+    '''
+    Makes mayaChecklist importable from the benchmark scripts
+    '''
+    if ('mayaChecklist' in sys.modules):
+        return
+
+    parent_dir, name = os.path.split(PACKAGE_DIR)
+    if (name == 'mayaChecklist'):
+        if (parent_dir not in sys.path):
+            sys.path.insert(0, parent_dir)
+        return
+
+    #   Checked out under another folder name, import the package from its path
+    try:
+        import importlib.util
+    except ImportError:
+        import imp
+        imp.load_package('mayaChecklist', PACKAGE_DIR)
+        return
+
+    spec = importlib.util.spec_from_file_location('mayaChecklist',
+        os.path.join(PACKAGE_DIR, '__init__.py'),
+        submodule_search_locations = [PACKAGE_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['mayaChecklist'] = package
+    spec.loader.exec_module(package)
+
+
+def setup_maya_stubs():
+    '''
+    Puts the stand-in maya package from benchmarks/stubs on sys.path
+    '''
+    if (STUB_DIR not in sys.path):
+        sys.path.insert(0, STUB_DIR)
+
+
+def setup_ui(temp_dir):
+    '''
+    Sets up the checklist ui to run offscreen with its files in temp_dir
+
+    Returns (QApplication, mayaChecklist.ui.main), or None without a Qt
+    binding. Must run before the ui is imported.
+    '''
+    os.environ['MAYACHECKLIST_JOURNAL_DIR'] = os.path.join(temp_dir, 'journals')
+    os.environ['MAYACHECKLIST_SESSION'] = os.path.join(temp_dir, 'session.json')
+    os.environ['MAYACHECKLIST_SEARCH_INDEX'] = os.path.join(temp_dir, 'search_index.json')
+    os.environ['MAYACHECKLIST_PRESET_PATH'] = os.path.join(temp_dir, 'presets')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    setup_maya_stubs()
+    setup_package()
+
+    try:
+        from Qt import QtWidgets
+        import mayaChecklist.ui.main as ui_main
+    except ImportError as error:
+        print('Skipped, no Qt binding: {}'.format(error))
+        return None
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    return app, ui_main
+
+
+def make_item_dicts(count, seed = 0):
+    '''
+    Returns count checklist items in the checklist file format
+    '''
+    rand = random.Random(seed)
+
+    items = []
+    for i in range(count):
+        items.append({'frame' : str(rand.randint(1001, 1240)),
+            'text' : 'Review note {} on {}'.format(i, rand.choice(('arm', 'leg', 'spine', 'head'))),
+            'color' : rand.choice(COLORS),
+            'check' : rand.random() < 0.3})
+
+    return items
+
+
+def best_of(func, setup = None, repeat = 5):
+    '''
+    Runs func repeat times and returns the fastest run in seconds
+    '''
+    best = None
+    for i in range(repeat):
+        if (setup):
+            setup()
+
+        start = timeit.default_timer()
+        func()
+        elapsed = timeit.default_timer() - start
+
+        if ((best is None) or (elapsed < best)):
+            best = elapsed
+
+    return best
+
+
+def peak_memory(func, setup = None):
+    '''
+    Runs func once and returns the peak bytes it allocated, None without tracemalloc
+    '''
+    if (tracemalloc is None):
+        return None
+
+    if (setup):
+        setup()
+
+    tracemalloc.start()
+    try:
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
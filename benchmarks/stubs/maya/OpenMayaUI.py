@@ -0,0 +1,19 @@
+'''
+OpenMayaUI @ benchmarks/stubs/maya
+
+Stand-in for maya.OpenMayaUI, there is no Maya main window to parent to
+
+=========================================================
+Maya Tanaka
+'''
+
+
+class MQtUtil(object):
+
+    @staticmethod
+    def mainWindow():
+        return None
+
+
+def MQtUtil_mainWindow():
+    return None
@@ -0,0 +1,9 @@
+'''
+maya @ benchmarks/stubs
+
+Stand-in for the maya package so the ui can be built outside Maya.
+Only the calls the checklist makes are implemented.
+
+=========================================================
+Maya Tanaka
+'''
@@ -0,0 +1,37 @@
+'''
+OpenMaya @ benchmarks/stubs/maya/api
+
+Stand-in for maya.api.OpenMaya, only scene message callbacks. cmds.save_scene
+runs the kBeforeSave callbacks.
+
+=========================================================
+Maya Tanaka
+'''
+
+#   Callback id: (message, function, client data)
+CALLBACKS = {}
+
+
+class MMessage(object):
+
+    @staticmethod
+    def removeCallback(callback_id):
+        CALLBACKS.pop(callback_id, None)
+
+
+class MSceneMessage(MMessage):
+
+    kBeforeSave = 5
+    kAfterOpen = 7
+
+    @staticmethod
+    def addCallback(message, function, client_data = None):
+        callback_id = max(CALLBACKS or [0]) + 1
+        CALLBACKS[callback_id] = (message, function, client_data)
+        return callback_id
+
+    @staticmethod
+    def run(message):
+        for each_message, function, client_data in list(CALLBACKS.values()):
+            if (each_message == message):
+                function(client_data)
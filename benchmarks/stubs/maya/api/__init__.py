@@ -0,0 +1,8 @@
+'''
+api @ benchmarks/stubs/maya
+
+Stand-in for the maya.api package
+
+=========================================================
+Maya Tanaka
+'''
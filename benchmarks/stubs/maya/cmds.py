@@ -0,0 +1,132 @@
+'''
+cmds @ benchmarks/stubs/maya
+
+Stand-in for maya.cmds with a fake timeline and a scene that only has
+fileInfo
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import collections
+
+STATE = {'time' : 1001.0,
+    'min_time' : 1001.0,
+    'max_time' : 1100.0,
+    'playing' : False,
+    'workspace' : os.getcwd(),
+    'scene_name' : '',
+    'modified' : False}
+
+#   fileInfo of the scene, in the order the keys were added
+FILE_INFO = collections.OrderedDict()
+
+SCRIPT_JOBS = {}
+
+
+def window(name, exists = False, **kwargs):
+    return False
+
+
+def deleteUI(*names, **kwargs):
+    pass
+
+
+def scriptJob(event = None, kill = None, force = False, **kwargs):
+    if (kill is not None):
+        SCRIPT_JOBS.pop(kill, None)
+        return None
+
+    job = len(SCRIPT_JOBS) + 1
+    SCRIPT_JOBS[job] = event
+    return job
+
+
+def play(query = False, state = None, **kwargs):
+    if (query):
+        return STATE['playing']
+    STATE['playing'] = bool(state)
+
+
+def currentTime(time = None, query = False, **kwargs):
+    if (query):
+        return STATE['time']
+    STATE['time'] = float(time)
+    return STATE['time']
+
+
+def playbackOptions(query = False, minTime = None, maxTime = None, **kwargs):
+    if (query):
+        return STATE['min_time'] if minTime else STATE['max_time']
+    if (minTime is not None):
+        STATE['min_time'] = float(minTime)
+    if (maxTime is not None):
+        STATE['max_time'] = float(maxTime)
+
+
+def workspace(query = False, dir = False, **kwargs):
+    return STATE['workspace']
+
+
+def warning(message):
+    sys.stderr.write('Warning: {}\n'.format(message))
+
+
+def fileInfo(*args, **kwargs):
+    query = kwargs.get('query', kwargs.get('q', False))
+    remove = kwargs.get('remove', kwargs.get('rm'))
+
+    if (remove is not None):
+        FILE_INFO.pop(remove, None)
+        return None
+
+    if (query):
+        if (args):
+            return [FILE_INFO[args[0]]] if args[0] in FILE_INFO else []
+        values = []
+        for key, value in FILE_INFO.items():
+            values.extend((key, value))
+        return values
+
+    key, value = args
+    FILE_INFO[key] = value
+
+
+def file(*args, **kwargs):
+    query = kwargs.get('query', kwargs.get('q', False))
+
+    if (query):
+        if (kwargs.get('sceneName') or kwargs.get('sn')):
+            return STATE['scene_name']
+        if ('modified' in kwargs):
+            return STATE['modified']
+        return None
+
+    if ('modified' in kwargs):
+        STATE['modified'] = bool(kwargs['modified'])
+
+
+def open_scene(name, file_info = None):
+    '''
+    Replaces the scene like opening a file would and runs the SceneOpened scriptJobs
+    '''
+    STATE['scene_name'] = name
+    STATE['modified'] = False
+    FILE_INFO.clear()
+    FILE_INFO.update(file_info or {})
+
+    for event in list(SCRIPT_JOBS.values()):
+        if ((event) and (event[0] == 'SceneOpened')):
+            event[1]()
+
+
+def save_scene():
+    '''
+    Runs the before save callbacks, returns a copy of the fileInfo that would be saved
+    '''
+    import maya.api.OpenMaya as om
+
+    om.MSceneMessage.run(om.MSceneMessage.kBeforeSave)
+    STATE['modified'] = False
+    return collections.OrderedDict(FILE_INFO)
@@ -0,0 +1,316 @@
+'''
+Suite @ benchmarks
+
+Benchmark suite of the checklist operations users wait on: loading and
+saving checklists of every size, each sort, each filter, opening and
+closing tabs and loading presets. Reports time and peak memory, and
+compares them against a stored baseline.
+
+=========================================================
+@command:
+-----------------------
+python mayaChecklist/benchmarks/suite.py
+python mayaChecklist/benchmarks/suite.py --save baseline.json
+python mayaChecklist/benchmarks/suite.py --compare baseline.json
+python mayaChecklist/benchmarks/suite.py --only load sort --sizes 100 1000
+-----------------------
+
+@notes:
+*   Runs on plain Python: the window is built offscreen against the
+    stand-in maya package in benchmarks/stubs. Without a Qt binding only
+    the file cases run.
+*   Times are the best of --repeat runs. Peak memory is measured in one
+    more run under tracemalloc, see common.peak_memory.
+*   With --compare, a case regresses when it is more than --tolerance
+    slower or bigger than the baseline, and by more than NOISE_MS or
+    NOISE_KB. The suite then exits with 1.
+*   Baselines are only comparable on the same machine and Python.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+SIZES = (100, 1000, 10000, 50000)
+FORMATS = ('.json', '.mcb')
+
+#   Items of the checklist sorted and filtered
+SORT_SIZE = 10000
+SORT_MODES = ('frame', 'checkstate', 'color')
+FILTER_MODES = ('all', 'unchecked', 'playback', 'text')
+
+CHURN_TABS = 100
+PRESET_SIZE = 1000
+
+#   Differences below these are noise, never regressions
+NOISE_MS = 1.0
+NOISE_KB = 64.0
+
+
+class Case(object):
+    '''
+    One benchmark, func is timed after setup
+    '''
+
+    def __init__(self, name, func, setup = None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+
+def file_cases(temp_dir, sizes):
+    '''
+    Reading and writing checklist files, no ui needed
+    '''
+    from mayaChecklist.core import storage
+
+    cases = []
+    for size in sizes:
+        data = [{'checklist_name' : 'Bench {}'.format(size), 'save_directory' : '', 'preset' : False}]
+        data.extend(common.make_item_dicts(size, seed = size))
+
+        for extension in FORMATS:
+            path = os.path.join(temp_dir, 'bench_{}{}'.format(size, extension))
+            storage.write_checklist(path, data)
+
+            cases.append(Case('read {} {}'.format(extension[1:], size),
+                lambda path = path : storage.read_checklist(path)))
+            cases.append(Case('write {} {}'.format(extension[1:], size),
+                lambda path = path, data = data : storage.write_checklist(path + '.out', data)))
+
+    return cases
+
+
+def ui_cases(temp_dir, sizes, app, ui_main):
+    '''
+    Operations through the checklist window
+    '''
+    from mayaChecklist.core import storage
+    from mayaChecklist.core.filters import ChecklistFilter
+
+    window = ui_main.MayaChecklistUI()
+    window.show()
+    app.processEvents()
+
+    def close_tabs():
+        while (window.tab_widget.count()):
+            window._delete_tab(0, remember = False)
+        app.processEvents()
+
+    def load(path):
+        tab = window._load_checklist(path)
+        while (tab.loader):
+            app.processEvents()
+        return tab
+
+    def save(path):
+        window.current_tab.save_to(path)
+        ui_main.CHECKLIST_WRITER.wait()
+        app.processEvents()
+
+    cases = []
+
+    #   Load and save
+    for size in sizes:
+        for extension in FORMATS:
+            path = os.path.join(temp_dir, 'bench_{}{}'.format(size, extension))
+            out_path = os.path.join(temp_dir, 'saved_{}{}'.format(size, extension))
+
+            cases.append(Case('load {} {}'.format(extension[1:], size),
+                lambda path = path : load(path),
+                setup = close_tabs))
+            cases.append(Case('save {} {}'.format(extension[1:], size),
+                lambda out_path = out_path : save(out_path),
+                setup = lambda path = path : (close_tabs(), load(path))))
+
+    #   Sort and filter one loaded checklist
+    sort_path = os.path.join(temp_dir, 'bench_sort.json')
+    storage.write_checklist(sort_path,
+        [{'checklist_name' : 'Sort', 'save_directory' : '', 'preset' : False}] +
+        common.make_item_dicts(SORT_SIZE))
+    rand = random.Random(0)
+
+    def sort_tab():
+        tab = window.current_tab
+        if ((not tab) or (tab.source != sort_path)):
+            close_tabs()
+            tab = load(sort_path)
+        return tab
+
+    def sort_setup():
+        checklist = sort_tab().checklist
+        items = list(checklist.items)
+        rand.shuffle(items)
+        checklist.reset(items)
+
+    for mode in SORT_MODES:
+        cases.append(Case('sort {} {}'.format(mode, SORT_SIZE),
+            lambda mode = mode : window._sort_list(mode),
+            setup = sort_setup))
+
+    def filter_setup(checklist_filter):
+        sort_tab().set_filter(checklist_filter)
+
+    for mode in FILTER_MODES:
+        if (mode == 'text'):
+            func = lambda : window.current_tab.set_filter(ChecklistFilter(text = 'arm'))
+        else:
+            func = lambda mode = mode : window._view_filter(mode)
+
+        #   'all' has to undo a filter, everything else starts from none
+        start_filter = ChecklistFilter(check = False) if (mode == 'all') else ChecklistFilter()
+        cases.append(Case('filter {} {}'.format(mode, SORT_SIZE),
+            func,
+            setup = lambda start_filter = start_filter : filter_setup(start_filter)))
+
+    #   Tab churn
+    def churn():
+        for i in range(CHURN_TABS):
+            window._add_tab('Churn {}'.format(i))
+        close_tabs()
+
+    cases.append(Case('tabs open close {}'.format(CHURN_TABS), churn, setup = close_tabs))
+
+    #   Presets
+    preset_dir = os.environ['MAYACHECKLIST_PRESET_PATH']
+    if (not os.path.isdir(preset_dir)):
+        os.makedirs(preset_dir)
+    storage.write_checklist(os.path.join(preset_dir, 'bench_preset.json'),
+        [{'checklist_name' : 'Bench Preset', 'save_directory' : '', 'preset' : True}] +
+        common.make_item_dicts(PRESET_SIZE))
+    ui_main.PRESET_REGISTRY.scan()
+
+    cases.append(Case('preset {}'.format(PRESET_SIZE),
+        lambda : window._load_preset('bench_preset'),
+        setup = close_tabs))
+
+    return window, cases
+
+
+def run_case(case, repeat):
+    '''
+    Returns {'ms', 'peak_kb'} for case
+    '''
+    best = common.best_of(case.func, setup = case.setup, repeat = repeat)
+    peak = common.peak_memory(case.func, setup = case.setup)
+
+    return {'ms' : best * 1000.0,
+        'peak_kb' : None if peak is None else peak / 1024.0}
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Returns {case name: [regressed measurements]} against baseline results
+    '''
+    regressions = {}
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if (not base):
+            continue
+
+        regressed = []
+        for key, noise in (('ms', NOISE_MS), ('peak_kb', NOISE_KB)):
+            value = result.get(key)
+            base_value = base.get(key)
+            if ((value is None) or (base_value is None)):
+                continue
+            if ((value > base_value * (1.0 + tolerance)) and (value - base_value > noise)):
+                regressed.append(key)
+
+        if (regressed):
+            regressions[name] = regressed
+
+    return regressions
+
+
+def change(value, base_value):
+    if ((value is None) or (not base_value)):
+        return ''
+    return '{:+.0f}%'.format((value / base_value - 1.0) * 100.0)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Checklist benchmark suite')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = list(SIZES),
+        help = 'checklist sizes to load and save')
+    parser.add_argument('--only', nargs = '+', default = None,
+        help = 'only run cases whose name contains one of these')
+    parser.add_argument('--repeat', type = int, default = 3,
+        help = 'runs per case, the best is kept')
+    parser.add_argument('--save', metavar = 'PATH',
+        help = 'write the results to a baseline file')
+    parser.add_argument('--compare', metavar = 'PATH',
+        help = 'compare against a baseline file, exit 1 on regressions')
+    parser.add_argument('--tolerance', type = float, default = 0.25,
+        help = 'allowed slowdown or growth over the baseline, 0.25 is 25%%')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if (args.compare):
+        with open(args.compare) as infile:
+            baseline = json.load(infile)['results']
+
+    temp_dir = tempfile.mkdtemp()
+    ui = common.setup_ui(temp_dir)
+
+    results = {}
+    try:
+        cases = file_cases(temp_dir, args.sizes)
+        window = None
+        if (ui):
+            app, ui_main = ui
+            window, window_cases = ui_cases(temp_dir, args.sizes, app, ui_main)
+            cases.extend(window_cases)
+
+        if (args.only):
+            cases = [case for case in cases if (any(each in case.name for each in args.only))]
+
+        print('{:<26} {:>10} {:>10} {:>8} {:>8}'.format('case', 'ms', 'peak KB', 'ms', 'peak'))
+        for case in cases:
+            result = results[case.name] = run_case(case, args.repeat)
+            base = baseline.get(case.name, {})
+
+            peak = '' if result['peak_kb'] is None else '{:.0f}'.format(result['peak_kb'])
+            print('{:<26} {:>10.2f} {:>10} {:>8} {:>8}'.format(case.name,
+                result['ms'],
+                peak,
+                change(result['ms'], base.get('ms')),
+                change(result['peak_kb'], base.get('peak_kb'))))
+            sys.stdout.flush()
+
+        if (window):
+            window.close()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+    if (args.save):
+        with open(args.save, 'w') as outfile:
+            json.dump({'python' : sys.version.split()[0],
+                'platform' : platform.platform(),
+                'results' : results}, outfile, indent = 2, sort_keys = True)
+        print('Saved baseline: {}'.format(args.save))
+
+    if (args.compare):
+        regressions = compare(results, baseline, args.tolerance)
+        for name in sorted(regressions):
+            print('Regressed: {} ({})'.format(name, ', '.join(regressions[name])))
+        if (regressions):
+            return 1
+        print('No regressions against {}'.format(args.compare))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,6 @@
+'''
+Core @ mayaChecklist
+
+Headless checklist data layer. Nothing in here imports maya, pymel or Qt
+so it can be used from batch scripts as well as from the ui.
+'''
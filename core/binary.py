@@ -0,0 +1,296 @@
+'''
+Binary @ core
+
+Compact binary checklist format (.mcb) for archiving review notes. It holds
+the same header and items as a JSON checklist file, but texts and colors are
+stored once in a string table, frames are packed int32s and check states are
+packed bits. Files are read through mmap, so opening one or counting its
+unchecked items doesn't decode any text.
+
+=========================================================
+@command:
+-----------------------
+with BinaryChecklist(path) as checklist:
+    print(checklist.count_unchecked())
+-----------------------
+
+@notes:
+*   Layout, all little endian:
+        header      magic, version, item count, string count, info size
+        info        header dict as UTF-8 JSON
+        strings     string count + 1 uint32 offsets, then UTF-8 data
+        frames      int32 per item, NO_FRAME when the item has no frame
+        frame ends  int32 per item, NO_FRAME unless the item is a frame range
+        texts       uint32 string index per item
+        colors      uint32 string index per item
+        checks      one bit per item
+        ids         uint64 uid per item, 0 when the item has none
+*   Frames are stored as numbers, so a frame like '0012' reads back as '12'.
+*   iter_records builds records straight from the columns, loading doesn't
+    go through an item dict per row.
+
+=========================================================
+Maya Tanaka
+'''
+import json
+import mmap
+import struct
+
+from mayaChecklist.core.checklist import ChecklistRecord, content_uid
+
+MAGIC = b'MCKL'
+VERSION = 3
+BINARY_EXTENSION = '.mcb'
+
+HEADER_FORMAT = '<4sHHIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+#   Frame value of items without a frame
+NO_FRAME = -2 ** 31
+
+#   Number of set bits in every byte value
+POPCOUNT = [bin(i).count('1') for i in range(256)]
+
+
+def is_binary_checklist(path):
+    '''
+    Returns True if path is a binary checklist file
+    '''
+    with open(path, 'rb') as infile:
+        return infile.read(len(MAGIC)) == MAGIC
+
+
+def dumps(data):
+    '''
+    Returns checklist data (header dict first, then item dicts) as bytes
+    '''
+    info = data[0]
+    items = data[1:]
+
+    strings = []
+    string_index = {}
+
+    def intern(value):
+        value = value or ''
+        if (value not in string_index):
+            string_index[value] = len(strings)
+            strings.append(value)
+        return string_index[value]
+
+    uids = []
+    frames = []
+    frame_ends = []
+    texts = []
+    colors = []
+    checks = bytearray((len(items) + 7) // 8)
+
+    for row, item in enumerate(items):
+        frame = item.get('frame')
+        frame_end = item.get('frame_end')
+        uids.append(item.get('id') or 0)
+        frames.append(NO_FRAME if frame is None else int(frame))
+        frame_ends.append(NO_FRAME if frame_end is None else int(frame_end))
+        texts.append(intern(item.get('text')))
+        colors.append(intern(item.get('color')))
+        if (item.get('check')):
+            checks[row >> 3] |= 1 << (row & 7)
+
+    #   String table
+    encoded = [each.encode('utf-8') for each in strings]
+    offsets = [0]
+    for each in encoded:
+        offsets.append(offsets[-1] + len(each))
+
+    info_data = json.dumps(info).encode('utf-8')
+    count = len(items)
+
+    return b''.join((
+        struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, count, len(strings), len(info_data)),
+        info_data,
+        struct.pack('<{}I'.format(len(offsets)), *offsets),
+        b''.join(encoded),
+        struct.pack('<{}i'.format(count), *frames),
+        struct.pack('<{}i'.format(count), *frame_ends),
+        struct.pack('<{}I'.format(count), *texts),
+        struct.pack('<{}I'.format(count), *colors),
+        bytes(checks),
+        struct.pack('<{}Q'.format(count), *uids)
+        ))
+
+
+class BinaryChecklist(object):
+    '''
+    Memory mapped reader for a binary checklist file
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+            magic, version, flags, count, string_count, info_size = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError('Not a binary checklist file: {}'.format(path))
+
+        if (magic != MAGIC):
+            self.close()
+            raise ValueError('Not a binary checklist file: {}'.format(path))
+        if (version != VERSION):
+            self.close()
+            raise ValueError('Unsupported binary checklist version {}: {}'.format(version, path))
+
+        self.count = count
+        self.string_count = string_count
+        self.version = version
+
+        #   Section offsets
+        self._info = HEADER_SIZE
+        self._string_offsets = self._info + info_size
+        self._string_data = self._string_offsets + 4 * (string_count + 1)
+        string_data_size = struct.unpack_from('<I', self._map, self._string_offsets + 4 * string_count)[0]
+        self._frames = self._string_data + string_data_size
+        self._frame_ends = self._frames + 4 * count
+        self._texts = self._frame_ends + 4 * count
+        self._colors = self._texts + 4 * count
+        self._checks = self._colors + 4 * count
+        self._uids = self._checks + (count + 7) // 8
+
+        self._info_size = info_size
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if (getattr(self, '_map', None) is not None):
+            self._map.close()
+            self._map = None
+        if (self._file):
+            self._file.close()
+            self._file = None
+
+    @property
+    def info(self):
+        '''
+        The header dict
+        '''
+        return json.loads(self._map[self._info:self._info + self._info_size].decode('utf-8'))
+
+    def string(self, index):
+        '''
+        Decodes one entry of the string table
+        '''
+        start, end = struct.unpack_from('<II', self._map, self._string_offsets + 4 * index)
+        return self._map[self._string_data + start:self._string_data + end].decode('utf-8')
+
+    def frame(self, row):
+        value = struct.unpack_from('<i', self._map, self._frames + 4 * row)[0]
+        return None if (value == NO_FRAME) else str(value)
+
+    def frame_end(self, row):
+        value = struct.unpack_from('<i', self._map, self._frame_ends + 4 * row)[0]
+        return None if (value == NO_FRAME) else str(value)
+
+    def text(self, row):
+        return self.string(struct.unpack_from('<I', self._map, self._texts + 4 * row)[0])
+
+    def color(self, row):
+        return self.string(struct.unpack_from('<I', self._map, self._colors + 4 * row)[0])
+
+    def check(self, row):
+        return bool(bytearray(self._map[self._checks + (row >> 3):self._checks + (row >> 3) + 1])[0] & (1 << (row & 7)))
+
+    def uid(self, row):
+        return struct.unpack_from('<Q', self._map, self._uids + 8 * row)[0] or None
+
+    def count_checked(self):
+        '''
+        Counts the checked items from the check bits alone
+        '''
+        checks = bytearray(self._map[self._checks:self._checks + (self.count + 7) // 8])
+        return sum(POPCOUNT[each] for each in checks)
+
+    def count_unchecked(self):
+        return self.count - self.count_checked()
+
+    def entry(self, row):
+        '''
+        Returns one item in the checklist file format
+        '''
+        return {'id' : self.uid(row),
+            'frame' : self.frame(row),
+            'frame_end' : self.frame_end(row),
+            'text' : self.text(row),
+            'color' : self.color(row),
+            'check' : self.check(row)}
+
+    def _columns(self):
+        '''
+        Returns every column, unpacked in one go
+        '''
+        #   Decode every string once rather than once per item
+        strings = [self.string(index) for index in range(self.string_count)]
+        frames = struct.unpack_from('<{}i'.format(self.count), self._map, self._frames)
+        frame_ends = struct.unpack_from('<{}i'.format(self.count), self._map, self._frame_ends)
+        texts = struct.unpack_from('<{}I'.format(self.count), self._map, self._texts)
+        colors = struct.unpack_from('<{}I'.format(self.count), self._map, self._colors)
+        checks = bytearray(self._map[self._checks:self._checks + (self.count + 7) // 8])
+        uids = struct.unpack_from('<{}Q'.format(self.count), self._map, self._uids)
+
+        return strings, frames, frame_ends, texts, colors, checks, uids
+
+    def iter_entries(self):
+        '''
+        Yields the header and then every item dict, like storage.iter_checklist
+        '''
+        yield self.info
+
+        strings, frames, frame_ends, texts, colors, checks, uids = self._columns()
+        for row in range(self.count):
+            frame = frames[row]
+            frame_end = frame_ends[row]
+            yield {'id' : uids[row] or None,
+                'frame' : None if (frame == NO_FRAME) else str(frame),
+                'frame_end' : None if (frame_end == NO_FRAME) else str(frame_end),
+                'text' : strings[texts[row]],
+                'color' : strings[colors[row]],
+                'check' : bool(checks[row >> 3] & (1 << (row & 7)))}
+
+    def iter_records(self):
+        '''
+        Yields a ChecklistRecord for every item
+        '''
+        strings, frames, frame_ends, texts, colors, checks, uids = self._columns()
+        from_clean = ChecklistRecord.from_clean
+
+        for row in range(self.count):
+            frame = frames[row]
+            frame_end = frame_ends[row]
+
+            #   Cleaned like ChecklistRecord would, files written from item dicts can hold any range
+            if (frame == NO_FRAME):
+                frame = frame_end = None
+            elif ((frame_end == NO_FRAME) or (frame_end == frame)):
+                frame, frame_end = str(frame), None
+            elif (frame_end < frame):
+                frame, frame_end = str(frame_end), str(frame)
+            else:
+                frame, frame_end = str(frame), str(frame_end)
+
+            record = from_clean(frame,
+                frame_end,
+                strings[texts[row]],
+                strings[colors[row]],
+                bool(checks[row >> 3] & (1 << (row & 7))),
+                uids[row])
+            if (not uids[row]):
+                #   Written from items without uids
+                record.uid = content_uid(row, record)
+            yield record
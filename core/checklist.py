@@ -0,0 +1,381 @@
+'''
+Checklist @ core
+
+Headless checklist data model. The ui wraps this in a Qt item model, so
+the rows are plain records instead of one widget per checklist item.
+
+=========================================================
+@command:
+-----------------------
+from mayaChecklist.core.checklist import ChecklistModel, ChecklistRecord
+checklist = ChecklistModel()
+checklist.append(ChecklistRecord(frame = '12', text = 'Arc on wrist'))
+-----------------------
+
+@notes:
+*   Listeners are called as listener(event, first, last). Every mutation
+    sends a 'before_*' event while the old rows are still in place,
+    followed by the matching event once the change is done. This maps
+    directly onto the begin/end calls of QAbstractItemModel.
+*   Every record has a uid that stays the same through edits, saves and
+    loads, stored as "id" in checklist files. Checklists edited by several
+    people are merged by uid, see core.merge. Items from files written
+    before uids get one made from their row and contents when they are
+    read, so every session reading the same file gives them the same uids.
+
+=========================================================
+Maya Tanaka
+'''
+import re
+import json
+import random
+import hashlib
+
+#   Listener events
+BEFORE_INSERT = 'before_insert'
+INSERT = 'insert'
+BEFORE_REMOVE = 'before_remove'
+REMOVE = 'remove'
+BEFORE_CHANGE = 'before_change'
+CHANGE = 'change'
+BEFORE_LAYOUT = 'before_layout'
+LAYOUT = 'layout'
+BEFORE_RESET = 'before_reset'
+RESET = 'reset'
+
+#   Events that change the checklist and bump its revision
+MUTATIONS = (INSERT, REMOVE, CHANGE, LAYOUT, RESET)
+
+DEFAULT_COLOR = 'Default'
+
+#   Record fields, in the order of ChecklistRecord.values
+FIELDS = ('frame', 'frame_end', 'text', 'color', 'check')
+
+#   '1012', '1012-1040' or '1012:1040'
+FRAME_RANGE = re.compile(r'^\s*(-?\d+)\s*(?:[-:]\s*(-?\d+))?\s*$')
+
+#   One pasted review note, an optional bullet and leading frame or frame
+#   range, then the note: '- 1012 elbow pops', '1012-1040: arc on wrist'
+NOTE_LINE = re.compile(r'^\s*(?:[-*]\s+)?(?:(\d+(?:\s*[-:]\s*\d+)?)(?:\s*[:.)]\s*|\s+-\s+|\s+))?(.*?)\s*$')
+
+#   Seeded from the system, so uids made in different Maya sessions don't collide
+UID_RANDOM = random.Random()
+UID_BITS = 62
+
+
+def new_uid():
+    '''
+    Returns a new record uid, a positive integer
+    '''
+    return UID_RANDOM.getrandbits(UID_BITS) + 1
+
+
+def content_uid(row, record):
+    '''
+    Returns the uid of a record read from a file without uids, the same for the same row and contents
+    '''
+    key = json.dumps([row] + list(record.values())).encode('utf-8')
+    return (int(hashlib.md5(key).hexdigest(), 16) & ((1 << UID_BITS) - 1)) + 1
+
+
+def clean_frame(frame):
+    '''
+    Returns the frame as a string if it is a whole number, otherwise None
+    '''
+    if (frame is None) or (frame is False):
+        return None
+
+    frame = str(frame).strip()
+    if (not frame.lstrip('-').isdigit()):
+        return None
+
+    return frame
+
+
+def parse_frame_range(frame, frame_end = None):
+    '''
+    Returns the (frame, frame_end) strings of a frame or frame range
+
+    frame_end is None for a single frame. A range can be given as text,
+    '1012-1040', or as separate start and end frames.
+    '''
+    if ((frame is None) or (frame is False)):
+        return None, None
+
+    match = FRAME_RANGE.match(str(frame))
+    if (not match):
+        return None, None
+
+    start = int(match.group(1))
+    end = match.group(2)
+    if (frame_end is not None):
+        end = clean_frame(frame_end)
+    end = start if (end is None) else int(end)
+
+    if (end < start):
+        start, end = end, start
+    if (end == start):
+        return str(start), None
+
+    return str(start), str(end)
+
+
+def parse_note_lines(text):
+    '''
+    Returns a (frame, text) pair for every non-empty line of a block of notes
+
+    frame is the leading frame or frame range of the line, None if it has none
+    '''
+    notes = []
+    for line in text.splitlines():
+        match = NOTE_LINE.match(line)
+        frame, note = match.groups()
+        if ((not note) and (not frame)):
+            continue
+
+        notes.append((frame, note))
+
+    return notes
+
+
+class ChecklistRecord(object):
+    '''
+    A single checklist item, on a frame or over a frame range
+    '''
+
+    __slots__ = ('frame', 'frame_end', 'text', 'color', 'check', 'uid', 'sort_key')
+
+    def __init__(self, frame = None, text = '', color = DEFAULT_COLOR, check = False, frame_end = None, uid = None):
+        self.frame, self.frame_end = parse_frame_range(frame, frame_end)
+        self.text = text or ''
+        self.color = color or DEFAULT_COLOR
+        self.check = bool(check)
+        self.uid = uid or new_uid()
+        #   Kept up to date by the ChecklistSort of the checklist, see core.sorting
+        self.sort_key = None
+
+    def __repr__(self):
+        return 'ChecklistRecord(frame = {!r}, text = {!r}, color = {!r}, check = {!r}, frame_end = {!r})'.format(
+            self.frame, self.text, self.color, self.check, self.frame_end)
+
+    def values(self):
+        '''
+        Returns the fields of the record as a tuple, see FIELDS
+        '''
+        return (self.frame, self.frame_end, self.text, self.color, self.check)
+
+    @property
+    def frame_label(self):
+        '''
+        The frame or frame range as shown in the ui
+        '''
+        if (self.frame_end is None):
+            return self.frame or ''
+        return '{}-{}'.format(self.frame, self.frame_end)
+
+    def to_dict(self):
+        '''
+        Returns the item in the checklist file format
+        '''
+        return {'id' : self.uid,
+            'frame' : self.frame,
+            'frame_end' : self.frame_end,
+            'text' : self.text,
+            'color' : self.color,
+            'check' : self.check}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Creates an item from the checklist file format
+        '''
+        return cls(frame = data.get('frame'),
+            text = data.get('text'),
+            color = data.get('color'),
+            check = data.get('check', False),
+            frame_end = data.get('frame_end'),
+            uid = data.get('id'))
+
+    @classmethod
+    def from_clean(cls, frame, frame_end, text, color, check, uid):
+        '''
+        Creates an item from values that are already clean, skipping the parsing
+
+        frame and frame_end must be as parse_frame_range returns them.
+        '''
+        record = cls.__new__(cls)
+        record.frame = frame
+        record.frame_end = frame_end
+        record.text = text
+        record.color = color or DEFAULT_COLOR
+        record.check = check
+        record.uid = uid or new_uid()
+        record.sort_key = None
+        return record
+
+
+class ChecklistModel(object):
+    '''
+    Ordered list of checklist records with change notifications
+    '''
+
+    def __init__(self, items = None):
+        self.items = list(items or [])
+        self._listeners = []
+
+        #   Incremented on every change, compare against a saved value to tell if it is dirty
+        self.revision = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, row):
+        return self.items[row]
+
+    def subscribe(self, listener):
+        '''
+        Registers a listener(event, first, last) callable
+        '''
+        if (listener not in self._listeners):
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        '''
+        Removes a registered listener
+        '''
+        if (listener in self._listeners):
+            self._listeners.remove(listener)
+
+    def _notify(self, event, first = 0, last = -1):
+        if (event in MUTATIONS):
+            self.revision += 1
+
+        for listener in list(self._listeners):
+            listener(event, first, last)
+
+    def touch(self):
+        '''
+        Marks a change that is not part of the records, like a rename
+        '''
+        self.revision += 1
+
+    def row_of(self, record):
+        '''
+        Returns the row of the given record
+        '''
+        return self.items.index(record)
+
+    def append(self, record):
+        '''
+        Adds a record at the end of the checklist
+        '''
+        self.insert(len(self.items), [record])
+
+    def extend(self, records):
+        '''
+        Adds several records at the end of the checklist in one go
+        '''
+        self.insert(len(self.items), records)
+
+    def insert(self, row, records):
+        '''
+        Inserts records before the given row
+        '''
+        records = list(records)
+        if (not records):
+            return
+
+        first = row
+        last = row + len(records) - 1
+
+        self._notify(BEFORE_INSERT, first, last)
+        self.items[row:row] = records
+        self._notify(INSERT, first, last)
+
+    def remove(self, first, last = None):
+        '''
+        Removes rows first to last (inclusive) and returns the removed records
+        '''
+        if (last is None):
+            last = first
+
+        self._notify(BEFORE_REMOVE, first, last)
+        removed = self.items[first:last + 1]
+        del self.items[first:last + 1]
+        self._notify(REMOVE, first, last)
+
+        return removed
+
+    def remove_record(self, record):
+        '''
+        Removes the given record
+        '''
+        return self.remove(self.row_of(record))
+
+    def update(self, row, **fields):
+        '''
+        Sets fields on the record at row
+        '''
+        record = self.items[row]
+
+        if ('frame' in fields):
+            fields['frame'], fields['frame_end'] = parse_frame_range(fields['frame'], fields.get('frame_end'))
+        if ('color' in fields):
+            fields['color'] = fields['color'] or DEFAULT_COLOR
+        if ('check' in fields):
+            fields['check'] = bool(fields['check'])
+
+        self._notify(BEFORE_CHANGE, row, row)
+        for key, value in fields.items():
+            setattr(record, key, value)
+
+        self._notify(CHANGE, row, row)
+
+    def update_rows(self, first, values):
+        '''
+        Sets every field of the rows from first on, with one notification
+
+        values holds a ChecklistRecord.values tuple per row
+        '''
+        if (not values):
+            return
+
+        last = first + len(values) - 1
+
+        self._notify(BEFORE_CHANGE, first, last)
+        for record, fields in zip(self.items[first:last + 1], values):
+            record.frame, record.frame_end, record.text, record.color, record.check = fields
+        self._notify(CHANGE, first, last)
+
+    def sort(self, key = None, reverse = False):
+        '''
+        Reorders the records in place, no records are created or destroyed
+        '''
+        self._notify(BEFORE_LAYOUT)
+        self.items.sort(key = key, reverse = reverse)
+        self._notify(LAYOUT)
+
+    def reorder(self, records):
+        '''
+        Puts the records of the checklist in the given order
+        '''
+        self._notify(BEFORE_LAYOUT)
+        self.items = list(records)
+        self._notify(LAYOUT)
+
+    def reset(self, records = None):
+        '''
+        Replaces every record in the checklist
+        '''
+        self._notify(BEFORE_RESET)
+        self.items = list(records or [])
+        self._notify(RESET)
+
+    def clear(self):
+        '''
+        Removes every record
+        '''
+        self.reset()
@@ -0,0 +1,193 @@
+'''
+Filters @ core
+
+Checklist filters: text, color, check state and frame range settings compiled
+into a single predicate, and a row filter that keeps the hidden rows of a
+checklist up to date one edit at a time.
+
+=========================================================
+@command:
+-----------------------
+checklist_filter = ChecklistFilter(text = 'arm', check = False, frames = '1001-1100')
+row_filter = RowFilter(checklist, lambda row, hidden : list_view.setRowHidden(row, hidden))
+row_filter.set_filter(checklist_filter)
+-----------------------
+
+@notes:
+*   Text matches anywhere in the note, ignoring case.
+*   A frame range keeps the notes on or overlapping it, notes without a
+    frame are hidden while it is set.
+*   After set_filter, only inserted and changed rows are tested again.
+
+=========================================================
+Maya Tanaka
+'''
+from mayaChecklist.core import checklist as core_checklist
+
+
+def _show_all(record):
+    return True
+
+
+def parse_frames(frames):
+    '''
+    Returns the inclusive (start, end) ints of a frame range, None if frames is empty
+
+    frames is a (start, end) pair or text like '1012' or '1001-1100'
+    '''
+    if (not frames):
+        return None
+
+    if (isinstance(frames, (tuple, list))):
+        start, end = frames
+    else:
+        start, end = core_checklist.parse_frame_range(frames)
+        if (start is None):
+            raise ValueError('Not a frame or frame range: {}'.format(frames))
+
+    start = int(start)
+    end = start if (end is None) else int(end)
+    return min(start, end), max(start, end)
+
+
+class ChecklistFilter(object):
+    '''
+    Filter settings, an empty filter shows everything
+    '''
+
+    def __init__(self, text = '', colors = None, check = None, frames = None):
+        self.text = text or ''
+        #   Colors to show, None for any color
+        self.colors = set(colors) if colors else None
+        #   None for any check state
+        self.check = check
+        #   Inclusive (start, end) ints, see parse_frames
+        self.frames = parse_frames(frames)
+
+    @property
+    def active(self):
+        return bool(self.text or self.colors or (self.check is not None) or self.frames)
+
+    def __eq__(self, other):
+        return ((isinstance(other, ChecklistFilter)) and
+            ((self.text, self.colors, self.check, self.frames) ==
+            (other.text, other.colors, other.check, other.frames)))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def compile(self):
+        '''
+        Returns a function that takes a record and returns True to show it
+        '''
+        tests = []
+
+        #   Cheapest tests first
+        if (self.check is not None):
+            check = bool(self.check)
+            tests.append(lambda record : record.check == check)
+
+        if (self.colors):
+            colors = frozenset(self.colors)
+            tests.append(lambda record : record.color in colors)
+
+        if (self.frames):
+            start, end = self.frames
+
+            def in_frames(record):
+                if (record.frame is None):
+                    return False
+                frame = int(record.frame)
+                frame_end = frame if (record.frame_end is None) else int(record.frame_end)
+                return (frame <= end) and (frame_end >= start)
+
+            tests.append(in_frames)
+
+        if (self.text):
+            text = self.text.lower()
+            tests.append(lambda record : text in record.text.lower())
+
+        if (not tests):
+            return _show_all
+        if (len(tests) == 1):
+            return tests[0]
+
+        def predicate(record):
+            for test in tests:
+                if (not test(record)):
+                    return False
+            return True
+
+        return predicate
+
+
+class RowFilter(object):
+    '''
+    Tracks which rows of a ChecklistModel a filter hides
+
+    callback(row, hidden) is called for every row whose visibility changes.
+    Rows are visible when they are inserted.
+    '''
+
+    def __init__(self, checklist, callback):
+        self.checklist = checklist
+        self.callback = callback
+
+        self.checklist_filter = ChecklistFilter()
+        self._predicate = _show_all
+
+        #   ids of the hidden records
+        self.hidden = set()
+
+        self.checklist.subscribe(self._checklist_changed)
+
+    def detach(self):
+        self.checklist.unsubscribe(self._checklist_changed)
+
+    def set_filter(self, checklist_filter):
+        '''
+        Applies a new filter to every row
+        '''
+        self.checklist_filter = checklist_filter
+        self._predicate = checklist_filter.compile()
+        self._update_rows(0, len(self.checklist) - 1)
+
+    def is_hidden(self, record):
+        return id(record) in self.hidden
+
+    def _update_rows(self, first, last, inserted = False):
+        predicate = self._predicate
+        hidden = self.hidden
+
+        for row in range(first, last + 1):
+            record = self.checklist.items[row]
+            record_id = id(record)
+            hide = not predicate(record)
+
+            if (inserted):
+                #   New rows start out visible
+                if (hide):
+                    hidden.add(record_id)
+                    self.callback(row, True)
+            elif (hide != (record_id in hidden)):
+                if (hide):
+                    hidden.add(record_id)
+                else:
+                    hidden.discard(record_id)
+                self.callback(row, hide)
+
+    def _checklist_changed(self, event, first, last):
+        if (event == core_checklist.INSERT):
+            self._update_rows(first, last, inserted = True)
+
+        elif (event == core_checklist.CHANGE):
+            self._update_rows(first, last)
+
+        elif (event == core_checklist.BEFORE_REMOVE):
+            for record in self.checklist.items[first:last + 1]:
+                self.hidden.discard(id(record))
+
+        elif (event == core_checklist.RESET):
+            #   Views show every row again after a reset
+            self.hidden = set()
+            self._update_rows(0, len(self.checklist) - 1, inserted = True)
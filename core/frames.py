@@ -0,0 +1,191 @@
+'''
+Frames @ core
+
+Frame index over a ChecklistModel, used to highlight the notes at the
+current time while Maya plays back and to find the notes in a frame range.
+
+=========================================================
+@command:
+-----------------------
+frame_index = FrameIndex(checklist)
+frame_index.at(1012)
+frame_index.between(playback_start, playback_end)
+-----------------------
+
+@notes:
+*   Notes on a single frame are stored as one frame long ranges, so every
+    lookup is an overlap query on a centered interval tree, O(log n + k).
+*   Any edit marks the index stale and it is rebuilt on the next lookup,
+    so playback without edits never walks the whole checklist.
+
+=========================================================
+Maya Tanaka
+'''
+from mayaChecklist.core import checklist as core_checklist
+
+
+class IntervalNode(object):
+    '''
+    Node of an IntervalTree: the intervals that contain its center
+    '''
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, center, intervals):
+        self.center = center
+
+        #   (start, end, value) tuples
+        self.by_start = sorted(intervals, key = lambda interval : interval[0])
+        self.by_end = sorted(intervals, key = lambda interval : interval[1], reverse = True)
+
+        self.left = None
+        self.right = None
+
+
+class IntervalTree(object):
+    '''
+    Static centered interval tree over inclusive (start, end, value) intervals
+    '''
+
+    def __init__(self, intervals = None):
+        self.root = None
+        self.count = 0
+
+        intervals = list(intervals or [])
+        if (intervals):
+            self.count = len(intervals)
+            self.root = self._build(intervals)
+
+    def __len__(self):
+        return self.count
+
+    def _build(self, intervals):
+        '''
+        Builds the tree without recursion, which could run out of stack on big checklists
+        '''
+        root = None
+        stack = [(intervals, None, None)]
+
+        while (stack):
+            intervals, parent, side = stack.pop()
+
+            endpoints = sorted([interval[0] for interval in intervals] + [interval[1] for interval in intervals])
+            center = endpoints[len(endpoints) // 2]
+
+            left = []
+            right = []
+            middle = []
+            for interval in intervals:
+                if (interval[1] < center):
+                    left.append(interval)
+                elif (interval[0] > center):
+                    right.append(interval)
+                else:
+                    middle.append(interval)
+
+            node = IntervalNode(center, middle)
+            if (parent is None):
+                root = node
+            else:
+                setattr(parent, side, node)
+
+            if (left):
+                stack.append((left, node, 'left'))
+            if (right):
+                stack.append((right, node, 'right'))
+
+        return root
+
+    def overlapping(self, start, end):
+        '''
+        Returns the values of the intervals that overlap start to end
+        '''
+        found = []
+        stack = [self.root] if self.root else []
+
+        while (stack):
+            node = stack.pop()
+
+            if (end < node.center):
+                #   Everything here ends at or after the center, so only the starts matter
+                for interval in node.by_start:
+                    if (interval[0] > end):
+                        break
+                    found.append(interval[2])
+                if (node.left):
+                    stack.append(node.left)
+
+            elif (start > node.center):
+                #   Everything here starts at or before the center, so only the ends matter
+                for interval in node.by_end:
+                    if (interval[1] < start):
+                        break
+                    found.append(interval[2])
+                if (node.right):
+                    stack.append(node.right)
+
+            else:
+                found.extend(interval[2] for interval in node.by_start)
+                if (node.left):
+                    stack.append(node.left)
+                if (node.right):
+                    stack.append(node.right)
+
+        return found
+
+    def covering(self, point):
+        '''
+        Returns the values of the intervals that contain point
+        '''
+        return self.overlapping(point, point)
+
+
+class FrameIndex(object):
+    '''
+    Interval tree of the checklist records that have a frame or frame range
+    '''
+
+    def __init__(self, checklist):
+        self.checklist = checklist
+        self.checklist.subscribe(self._checklist_changed)
+
+        self._tree = IntervalTree()
+        self._stale = True
+
+    def _checklist_changed(self, event, first, last):
+        if (event in core_checklist.MUTATIONS):
+            self._stale = True
+
+    def _rebuild(self):
+        intervals = []
+        for record in self.checklist:
+            if (record.frame is None):
+                continue
+
+            start = int(record.frame)
+            end = start if (record.frame_end is None) else int(record.frame_end)
+            intervals.append((start, end, record))
+
+        self._tree = IntervalTree(intervals)
+        self._stale = False
+
+    def between(self, start, end):
+        '''
+        Returns the records on or overlapping start to end, inclusive
+        '''
+        if (self._stale):
+            self._rebuild()
+
+        return self._tree.overlapping(start, end)
+
+    def at(self, frame):
+        '''
+        Returns the records that cover frame
+        '''
+        return self.between(frame, frame)
+
+    def near(self, frame, tolerance = 0):
+        '''
+        Returns the records within tolerance frames of frame
+        '''
+        return self.between(frame - tolerance, frame + tolerance)
@@ -0,0 +1,314 @@
+'''
+Journal @ core
+
+Append-only edit journal for a checklist. Every edit is written as one JSON
+line as soon as it happens, so nothing is lost if Maya crashes before the
+checklist is saved.
+
+=========================================================
+@command:
+-----------------------
+journal = ChecklistJournal()
+journal.compact(info, records)
+checklist.subscribe(lambda event, first, last: journal.record(event, first, last, checklist))
+-----------------------
+
+@notes:
+*   The first line of a journal is always a base entry. It either holds the
+    items inline, or points at the checklist file it was compacted into.
+    Every following line is an edit on top of that base.
+*   An open journal has an owner file next to it naming the process that
+    writes it, see core.locking.owner_info. Journals whose owner isn't
+    running anymore are orphans left behind by a crash, see
+    orphaned_journals and replay_journal. Journals of another Maya that
+    is still running are left alone.
+*   Orphans are claimed before they are replayed, so two Mayas starting
+    at once don't both recover them. Orphans the user doesn't want back
+    are moved into the DECLINED_DIR folder rather than deleted.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import json
+import uuid
+import tempfile
+
+from mayaChecklist.core import checklist as core_checklist
+from mayaChecklist.core import locking
+from mayaChecklist.core import storage
+from mayaChecklist.core.checklist import ChecklistRecord
+
+JOURNAL_DIR = os.environ.get('MAYACHECKLIST_JOURNAL_DIR',
+    os.path.join(os.path.expanduser('~'), '.mayaChecklist', 'journal'))
+JOURNAL_EXTENSION = '.jsonl'
+OWNER_EXTENSION = '.owner'
+#   Folder in the journal folder that declined orphans are moved into
+DECLINED_DIR = 'declined'
+
+#   Journal entries
+BASE = 'base'
+HEADER = 'header'
+INSERT = 'insert'
+REMOVE = 'remove'
+CHANGE = 'change'
+ORDER = 'order'
+
+#   Paths of the journals held open by this process
+OPEN_JOURNALS = set()
+
+
+class ChecklistJournal(object):
+    '''
+    Journal file of a single checklist tab
+    '''
+
+    def __init__(self, path = None, directory = None):
+        if (not path):
+            directory = directory or JOURNAL_DIR
+            path = os.path.join(directory, uuid.uuid4().hex + JOURNAL_EXTENSION)
+
+        self.path = path
+
+        #   Edits appended since the last compaction
+        self.edits = 0
+
+        self._file = None
+        self._layout_rows = None
+        self._owned = False
+
+    def compact(self, info, records = None, source = None):
+        '''
+        Replaces the journal with a single base entry
+
+        Pass source when the records were just saved to that checklist file,
+        otherwise the records are stored inline.
+        '''
+        base = {'op' : BASE, 'info' : info}
+        if (source):
+            base['source'] = source
+        else:
+            base['items'] = [record.to_dict() for record in (records or [])]
+
+        self._close_file()
+
+        directory = os.path.dirname(self.path)
+        if (not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        handle, temp_path = tempfile.mkstemp(suffix = '.tmp', dir = directory)
+        with os.fdopen(handle, 'w') as outfile:
+            outfile.write(json.dumps(base) + '\n')
+        storage.replace_file(temp_path, self.path)
+
+        self._file = open(self.path, 'a')
+        self.edits = 0
+        OPEN_JOURNALS.add(self.path)
+
+        if (not self._owned):
+            write_owner(self.path)
+            self._owned = True
+
+    def append(self, entry):
+        '''
+        Writes one entry to the end of the journal
+        '''
+        self._file.write(json.dumps(entry) + '\n')
+        #   Flushed to the OS, which keeps it even if Maya crashes
+        self._file.flush()
+        self.edits += 1
+
+    def header(self, info):
+        '''
+        Journals a change to the checklist name or save directory
+        '''
+        self.append({'op' : HEADER, 'info' : info})
+
+    def record(self, event, first, last, checklist):
+        '''
+        Journals a ChecklistModel notification
+        '''
+        if (event == core_checklist.INSERT):
+            self.append({'op' : INSERT,
+                'row' : first,
+                'items' : [record.to_dict() for record in checklist.items[first:last + 1]]})
+
+        elif (event == core_checklist.REMOVE):
+            self.append({'op' : REMOVE, 'first' : first, 'last' : last})
+
+        elif (event == core_checklist.CHANGE):
+            #   One line for the whole run of rows, a bulk edit is flushed once
+            self.append({'op' : CHANGE,
+                'row' : first,
+                'items' : [record.to_dict() for record in checklist.items[first:last + 1]]})
+
+        elif (event == core_checklist.BEFORE_LAYOUT):
+            self._layout_rows = dict((id(record), row) for row, record in enumerate(checklist))
+
+        elif (event == core_checklist.LAYOUT):
+            #   Store where each row came from rather than the items themselves
+            rows = [self._layout_rows[id(record)] for record in checklist]
+            self._layout_rows = None
+            self.append({'op' : ORDER, 'rows' : rows})
+
+        elif (event == core_checklist.RESET):
+            self.append({'op' : BASE, 'items' : [record.to_dict() for record in checklist]})
+
+    def close(self, discard = False):
+        '''
+        Closes the journal, discard deletes it as well
+        '''
+        self._close_file()
+        OPEN_JOURNALS.discard(self.path)
+
+        if ((discard) and (os.path.exists(self.path))):
+            os.remove(self.path)
+
+        #   A journal that isn't discarded is an orphan from now on
+        if (self._owned):
+            remove_owner(self.path)
+            self._owned = False
+
+    def _close_file(self):
+        if (self._file):
+            self._file.close()
+            self._file = None
+
+
+def replay_journal(path):
+    '''
+    Rebuilds a checklist from a journal
+
+    Returns the header info, the records and whether the journal holds
+    anything that was never saved to a checklist file
+    '''
+    info = {}
+    records = []
+    unsaved = False
+
+    with open(path) as infile:
+        lines = infile.readlines()
+
+    for i, line in enumerate(lines):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            #   The last line can be cut short by a crash
+            if (i == len(lines) - 1):
+                break
+            raise
+
+        op = entry['op']
+
+        if (op == BASE):
+            info = entry.get('info', info)
+            if ('source' in entry):
+                records = storage.read_checklist(entry['source'])[1]
+            else:
+                records = [ChecklistRecord.from_dict(each) for each in entry['items']]
+                unsaved = unsaved or bool(records)
+
+            #   Later base entries come from a reset, which is an edit
+            if (i > 0):
+                unsaved = True
+            continue
+
+        unsaved = True
+
+        if (op == HEADER):
+            info = entry['info']
+        elif (op == INSERT):
+            row = entry['row']
+            records[row:row] = [ChecklistRecord.from_dict(each) for each in entry['items']]
+        elif (op == REMOVE):
+            del records[entry['first']:entry['last'] + 1]
+        elif (op == CHANGE):
+            row = entry['row']
+            records[row:row + len(entry['items'])] = [ChecklistRecord.from_dict(each) for each in entry['items']]
+        elif (op == ORDER):
+            records = [records[row] for row in entry['rows']]
+
+    return info, records, unsaved
+
+
+def owner_path(path):
+    return path + OWNER_EXTENSION
+
+
+def write_owner(path):
+    '''
+    Marks the journal at path as this process's, returns the owner dict
+    '''
+    owner = locking.owner_info()
+
+    handle, temp_path = tempfile.mkstemp(suffix = '.tmp', dir = os.path.dirname(path))
+    with os.fdopen(handle, 'w') as outfile:
+        json.dump(owner, outfile)
+    storage.replace_file(temp_path, owner_path(path))
+    return owner
+
+
+def remove_owner(path):
+    try:
+        os.remove(owner_path(path))
+    except OSError:
+        pass
+
+
+def is_orphaned(path):
+    '''
+    Returns True if no running process owns the journal at path
+    '''
+    if (path in OPEN_JOURNALS):
+        return False
+
+    owner = locking.read_owner(owner_path(path))
+    return (owner is None) or (not locking.owner_alive(owner))
+
+
+def orphaned_journals(directory = None):
+    '''
+    Returns the journals in directory that no running process owns
+    '''
+    directory = directory or JOURNAL_DIR
+    if (not os.path.isdir(directory)):
+        return []
+
+    paths = [os.path.join(directory, each_file) for each_file in sorted(os.listdir(directory))
+        if (each_file.endswith(JOURNAL_EXTENSION))]
+
+    return [path for path in paths if (is_orphaned(path))]
+
+
+def claim_journal(path):
+    '''
+    Takes over an orphaned journal, returns False if another process got to it first
+    '''
+    if (not is_orphaned(path)):
+        return False
+
+    owner = write_owner(path)
+    #   Whoever wrote the owner file last has it
+    return locking.read_owner(owner_path(path)) == owner
+
+
+def discard_journal(path):
+    '''
+    Deletes a claimed journal
+    '''
+    os.remove(path)
+    remove_owner(path)
+
+
+def set_aside_journal(path):
+    '''
+    Moves a claimed journal into the DECLINED_DIR folder, returns its new path
+    '''
+    directory = os.path.join(os.path.dirname(path), DECLINED_DIR)
+    if (not os.path.isdir(directory)):
+        os.makedirs(directory)
+
+    target = os.path.join(directory, os.path.basename(path))
+    storage.replace_file(path, target)
+    remove_owner(path)
+    return target
@@ -0,0 +1,252 @@
+'''
+Locking @ core
+
+Advisory lock files for checklists shared between several people. A lock
+is a small file next to the checklist, created atomically, that every
+checklist save waits for.
+
+=========================================================
+@command:
+-----------------------
+with FileLock(path):
+    ...
+-----------------------
+
+@notes:
+*   The lock only keeps out other checklist windows, anything else can
+    still write the file.
+*   O_EXCL creation is atomic on local disks and on NFS v3 and up, and on
+    SMB shares.
+*   The lock file holds the user, host, pid and time of its owner, so a
+    lock that can't be taken can say who holds it. The time is the owner's
+    own clock, file times on a network share come from the server's.
+*   A lock older than STALE_SECONDS, or owned by a process on this host
+    that isn't running anymore, is left over from a crashed session and is
+    broken. Saves hold the lock for well under a second.
+*   A stale lock is broken by renaming it away first, only one of several
+    waiters can do that. If the lock was replaced since it was found stale,
+    the fresh one is put back.
+*   owner_info and owner_alive are also how journals tell whose they are,
+    see core.journal.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import time
+import uuid
+import errno
+import json
+import socket
+import getpass
+
+LOCK_EXTENSION = '.lock'
+
+#   Seconds to wait for a lock before giving up
+TIMEOUT = 10.0
+#   Seconds between attempts
+POLL_INTERVAL = 0.05
+#   Seconds after which a lock is assumed to be left over from a crash
+STALE_SECONDS = 120.0
+
+
+class LockError(IOError):
+    '''
+    Raised when a lock can't be taken in time
+    '''
+
+
+def lock_path(path):
+    return path + LOCK_EXTENSION
+
+
+def read_owner(path):
+    '''
+    Returns the owner dict written into a file, None if there is none
+    '''
+    try:
+        with open(path) as infile:
+            owner = json.load(infile)
+    except (IOError, OSError, ValueError):
+        return None
+    return owner if isinstance(owner, dict) else None
+
+
+def lock_owner(path):
+    '''
+    Returns the owner dict written into the lock of path, None if it isn't locked
+    '''
+    return read_owner(lock_path(path))
+
+
+def owner_info():
+    '''
+    Returns an owner dict for this process, token tells apart two owners in one process
+    '''
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = None
+
+    return {'user' : user,
+        'host' : socket.gethostname(),
+        'pid' : os.getpid(),
+        'time' : time.time(),
+        'token' : uuid.uuid4().hex}
+
+
+def process_alive(pid):
+    '''
+    Returns True if a process with pid is running on this host
+    '''
+    if (os.name == 'nt'):
+        import ctypes
+
+        #   PROCESS_QUERY_LIMITED_INFORMATION
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if (not handle):
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except OSError as error:
+        #   Running, as someone else
+        return error.errno == errno.EPERM
+    return True
+
+
+def owner_alive(owner):
+    '''
+    Returns True unless owner is a process on this host that isn't running
+
+    Processes on other hosts can't be checked and count as running.
+    '''
+    if ((not owner) or (owner.get('host') != socket.gethostname())):
+        return True
+
+    pid = owner.get('pid')
+    if (not isinstance(pid, int)):
+        return True
+    return (pid == os.getpid()) or process_alive(pid)
+
+
+class FileLock(object):
+    '''
+    Exclusive advisory lock on a file, as a context manager
+    '''
+
+    def __init__(self, path, timeout = None):
+        self.target = path
+        self.path = lock_path(path)
+        self.timeout = TIMEOUT if timeout is None else timeout
+        self.locked = False
+        self.owner = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def acquire(self):
+        '''
+        Waits for the lock, raises LockError after timeout seconds
+        '''
+        end_time = time.time() + self.timeout
+
+        while True:
+            try:
+                handle = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as error:
+                if (error.errno != errno.EEXIST):
+                    #   Not a lock held by someone else, the folder is missing or read only
+                    raise
+
+                if (self._break_stale()):
+                    continue
+
+                if (time.time() >= end_time):
+                    owner = lock_owner(self.target) or {}
+                    raise LockError('Checklist is locked by {}@{}: {}'.format(owner.get('user', '?'),
+                        owner.get('host', '?'), self.path))
+
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            self.owner = owner_info()
+            with os.fdopen(handle, 'w') as outfile:
+                json.dump(self.owner, outfile)
+            self.locked = True
+            return
+
+    def release(self):
+        if (not self.locked):
+            return
+
+        self.locked = False
+
+        #   A lock broken as stale may belong to someone else by now
+        owner = read_owner(self.path)
+        if ((owner) and (owner.get('token') != self.owner['token'])):
+            return
+
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _is_stale(self, owner):
+        if (not owner_alive(owner)):
+            return True
+
+        try:
+            return time.time() - float(owner['time']) >= STALE_SECONDS
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def _break_stale(self):
+        '''
+        Deletes the lock file if it is stale, returns True if the lock should be tried again
+        '''
+        owner = read_owner(self.path)
+        if (owner is None):
+            if (not os.path.exists(self.path)):
+                #   Released in the meantime
+                return True
+
+            #   Not written yet, or written by a crashed session before it could be
+            try:
+                age = time.time() - os.path.getmtime(self.path)
+            except OSError:
+                return True
+            if (age < STALE_SECONDS):
+                return False
+
+        elif (not self._is_stale(owner)):
+            return False
+
+        #   Only one waiter gets to rename the lock away
+        broken_path = '{}.{}.broken'.format(self.path, uuid.uuid4().hex)
+        try:
+            os.rename(self.path, broken_path)
+        except OSError:
+            return True
+
+        if (read_owner(broken_path) == owner):
+            os.remove(broken_path)
+            return True
+
+        #   Replaced by a fresh lock since it was read, that one is put back
+        try:
+            if (hasattr(os, 'link')):
+                os.link(broken_path, self.path)
+                os.remove(broken_path)
+            else:
+                os.rename(broken_path, self.path)
+        except OSError:
+            #   Locked again in the meantime, the fresh lock is lost either way
+            os.remove(broken_path)
+        return False
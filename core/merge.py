@@ -0,0 +1,236 @@
+'''
+Merge @ core
+
+Three-way merge of checklists by item uid, for checklist files edited by
+several people at once, and applying a merged checklist onto an open one.
+
+=========================================================
+@command:
+-----------------------
+items, conflicts = merge_items(base, ours, theirs)
+apply_items(checklist, items)
+-----------------------
+
+@notes:
+*   base, ours and theirs are lists of item dicts in the checklist file
+    format: base as the file was read, ours as edited here and theirs as
+    the file is now.
+*   Fields are merged one by one. A field changed on one side takes that
+    side's value. A field changed differently on both sides keeps ours and
+    counts as a conflict, as does an item edited on one side and deleted
+    on the other, which is kept.
+*   The order is ours. Items only theirs has are placed after the item
+    before them in theirs.
+*   Items in theirs without an id were written before uids, they are
+    matched to base by their contents, or by row if they were edited.
+*   Everything is a single pass over each list with dict lookups, merging
+    stays O(n).
+
+=========================================================
+Maya Tanaka
+'''
+import collections
+
+from mayaChecklist.core.checklist import ChecklistRecord, FIELDS, new_uid
+
+#   Fields that tell items apart when matching items without ids
+CONTENT_FIELDS = ('frame', 'frame_end', 'text', 'color')
+
+
+def content_key(item):
+    '''
+    Returns the CONTENT_FIELDS of an item dict
+    '''
+    get = item.get
+    return (get('frame'), get('frame_end'), get('text'), get('color'))
+
+
+def item_values(item):
+    '''
+    Returns the fields of an item dict in the order of ChecklistRecord.values
+    '''
+    get = item.get
+    return (get('frame'), get('frame_end'), get('text'), get('color'), get('check'))
+
+
+def assign_ids(items, base):
+    '''
+    Gives every item without an id the id of a base item
+
+    Items are matched to base items with the same contents first, then an
+    edited item to the base item on the same row. Items left over get a new id.
+    '''
+    missing = [row for row, item in enumerate(items) if (not item.get('id'))]
+    if (not missing):
+        return items
+
+    used = set(item.get('id') for item in items)
+    unmatched = collections.defaultdict(collections.deque)
+    for item in base:
+        if (item['id'] not in used):
+            unmatched[content_key(item)].append(item['id'])
+
+    unassigned = []
+    for row in missing:
+        candidates = unmatched.get(content_key(items[row]))
+        if (candidates):
+            uid = candidates.popleft()
+            items[row]['id'] = uid
+            used.add(uid)
+        else:
+            unassigned.append(row)
+
+    for row in unassigned:
+        uid = base[row]['id'] if (row < len(base)) else None
+        if ((uid is None) or (uid in used)):
+            uid = new_uid()
+        items[row]['id'] = uid
+        used.add(uid)
+
+    return items
+
+
+def merge_item(base, ours, theirs):
+    '''
+    Returns the merged item dict and whether the sides conflicted
+    '''
+    merged = dict(ours)
+    conflict = False
+
+    for field in FIELDS:
+        ours_value = ours.get(field)
+        theirs_value = theirs.get(field)
+        if (ours_value == theirs_value):
+            continue
+
+        base_value = base.get(field) if base else None
+        if ((base) and (ours_value == base_value)):
+            merged[field] = theirs_value
+        elif ((not base) or (theirs_value != base_value)):
+            conflict = True
+
+    return merged, conflict
+
+
+def merge_items(base, ours, theirs):
+    '''
+    Returns the merged item dicts and the ids of the items that conflicted
+    '''
+    theirs = assign_ids(theirs, base)
+
+    base_by_id = dict((item['id'], item) for item in base)
+    theirs_by_id = dict((item['id'], item) for item in theirs)
+    conflicts = []
+
+    #   Ours, minus what theirs deleted
+    merged = []
+    merged_ids = set()
+    for item in ours:
+        uid = item['id']
+        base_item = base_by_id.get(uid)
+        theirs_item = theirs_by_id.get(uid)
+
+        if (theirs_item is not None):
+            item, conflict = merge_item(base_item, item, theirs_item)
+            if (conflict):
+                conflicts.append(uid)
+        elif (base_item is not None):
+            #   Deleted by them, kept if it was edited here
+            if (item_values(item) == item_values(base_item)):
+                continue
+            conflicts.append(uid)
+
+        merged.append(item)
+        merged_ids.add(uid)
+
+    ours_ids = set(item['id'] for item in ours)
+
+    #   Items theirs added, or edited after they were deleted here, go after the item before them in theirs
+    after = collections.defaultdict(list)
+    anchor = None
+    for item in theirs:
+        uid = item['id']
+        if (uid in merged_ids):
+            anchor = uid
+            continue
+        if (uid in ours_ids):
+            continue
+
+        base_item = base_by_id.get(uid)
+        if (base_item is not None):
+            #   Deleted here, kept if it was edited there
+            if (item_values(item) == item_values(base_item)):
+                continue
+            conflicts.append(uid)
+
+        after[anchor].append(dict(item))
+
+    if (not after):
+        return merged, conflicts
+
+    result = list(after.get(None, []))
+    for item in merged:
+        result.append(item)
+        result.extend(after.get(item['id'], []))
+
+    return result, conflicts
+
+
+def _runs(rows):
+    '''
+    Yields (first, last) for every run of consecutive rows, rows sorted
+    '''
+    first = last = None
+    for row in rows:
+        if ((last is not None) and (row == last + 1)):
+            last = row
+            continue
+        if (first is not None):
+            yield first, last
+        first = last = row
+    if (first is not None):
+        yield first, last
+
+
+def apply_items(checklist, items):
+    '''
+    Changes checklist to match the item dicts, touching only the rows that differ
+
+    Records are matched by uid and kept, so views and listeners only see the
+    rows that were removed, changed or added. Returns the number of rows
+    removed, changed and added.
+    '''
+    wanted = dict((item['id'], item) for item in items)
+
+    #   Removed, bottom up so the rows above stay put
+    removed_rows = [row for row, record in enumerate(checklist) if (record.uid not in wanted)]
+    for first, last in reversed(list(_runs(removed_rows))):
+        checklist.remove(first, last)
+
+    #   Changed, one notification per run of rows
+    changed = {}
+    for row, record in enumerate(checklist):
+        values = record.values()
+        item = wanted[record.uid]
+        if (item_values(item) == values):
+            continue
+
+        #   Cleaned up like a loaded record before comparing, '0012' is frame '12'
+        new_values = ChecklistRecord.from_dict(item).values()
+        if (new_values != values):
+            changed[row] = new_values
+    for first, last in _runs(sorted(changed)):
+        checklist.update_rows(first, [changed[row] for row in range(first, last + 1)])
+
+    #   Order of the records that are kept
+    records = dict((record.uid, record) for record in checklist)
+    kept = [records[item['id']] for item in items if (item['id'] in records)]
+    if (kept != checklist.items):
+        checklist.reorder(kept)
+
+    #   Added, one insert per run of new rows
+    added_rows = [row for row, item in enumerate(items) if (item['id'] not in records)]
+    for first, last in _runs(added_rows):
+        checklist.insert(first, [ChecklistRecord.from_dict(items[row]) for row in range(first, last + 1)])
+
+    return len(removed_rows), len(changed), len(added_rows)
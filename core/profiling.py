@@ -0,0 +1,198 @@
+'''
+Profiling @ core
+
+Timers and counters around the slow operations of the checklist: loading,
+saving, sorting, filtering, adding and deleting items. They cost next to
+nothing while profiling is off.
+
+=========================================================
+@command:
+-----------------------
+from mayaChecklist.core import profiling
+profiling.enable()
+
+with profiling.timed('sort', items = len(checklist)):
+    checklist.sort()
+profiling.count('add', 10)
+
+profiling.PROFILER.report()
+profiling.PROFILER.export('/tmp/checklist_profile.json')
+-----------------------
+
+@notes:
+*   Profiling is on when MAYACHECKLIST_PROFILE is set, or the
+    MayaChecklist.profile logger is enabled for DEBUG when this module is
+    imported. Every timing is also logged to that logger at DEBUG.
+*   While it is off, timed returns one shared do-nothing timer and count
+    returns straight away.
+*   Only the newest MAX_RECENT timings are kept, totals cover everything
+    since the last reset.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import collections
+
+logger = logging.getLogger('MayaChecklist.profile')
+
+#   Timings kept for the debug panel
+MAX_RECENT = 200
+
+ENABLED = bool(os.environ.get('MAYACHECKLIST_PROFILE')) or logger.isEnabledFor(logging.DEBUG)
+
+
+def enable(enabled = True):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def is_enabled():
+    return ENABLED
+
+
+class Profiler(object):
+    '''
+    Collects timings and counters
+    '''
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        #   (time.time(), name, seconds, details), newest last
+        self.recent = collections.deque(maxlen = MAX_RECENT)
+        #   name: [calls, total seconds, max seconds]
+        self.totals = {}
+        #   name: count
+        self.counters = {}
+
+    def record(self, name, seconds, **details):
+        '''
+        Adds a timing, for operations that don't fit in a with block
+        '''
+        self.recent.append((time.time(), name, seconds, details))
+
+        total = self.totals.get(name)
+        if (total is None):
+            total = self.totals[name] = [0, 0.0, 0.0]
+        total[0] += 1
+        total[1] += seconds
+        total[2] = max(total[2], seconds)
+
+        logger.debug('{} {:.2f} ms {}'.format(name, seconds * 1000.0, details or ''))
+
+    def count(self, name, amount = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self, extra = None):
+        '''
+        Returns the collected timings and counters as a JSON friendly dict
+
+        extra is merged in, the ui adds its tab statistics this way
+        '''
+        report = {'created' : time.time(),
+            'python' : sys.version.split()[0],
+            'platform' : platform.platform(),
+            'totals' : dict((name, {'calls' : calls, 'total_ms' : total * 1000.0, 'max_ms' : peak * 1000.0})
+                for name, (calls, total, peak) in self.totals.items()),
+            'counters' : dict(self.counters),
+            'recent' : [{'time' : stamp, 'name' : name, 'ms' : seconds * 1000.0, 'details' : details}
+                for stamp, name, seconds, details in self.recent]}
+
+        if (extra):
+            report.update(extra)
+
+        return report
+
+    def export(self, path, extra = None):
+        '''
+        Writes report to a JSON file for bug reports
+        '''
+        with open(path, 'w') as outfile:
+            json.dump(self.report(extra), outfile, indent = 2, sort_keys = True, default = str)
+
+
+PROFILER = Profiler()
+
+
+class _Timer(object):
+    '''
+    Times a with block into PROFILER
+    '''
+
+    __slots__ = ('name', 'details', 'start')
+
+    def __init__(self, name, details):
+        self.name = name
+        self.details = details
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        PROFILER.record(self.name, time.time() - self.start, **self.details)
+        return False
+
+
+class _NullTimer(object):
+    '''
+    Stands in for _Timer while profiling is off
+    '''
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timed(name, **details):
+    '''
+    Returns a context manager that times its block under name
+    '''
+    if (not ENABLED):
+        return NULL_TIMER
+    return _Timer(name, details)
+
+
+def count(name, amount = 1):
+    '''
+    Adds amount to the counter name
+    '''
+    if (ENABLED):
+        PROFILER.count(name, amount)
+
+
+def record(name, seconds, **details):
+    '''
+    Adds a timing measured by the caller
+    '''
+    if (ENABLED):
+        PROFILER.record(name, seconds, **details)
+
+
+def checklist_memory(checklist):
+    '''
+    Returns the approximate bytes held by the records of a checklist
+    '''
+    size = sys.getsizeof(checklist.items)
+    for record in checklist.items:
+        size += sys.getsizeof(record)
+        size += sys.getsizeof(record.text)
+        #   Frames, colors and bools are mostly shared or tiny
+        if (record.frame is not None):
+            size += sys.getsizeof(record.frame)
+
+    return size
@@ -0,0 +1,152 @@
+'''
+Registry @ core
+
+Preset checklist registry. The preset folders are scanned once and every
+preset is parsed at most once per modification time, so reopening a preset
+does not touch the disk.
+
+=========================================================
+@command:
+-----------------------
+registry = PresetRegistry()
+for name in registry.names():
+    info, records = registry.get(name)
+-----------------------
+
+@notes:
+*   Preset folders are searched in order: the presets folder that ships
+    with the tool, every folder in MAYACHECKLIST_PRESET_PATH (studio
+    presets) and the user preset folder. A preset in a later folder
+    replaces one with the same name in an earlier folder.
+*   New presets are saved to the user preset folder.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+
+from mayaChecklist.core import storage
+from mayaChecklist.core.checklist import ChecklistRecord
+
+BUILTIN_PRESET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'presets')
+USER_PRESET_DIR = os.path.join(os.path.expanduser('~'), '.mayaChecklist', 'presets')
+PRESET_EXTENSION = '.json'
+
+
+def default_preset_dirs():
+    '''
+    Returns the preset folders in search order
+    '''
+    studio_dirs = [each for each in os.environ.get('MAYACHECKLIST_PRESET_PATH', '').split(os.pathsep) if each]
+    return [BUILTIN_PRESET_DIR] + studio_dirs + [USER_PRESET_DIR]
+
+
+class Preset(object):
+    '''
+    A preset file and its parsed contents
+    '''
+
+    __slots__ = ('name', 'path', 'mtime', 'info', 'items')
+
+    def __init__(self, name, path, mtime):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+
+        #   Filled in the first time the preset is opened
+        self.info = None
+        self.items = None
+
+    @property
+    def label(self):
+        return self.name.replace('_', ' ').title()
+
+
+class PresetRegistry(object):
+    '''
+    Cached index of the preset checklists
+    '''
+
+    def __init__(self, directories = None):
+        self.directories = list(directories) if directories else default_preset_dirs()
+        self._presets = None
+
+    def scan(self):
+        '''
+        Lists the preset folders, keeping parsed presets whose file is unchanged
+        '''
+        previous = self._presets or {}
+        self._presets = {}
+
+        for directory in self.directories:
+            if (not os.path.isdir(directory)):
+                continue
+
+            for each_file in os.listdir(directory):
+                if (not each_file.lower().endswith(PRESET_EXTENSION)):
+                    continue
+
+                path = os.path.join(directory, each_file)
+                name = os.path.splitext(each_file)[0].lower()
+                mtime = os.path.getmtime(path)
+
+                cached = previous.get(name)
+                if ((cached) and (cached.path == path) and (cached.mtime == mtime)):
+                    self._presets[name] = cached
+                else:
+                    self._presets[name] = Preset(name, path, mtime)
+
+    def _index(self):
+        if (self._presets is None):
+            self.scan()
+        return self._presets
+
+    def names(self):
+        '''
+        Returns the preset names in alphabetical order
+        '''
+        return sorted(self._index())
+
+    def preset(self, name):
+        '''
+        Returns the Preset for name, or None
+        '''
+        return self._index().get(name.lower())
+
+    def get(self, name):
+        '''
+        Returns the header info and fresh records of a preset
+        '''
+        preset = self.preset(name)
+        if (preset is None):
+            raise KeyError('Specified preset does not exist: {}'.format(name))
+
+        if (preset.items is None):
+            info, records = storage.read_checklist(preset.path)
+            preset.info = info
+            #   Every checklist made from a preset gets its own uids
+            preset.items = [record.to_dict() for record in records]
+            for each in preset.items:
+                del each['id']
+
+        return dict(preset.info), [ChecklistRecord.from_dict(each) for each in preset.items]
+
+    def save(self, name, data, directory = None):
+        '''
+        Writes a preset and adds it to the registry without rescanning
+
+        data is the checklist file contents, header first
+        '''
+        directory = directory or USER_PRESET_DIR
+        if (not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        path = os.path.join(directory, name + PRESET_EXTENSION)
+        storage.write_checklist(path, data)
+
+        preset = Preset(name.lower(), path, os.path.getmtime(path))
+        preset.info = dict(data[0])
+        preset.items = list(data[1:])
+        self._index()[preset.name] = preset
+
+        return preset
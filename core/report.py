@@ -0,0 +1,223 @@
+'''
+Report @ core
+
+Headless completion report over a folder tree of checklist files. Files are
+parsed in parallel with a process pool, no maya or Qt needed.
+
+=========================================================
+@command:
+-----------------------
+python -m mayaChecklist.core.report /shows --output report.json
+python -m mayaChecklist.core.report /shows --format csv --level shows
+-----------------------
+
+@notes:
+*   Shows are named after the first folder(s) under the root folder, see
+    --show-depth.
+*   Unchecked notes are counted per frame bucket of --bucket frames, by
+    the note's first frame. Notes without a frame go in the 'none' bucket.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import sys
+import csv
+import json
+import argparse
+import multiprocessing
+from collections import defaultdict
+
+from mayaChecklist.core import storage
+
+BUCKET_SIZE = 100
+NO_FRAME_BUCKET = 'none'
+
+COUNT_FIELDS = ('total', 'checked', 'unchecked')
+
+
+def summarize_checklist(path, bucket_size = BUCKET_SIZE):
+    '''
+    Returns the completion counts of one checklist file
+    '''
+    summary = {'path' : path,
+        'name' : None,
+        'total' : 0,
+        'checked' : 0,
+        'unchecked' : 0,
+        'colors' : defaultdict(int),
+        'unchecked_frames' : defaultdict(int),
+        'error' : None}
+
+    try:
+        for i, entry in enumerate(storage.iter_checklist(path)):
+            if (i == 0):
+                if ((not isinstance(entry, dict)) or ('checklist_name' not in entry)):
+                    raise ValueError('Not a checklist file')
+                summary['name'] = entry['checklist_name']
+                continue
+
+            summary['total'] += 1
+            summary['colors'][entry.get('color') or 'Default'] += 1
+
+            if (entry.get('check')):
+                summary['checked'] += 1
+                continue
+
+            summary['unchecked'] += 1
+            frame = entry.get('frame')
+            if (frame is None):
+                bucket = NO_FRAME_BUCKET
+            else:
+                bucket = str(int(frame) // bucket_size * bucket_size)
+            summary['unchecked_frames'][bucket] += 1
+
+    except Exception as error:
+        summary['error'] = '{}: {}'.format(type(error).__name__, error)
+
+    summary['colors'] = dict(summary['colors'])
+    summary['unchecked_frames'] = dict(summary['unchecked_frames'])
+    return summary
+
+
+def _summarize(job):
+    '''
+    Pool worker, job is (path, bucket_size)
+    '''
+    return summarize_checklist(*job)
+
+
+def show_name(path, root, depth = 1):
+    '''
+    Returns the show a checklist belongs to, from its folders under root
+    '''
+    parts = os.path.relpath(os.path.dirname(path), root).split(os.sep)
+    parts = [each for each in parts if (each not in ('', os.curdir))]
+    return '/'.join(parts[:depth]) or os.curdir
+
+
+def _new_totals():
+    return {'files' : 0,
+        'errors' : 0,
+        'total' : 0,
+        'checked' : 0,
+        'unchecked' : 0,
+        'colors' : defaultdict(int),
+        'unchecked_frames' : defaultdict(int)}
+
+
+def _add_to_totals(totals, summary):
+    totals['files'] += 1
+    if (summary['error']):
+        totals['errors'] += 1
+        return
+
+    for field in COUNT_FIELDS:
+        totals[field] += summary[field]
+    for color, count in summary['colors'].items():
+        totals['colors'][color] += count
+    for bucket, count in summary['unchecked_frames'].items():
+        totals['unchecked_frames'][bucket] += count
+
+
+def _plain_totals(totals):
+    totals = dict(totals)
+    totals['colors'] = dict(totals['colors'])
+    totals['unchecked_frames'] = dict(totals['unchecked_frames'])
+    return totals
+
+
+def build_report(root, jobs = None, bucket_size = BUCKET_SIZE, show_depth = 1):
+    '''
+    Summarizes every checklist under root
+
+    Returns a dict with the per file summaries, per show totals and overall totals
+    '''
+    root = os.path.abspath(root)
+    work = [(path, bucket_size) for path in storage.find_checklists(root)]
+
+    if ((jobs == 1) or (len(work) < 2)):
+        summaries = [_summarize(job) for job in work]
+    else:
+        pool = multiprocessing.Pool(processes = jobs)
+        try:
+            #   Small files, so hand them out in chunks to keep the workers busy
+            chunk_size = max(1, min(256, len(work) // ((jobs or multiprocessing.cpu_count()) * 8)))
+            summaries = list(pool.imap(_summarize, work, chunk_size))
+        finally:
+            pool.close()
+            pool.join()
+
+    shows = defaultdict(_new_totals)
+    overall = _new_totals()
+
+    for summary in summaries:
+        summary['show'] = show_name(summary['path'], root, show_depth)
+        _add_to_totals(shows[summary['show']], summary)
+        _add_to_totals(overall, summary)
+
+    return {'root' : root,
+        'bucket_size' : bucket_size,
+        'files' : summaries,
+        'shows' : dict((show, _plain_totals(totals)) for show, totals in shows.items()),
+        'total' : _plain_totals(overall)}
+
+
+def write_csv(report, outfile, level = 'files'):
+    '''
+    Writes the per file or per show counts as CSV
+    '''
+    colors = sorted(report['total']['colors'])
+    writer = csv.writer(outfile)
+
+    if (level == 'shows'):
+        writer.writerow(['show', 'files', 'errors'] + list(COUNT_FIELDS) + colors)
+        for show in sorted(report['shows']):
+            totals = report['shows'][show]
+            writer.writerow([show, totals['files'], totals['errors']] +
+                [totals[field] for field in COUNT_FIELDS] +
+                [totals['colors'].get(color, 0) for color in colors])
+        return
+
+    writer.writerow(['show', 'path', 'name'] + list(COUNT_FIELDS) + colors + ['error'])
+    for summary in report['files']:
+        writer.writerow([summary['show'], summary['path'], summary['name']] +
+            [summary[field] for field in COUNT_FIELDS] +
+            [summary['colors'].get(color, 0) for color in colors] +
+            [summary['error'] or ''])
+
+
+def main(args = None):
+    parser = argparse.ArgumentParser(description = 'Checklist completion report')
+    parser.add_argument('root', help = 'Folder to search for checklist files')
+    parser.add_argument('-o', '--output', help = 'Output file, defaults to stdout')
+    parser.add_argument('-f', '--format', choices = ('json', 'csv'), default = 'json')
+    parser.add_argument('-l', '--level', choices = ('files', 'shows'), default = 'files',
+        help = 'Rows written to CSV output')
+    parser.add_argument('-j', '--jobs', type = int, default = None,
+        help = 'Worker processes, defaults to the number of CPUs')
+    parser.add_argument('-b', '--bucket', type = int, default = BUCKET_SIZE,
+        help = 'Frames per bucket of unchecked notes')
+    parser.add_argument('-d', '--show-depth', type = int, default = 1,
+        help = 'Folder levels under root that name a show')
+    options = parser.parse_args(args)
+
+    report = build_report(options.root,
+        jobs = options.jobs,
+        bucket_size = options.bucket,
+        show_depth = options.show_depth)
+
+    outfile = open(options.output, 'w') if options.output else sys.stdout
+    try:
+        if (options.format == 'csv'):
+            write_csv(report, outfile, level = options.level)
+        else:
+            json.dump(report, outfile, indent = 2, sort_keys = True)
+            outfile.write('\n')
+    finally:
+        if (outfile is not sys.stdout):
+            outfile.close()
+
+
+if __name__ == '__main__':
+    main()
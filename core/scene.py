@@ -0,0 +1,136 @@
+'''
+Scene @ core
+
+Checklists stored inside the Maya scene. Each checklist is one fileInfo
+entry, so it is saved and opened with the scene and reading it back never
+touches the disk.
+
+=========================================================
+@command:
+-----------------------
+scene = SceneChecklists()
+key = scene.new_key()
+scene.write(key, data)
+for key in scene.keys():
+    info, records = scene.read(key)
+-----------------------
+
+@notes:
+*   data is the checklist file contents, header first. It is stored as
+    compact JSON, zlib compressed and base64 encoded so fileInfo only ever
+    holds plain ASCII.
+*   Every checklist has its own key, writing one never re-encodes the
+    others. Whoever owns a checklist decides when it needs writing, see
+    ChecklistTab.write_to_scene.
+*   write marks the scene as modified, so Maya asks to save it.
+*   cmds is looked up when first needed so a stand-in can be passed in.
+
+=========================================================
+Maya Tanaka
+'''
+import json
+import zlib
+import base64
+import binascii
+
+from mayaChecklist.core.checklist import ChecklistRecord
+
+#   fileInfo keys of checklists start with this
+KEY_PREFIX = 'mayaChecklist_'
+
+#   Marks the encoding of a stored checklist
+ENCODING = 'zlib64:'
+COMPRESSION = 6
+
+
+def encode_checklist(data):
+    '''
+    Returns checklist data as a fileInfo value
+    '''
+    text = json.dumps(data, separators = (',', ':'))
+    packed = base64.b64encode(zlib.compress(text.encode('utf-8'), COMPRESSION))
+    return ENCODING + packed.decode('ascii')
+
+
+def decode_checklist(value):
+    '''
+    Returns the checklist data of a fileInfo value, raises ValueError if it isn't one
+    '''
+    if (not value.startswith(ENCODING)):
+        raise ValueError('Not a stored checklist')
+
+    try:
+        text = zlib.decompress(base64.b64decode(value[len(ENCODING):].encode('ascii')))
+    except (zlib.error, binascii.Error, TypeError) as error:
+        raise ValueError('Damaged stored checklist: {}'.format(error))
+
+    data = json.loads(text.decode('utf-8'))
+    if ((not isinstance(data, list)) or (not data) or (not isinstance(data[0], dict))):
+        raise ValueError('Stored checklist has no header')
+    return data
+
+
+class SceneChecklists(object):
+    '''
+    Checklists in the fileInfo of the open scene
+    '''
+
+    def __init__(self, cmds = None):
+        self._cmds = cmds
+
+    @property
+    def cmds(self):
+        if (self._cmds is None):
+            import maya.cmds as mc
+            self._cmds = mc
+        return self._cmds
+
+    def keys(self):
+        '''
+        Returns the keys of every stored checklist, in the order they were added
+        '''
+        values = self.cmds.fileInfo(query = True) or []
+        return [key for key in values[0::2] if (key.startswith(KEY_PREFIX))]
+
+    def __contains__(self, key):
+        return bool(self.cmds.fileInfo(key, query = True))
+
+    def new_key(self):
+        '''
+        Returns a key no checklist in the scene uses
+        '''
+        used = set(self.keys())
+        index = len(used) + 1
+        while (KEY_PREFIX + str(index) in used):
+            index += 1
+        return KEY_PREFIX + str(index)
+
+    def read_data(self, key):
+        '''
+        Returns the stored checklist data, raises KeyError if there is none
+        '''
+        value = self.cmds.fileInfo(key, query = True)
+        if (not value):
+            raise KeyError('No checklist stored in the scene as {}'.format(key))
+        return decode_checklist(value[0])
+
+    def read(self, key):
+        '''
+        Returns the header and item records of a stored checklist
+        '''
+        data = self.read_data(key)
+        return data[0], [ChecklistRecord.from_dict(each) for each in data[1:]]
+
+    def write(self, key, data):
+        '''
+        Stores checklist data, returns the size of the stored value
+        '''
+        value = encode_checklist(data)
+        self.cmds.fileInfo(key, value)
+        self.cmds.file(modified = True)
+        return len(value)
+
+    def remove(self, key):
+        if (key in self):
+            self.cmds.fileInfo(remove = key)
+            self.cmds.file(modified = True)
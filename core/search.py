@@ -0,0 +1,441 @@
+'''
+Search @ core
+
+Full-text search over checklist notes. Notes are indexed by the trigrams
+(three letter substrings) of their text, so a query only looks at the notes
+that contain every trigram of its words.
+
+=========================================================
+@command:
+-----------------------
+index = TrigramIndex()
+feed = ChecklistSearchFeed(index, checklist)
+index.search('elbow pop')
+
+folder_index = FolderSearchIndex()
+folder_index.add_directory('/shows/abc/review')
+folder_index.refresh()
+folder_index.search('elbow pop')
+-----------------------
+
+@notes:
+*   A query matches the notes that contain all of its words, ignoring case
+    and word order. Words shorter than three letters are checked on the
+    notes the longer words match, a query of only short words reads every
+    note.
+*   ChecklistSearchFeed keeps an index in step with a ChecklistModel, one
+    note at a time.
+*   FolderSearchIndex indexes the checklist files in a set of folders. It
+    is cached in one JSON file, and only files whose size or modification
+    time changed are read again.
+*   The cache only holds the notes of each file, not their trigrams. A
+    loaded index works out the notes of a trigram the first time a query
+    needs it, by scanning every note once, see TrigramIndex.set_texts.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import json
+import tempfile
+
+from mayaChecklist.core import checklist as core_checklist
+from mayaChecklist.core import storage
+
+SEARCH_INDEX_PATH = os.environ.get('MAYACHECKLIST_SEARCH_INDEX',
+    os.path.join(os.path.expanduser('~'), '.mayaChecklist', 'search_index.json'))
+
+#   Bumped whenever the cache file layout changes, older caches are rebuilt
+CACHE_VERSION = 2
+
+
+def trigrams(text):
+    '''
+    Returns the set of three letter substrings of text
+    '''
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class TrigramIndex(object):
+    '''
+    Inverted index from trigrams to documents
+
+    Documents are any hashable key, each with one text.
+    '''
+
+    def __init__(self):
+        #   document: text
+        self.texts = {}
+        #   document: lowercase text, what queries are matched against
+        self.folded = {}
+        #   trigram: set of documents
+        self.postings = {}
+        #   True while postings only holds the trigrams that were looked up
+        self.partial = False
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __contains__(self, doc):
+        return doc in self.texts
+
+    def add(self, doc, text):
+        '''
+        Indexes text under doc, replacing what doc had before
+        '''
+        if (doc in self.texts):
+            self.remove(doc)
+
+        text = text or ''
+        folded = text.lower()
+        self.texts[doc] = text
+        self.folded[doc] = folded
+
+        postings = self.postings
+        for gram in trigrams(folded):
+            docs = postings.get(gram)
+            if (docs is None):
+                if (self.partial):
+                    #   Found by the scan once the trigram is looked up
+                    continue
+                docs = postings[gram] = set()
+            docs.add(doc)
+
+    def remove(self, doc):
+        '''
+        Drops doc from the index
+        '''
+        if (doc not in self.texts):
+            return
+
+        del self.texts[doc]
+        folded = self.folded.pop(doc)
+
+        postings = self.postings
+        for gram in trigrams(folded):
+            docs = postings.get(gram)
+            if (docs is not None):
+                docs.discard(doc)
+                if (not docs):
+                    del postings[gram]
+
+    def clear(self):
+        self.texts = {}
+        self.folded = {}
+        self.postings = {}
+        self.partial = False
+
+    def set_texts(self, texts):
+        '''
+        Replaces the index with texts, a dict of document: text
+
+        Trigrams are only worked out when a query looks them up, so setting
+        a lot of texts is quick.
+        '''
+        self.texts = texts
+        self.folded = dict((doc, text.lower()) for doc, text in texts.items())
+        self.postings = {}
+        self.partial = True
+
+    def _docs(self, gram):
+        docs = self.postings.get(gram)
+        if ((docs is None) and (self.partial)):
+            docs = self.postings[gram] = set([doc for doc, folded in self.folded.items() if (gram in folded)])
+        return docs
+
+    def search(self, query, limit = None):
+        '''
+        Returns the documents whose text contains every word of query
+        '''
+        words = query.lower().split()
+        if (not words):
+            return []
+
+        #   The trigrams of one word mostly match the same notes, so each
+        #   word only narrows the search by its rarest trigram
+        sets = []
+        for word in words:
+            grams = trigrams(word)
+            if (not grams):
+                continue
+
+            rarest = None
+            for gram in grams:
+                docs = self._docs(gram)
+                if (not docs):
+                    return []
+                if ((rarest is None) or (len(docs) < len(rarest))):
+                    rarest = docs
+            sets.append(rarest)
+
+        if (sets):
+            sets.sort(key = len)
+            candidates = sets[0]
+            for docs in sets[1:]:
+                candidates = candidates & docs
+                if (not candidates):
+                    return []
+        else:
+            candidates = self.folded
+
+        #   Check the words themselves, the trigrams could match out of order
+        folded = self.folded
+        found = []
+        for doc in candidates:
+            text = folded[doc]
+            for word in words:
+                if (word not in text):
+                    break
+            else:
+                found.append(doc)
+                if ((limit) and (len(found) >= limit)):
+                    break
+
+        return found
+
+
+class ChecklistSearchFeed(object):
+    '''
+    Keeps the notes of a ChecklistModel in a TrigramIndex
+
+    Documents are (checklist, record) pairs.
+    '''
+
+    def __init__(self, index, checklist):
+        self.index = index
+        self.checklist = checklist
+
+        self._add_rows(0, len(checklist) - 1)
+        self.checklist.subscribe(self._checklist_changed)
+
+    def detach(self):
+        '''
+        Stops following the checklist and drops its notes from the index
+        '''
+        self.checklist.unsubscribe(self._checklist_changed)
+        self._remove_rows(0, len(self.checklist) - 1)
+
+    def _add_rows(self, first, last):
+        checklist = self.checklist
+        for record in checklist.items[first:last + 1]:
+            self.index.add((checklist, record), record.text)
+
+    def _remove_rows(self, first, last):
+        checklist = self.checklist
+        for record in checklist.items[first:last + 1]:
+            self.index.remove((checklist, record))
+
+    def _checklist_changed(self, event, first, last):
+        if (event in (core_checklist.INSERT, core_checklist.CHANGE)):
+            self._add_rows(first, last)
+        elif (event == core_checklist.BEFORE_REMOVE):
+            self._remove_rows(first, last)
+        elif (event == core_checklist.BEFORE_RESET):
+            self._remove_rows(0, len(self.checklist) - 1)
+        elif (event == core_checklist.RESET):
+            self._add_rows(0, len(self.checklist) - 1)
+
+
+class FolderSearchIndex(object):
+    '''
+    Search index over the checklist files in a set of folders
+
+    Documents are numbers, doc_location turns one into (path, row).
+    '''
+
+    def __init__(self, path = None):
+        self.path = path or SEARCH_INDEX_PATH
+
+        self.directories = []
+        #   path: {'mtime', 'size', 'name', 'docs'}
+        self.files = {}
+        #   document: (path, row)
+        self.locations = {}
+        self.index = TrigramIndex()
+
+        self._next_doc = 0
+        self._loaded = False
+
+    def __len__(self):
+        return len(self.index)
+
+    def load(self):
+        '''
+        Reads the cache file, a missing, damaged or outdated one is an empty index
+        '''
+        self._loaded = True
+
+        try:
+            with open(self.path) as infile:
+                data = json.load(infile)
+            if (data.get('version') != CACHE_VERSION):
+                return
+
+            directories = data['directories']
+            cached_files = data['files']
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            return
+
+        #   Documents are numbered again, they are only kept in memory
+        files = {}
+        locations = {}
+        texts = {}
+        doc = 0
+        try:
+            for path, info in cached_files.items():
+                docs = list(range(doc, doc + len(info['texts'])))
+                for row, text in enumerate(info['texts']):
+                    locations[doc] = (path, row)
+                    texts[doc] = text
+                    doc += 1
+
+                files[path] = {'mtime' : info['mtime'],
+                    'size' : info['size'],
+                    'name' : info['name'],
+                    'docs' : docs}
+        except (KeyError, TypeError, AttributeError):
+            return
+
+        self.directories = directories
+        self.files = files
+        self.locations = locations
+        self.index.set_texts(texts)
+        self._next_doc = doc
+
+    def _ensure_loaded(self):
+        if (not self._loaded):
+            self.load()
+
+    def save(self):
+        '''
+        Writes the cache file atomically
+        '''
+        texts = self.index.texts
+        files = dict((path, {'mtime' : info['mtime'],
+            'size' : info['size'],
+            'name' : info['name'],
+            'texts' : [texts[doc] for doc in info['docs']]}) for path, info in self.files.items())
+
+        data = {'version' : CACHE_VERSION,
+            'directories' : self.directories,
+            'files' : files}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if (not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        handle, temp_path = tempfile.mkstemp(suffix = '.tmp', dir = directory)
+        try:
+            with os.fdopen(handle, 'w') as outfile:
+                json.dump(data, outfile, separators = (',', ':'))
+            storage.replace_file(temp_path, self.path)
+        except:
+            if (os.path.exists(temp_path)):
+                os.remove(temp_path)
+            raise
+
+    def add_directory(self, directory):
+        self._ensure_loaded()
+
+        directory = os.path.abspath(directory)
+        if (directory not in self.directories):
+            self.directories.append(directory)
+
+    def remove_directory(self, directory):
+        self._ensure_loaded()
+
+        directory = os.path.abspath(directory)
+        if (directory in self.directories):
+            self.directories.remove(directory)
+
+    def refresh(self):
+        '''
+        Indexes new and changed files, drops deleted ones
+
+        Returns True if anything changed, the cache file is saved if so
+        '''
+        self._ensure_loaded()
+
+        found = set()
+        changed = False
+
+        for directory in self.directories:
+            for path in storage.find_checklists(directory):
+                if (path == self.path):
+                    continue
+                found.add(path)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                info = self.files.get(path)
+                if ((info) and (info['mtime'] == stat.st_mtime) and (info['size'] == stat.st_size)):
+                    continue
+
+                self._remove_file(path)
+                self._add_file(path, stat)
+                changed = True
+
+        for path in [path for path in self.files if (path not in found)]:
+            self._remove_file(path)
+            changed = True
+
+        if (changed):
+            self.save()
+
+        return changed
+
+    def _add_file(self, path, stat):
+        name = None
+        texts = []
+
+        try:
+            for i, entry in enumerate(storage.iter_checklist(path)):
+                if (i == 0):
+                    name = entry.get('checklist_name')
+                else:
+                    texts.append(entry.get('text') or '')
+        except Exception:
+            #   Unreadable files are kept without notes until they change
+            texts = []
+
+        docs = []
+        for row, text in enumerate(texts):
+            doc = self._next_doc
+            self._next_doc += 1
+
+            self.index.add(doc, text)
+            self.locations[doc] = (path, row)
+            docs.append(doc)
+
+        self.files[path] = {'mtime' : stat.st_mtime,
+            'size' : stat.st_size,
+            'name' : name,
+            'docs' : docs}
+
+    def _remove_file(self, path):
+        info = self.files.pop(path, None)
+        if (not info):
+            return
+
+        for doc in info['docs']:
+            self.index.remove(doc)
+            self.locations.pop(doc, None)
+
+    def doc_location(self, doc):
+        return self.locations[doc]
+
+    def search(self, query, limit = None):
+        '''
+        Returns (path, row, text) for the notes that contain every word of query
+        '''
+        self._ensure_loaded()
+
+        found = []
+        for doc in self.index.search(query, limit = limit):
+            path, row = self.locations[doc]
+            found.append((path, row, self.index.texts[doc]))
+
+        return found
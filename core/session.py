@@ -0,0 +1,105 @@
+'''
+Session @ core
+
+Closed checklist tabs, kept in a small session file so they can be reopened
+later, in this Maya session or the next one.
+
+=========================================================
+@command:
+-----------------------
+session = ChecklistSession()
+session.push_closed({'name' : 'Shot 010', 'path' : path})
+entry = session.pop_closed()
+-----------------------
+
+@notes:
+*   A closed tab that matches its checklist file is stored as the file's
+    path only. A tab with unsaved changes is stored with its items.
+*   The session file is only read the first time the closed tabs are
+    needed, and only the newest MAX_CLOSED tabs are kept.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import json
+import tempfile
+
+from mayaChecklist.core import storage
+
+SESSION_PATH = os.environ.get('MAYACHECKLIST_SESSION',
+    os.path.join(os.path.expanduser('~'), '.mayaChecklist', 'session.json'))
+
+#   Closed tabs kept in the session file
+MAX_CLOSED = 10
+
+
+class ChecklistSession(object):
+    '''
+    Most recently closed checklist tabs, newest first
+    '''
+
+    def __init__(self, path = None):
+        self.path = path or SESSION_PATH
+        self._closed = None
+
+    @property
+    def closed(self):
+        if (self._closed is None):
+            self.load()
+        return self._closed
+
+    def load(self):
+        '''
+        Reads the session file, a missing or damaged file is an empty session
+        '''
+        self._closed = []
+
+        try:
+            with open(self.path) as infile:
+                data = json.load(infile)
+        except (IOError, OSError, ValueError):
+            return
+
+        if (isinstance(data, dict)):
+            self._closed = [each for each in data.get('closed', []) if (isinstance(each, dict))]
+
+    def save(self):
+        '''
+        Writes the session file atomically
+        '''
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if (not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        handle, temp_path = tempfile.mkstemp(suffix = '.tmp', dir = directory)
+        try:
+            with os.fdopen(handle, 'w') as outfile:
+                json.dump({'closed' : self.closed}, outfile)
+            storage.replace_file(temp_path, self.path)
+        except:
+            if (os.path.exists(temp_path)):
+                os.remove(temp_path)
+            raise
+
+    def push_closed(self, entry):
+        '''
+        Remembers a closed tab
+        '''
+        closed = self.closed
+
+        #   Reopening the same file twice should not list it twice
+        if (entry.get('path')):
+            closed[:] = [each for each in closed if (each.get('path') != entry['path'])]
+
+        closed.insert(0, entry)
+        del closed[MAX_CLOSED:]
+        self.save()
+
+    def pop_closed(self, index = 0):
+        '''
+        Forgets a closed tab and returns it
+        '''
+        entry = self.closed.pop(index)
+        self.save()
+        return entry
@@ -0,0 +1,250 @@
+'''
+Sorting @ core
+
+Sticky multi-key sort of a ChecklistModel. Once a checklist is sorted it
+stays sorted: new records are inserted at their sorted rows and edited
+records can be moved back into place, without sorting everything again.
+
+=========================================================
+@command:
+-----------------------
+checklist_sort = ChecklistSort(checklist)
+checklist_sort.set_keys(('frame', 'color', 'checkstate'))
+checklist_sort.add(records)
+checklist.update(0, frame = '1200')
+checklist_sort.place()
+-----------------------
+
+@notes:
+*   Keys are typed: frames compare as numbers, so '20' comes before '100',
+    and records without a frame go last. Unchecked records come before
+    checked ones, colors and texts compare as text.
+*   The key of a record is worked out once and kept on the record as
+    sort_key. It is only worked out again when the record is added or
+    changed, or the keys change.
+*   add finds the rows of new records with bisect and inserts them with
+    one insert per row, or sorts once when there are a lot of them.
+*   ChecklistSort never changes the checklist from inside a notification.
+    Records whose key changed are collected in changed until place is
+    called, see ChecklistTab._place_changed.
+
+=========================================================
+Maya Tanaka
+'''
+import bisect
+import operator
+
+from mayaChecklist.core import checklist as core_checklist
+
+
+def frame_key(record):
+    if (record.frame is None):
+        return (True, 0, 0)
+
+    frame = int(record.frame)
+    return (False, frame, frame if (record.frame_end is None) else int(record.frame_end))
+
+
+def checkstate_key(record):
+    return (record.check,)
+
+
+def color_key(record):
+    return (record.color,)
+
+
+def text_key(record):
+    return (record.text.lower(),)
+
+
+#   Sort keys by name
+SORT_KEYS = {'frame' : frame_key,
+    'checkstate' : checkstate_key,
+    'color' : color_key,
+    'text' : text_key}
+
+#   New records, as a fraction of the checklist, above which one sort beats inserting each
+FULL_SORT_RATIO = 0.25
+#   Changed records above which one sort beats moving each
+MAX_PLACE = 64
+
+get_sort_key = operator.attrgetter('sort_key')
+
+
+class _SortKeys(object):
+    '''
+    The sort keys of a list of records as a sequence, for bisect
+    '''
+
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, row):
+        return self.items[row].sort_key
+
+
+class ChecklistSort(object):
+    '''
+    Keeps a ChecklistModel sorted by one or more keys
+    '''
+
+    def __init__(self, checklist, keys = ()):
+        self.checklist = checklist
+
+        #   Key names, most significant first, empty when not sorting
+        self.keys = ()
+        self._functions = []
+
+        #   Records whose sort key changed since place was last called
+        self.changed = []
+
+        self.checklist.subscribe(self._checklist_changed)
+        if (keys):
+            self.set_keys(keys)
+
+    def detach(self):
+        self.checklist.unsubscribe(self._checklist_changed)
+
+    def key(self, record):
+        '''
+        Works out the sort key of a record
+        '''
+        key = ()
+        for function in self._functions:
+            key += function(record)
+        return key
+
+    def set_keys(self, keys, sort = True):
+        '''
+        Sorts by keys from now on, sort False only remembers them
+
+        No keys stops sorting, the records stay where they are. Raises
+        KeyError for a key that isn't in SORT_KEYS.
+        '''
+        self._functions = [SORT_KEYS[key] for key in keys]
+        self.keys = tuple(keys)
+        self.changed = []
+
+        if (not self.keys):
+            return
+
+        for record in self.checklist:
+            record.sort_key = self.key(record)
+
+        if (sort):
+            self.sort()
+
+    def in_order(self):
+        '''
+        True if every record is at its sorted row
+        '''
+        items = self.checklist.items
+        for row in range(1, len(items)):
+            if (items[row].sort_key < items[row - 1].sort_key):
+                return False
+        return True
+
+    def sort(self):
+        '''
+        Sorts the whole checklist, returns False if it already was sorted
+        '''
+        self.changed = []
+        if ((not self.keys) or (self.in_order())):
+            return False
+
+        self.checklist.sort(key = get_sort_key)
+        return True
+
+    def insert_row(self, record):
+        '''
+        Returns the sorted row of a record that isn't in the checklist, after any equal records
+        '''
+        return bisect.bisect_right(_SortKeys(self.checklist.items), record.sort_key)
+
+    def add(self, records):
+        '''
+        Inserts records at their sorted rows, at the end when not sorting
+        '''
+        records = list(records)
+        if ((not self.keys) or (not records)):
+            self.checklist.extend(records)
+            return
+
+        if (len(records) > len(self.checklist) * FULL_SORT_RATIO):
+            self.checklist.extend(records)
+            self.sort()
+            return
+
+        for record in records:
+            record.sort_key = self.key(record)
+        records.sort(key = get_sort_key)
+
+        #   Rows in the checklist as it is, records going to the same row are inserted together
+        keys = _SortKeys(self.checklist.items)
+        runs = []
+        for record in records:
+            row = bisect.bisect_right(keys, record.sort_key)
+            if ((runs) and (runs[-1][0] == row)):
+                runs[-1][1].append(record)
+            else:
+                runs.append((row, [record]))
+
+        #   Bottom up, so the rows above stay put
+        for row, run in reversed(runs):
+            self.checklist.insert(row, run)
+
+    def place(self):
+        '''
+        Moves the changed records to their sorted rows
+        '''
+        changed, self.changed = self.changed, []
+        if ((not self.keys) or (not changed)):
+            return
+
+        if (len(changed) > MAX_PLACE):
+            self.sort()
+            return
+
+        for record in changed:
+            try:
+                row = self.checklist.row_of(record)
+            except ValueError:
+                #   Removed since it changed
+                continue
+
+            if (self._fits(row)):
+                continue
+
+            self.checklist.remove(row)
+            self.checklist.insert(self.insert_row(record), [record])
+
+    def _fits(self, row):
+        items = self.checklist.items
+        key = items[row].sort_key
+        return (((row == 0) or (items[row - 1].sort_key <= key)) and
+            ((row == len(items) - 1) or (key <= items[row + 1].sort_key)))
+
+    def _checklist_changed(self, event, first, last):
+        if (not self.keys):
+            return
+
+        if (event == core_checklist.INSERT):
+            for record in self.checklist.items[first:last + 1]:
+                record.sort_key = self.key(record)
+
+        elif (event == core_checklist.CHANGE):
+            for record in self.checklist.items[first:last + 1]:
+                key = self.key(record)
+                if (key != record.sort_key):
+                    record.sort_key = key
+                    self.changed.append(record)
+
+        elif (event == core_checklist.RESET):
+            for record in self.checklist.items:
+                record.sort_key = self.key(record)
+            self.changed = []
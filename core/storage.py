@@ -0,0 +1,459 @@
+'''
+Storage @ core
+
+Reading and writing checklist files. A checklist file is a JSON array: the
+first entry is the header dict (checklist_name, save_directory, preset) and
+every other entry is one checklist item.
+
+=========================================================
+@command:
+-----------------------
+loader = ChecklistLoader(path)
+loader.start()
+for message, data in loader.poll():
+    ...
+-----------------------
+
+@notes:
+*   iter_checklist decodes the array one entry at a time, so the first
+    items are available before the whole file has been read.
+*   ChecklistLoader runs iter_checklist on a worker thread. The ui polls it
+    from a timer, nothing in here touches Qt.
+*   Files ending in .mcb use the binary format from core.binary, both
+    for reading and writing. convert_checklist switches between the two.
+*   write_checklist writes to a temp file next to the target and renames it
+    into place, so a failed save never leaves a truncated checklist behind.
+    ChecklistWriter does this on a worker thread, one file at a time.
+*   save_checklist is how the ui saves: it holds the lock file of the
+    checklist while writing, and if the file changed since it was read,
+    merges those changes in instead of overwriting them, see core.merge.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+import json
+import logging
+import tempfile
+import threading
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from mayaChecklist.core import binary
+from mayaChecklist.core import merge
+from mayaChecklist.core.locking import FileLock
+from mayaChecklist.core.checklist import ChecklistRecord, content_uid
+
+logger = logging.getLogger('MayaChecklist.storage')
+
+CHUNK_SIZE = 64 * 1024
+
+CHECKLIST_EXTENSIONS = ('.json', binary.BINARY_EXTENSION)
+
+#   Fields every checklist header has
+HEADER_FIELDS = ('checklist_name', 'save_directory', 'preset')
+
+#   Loader messages
+HEADER = 'header'
+ITEMS = 'items'
+DONE = 'done'
+ERROR = 'error'
+
+
+def _default_mode():
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+#   Permissions for new files, temp files are only readable by their owner
+DEFAULT_MODE = _default_mode()
+
+
+def iter_checklist(path, chunk_size = CHUNK_SIZE, progress = None):
+    '''
+    Yields the header and then every item dict of a checklist file
+
+    progress is called with the number of characters read so far
+    '''
+    if (binary.is_binary_checklist(path)):
+        with binary.BinaryChecklist(path) as binary_checklist:
+            for entry in binary_checklist.iter_entries():
+                yield entry
+
+        if (progress):
+            progress(os.path.getsize(path))
+        return
+
+    decoder = json.JSONDecoder()
+
+    with open(path) as infile:
+        buffer = ''
+        position = 0
+        read = 0
+        started = False
+        end_of_file = False
+
+        while True:
+            #   Skip to the start of the next entry
+            while ((position < len(buffer)) and (buffer[position] in ' \t\r\n,')):
+                position += 1
+
+            if (position < len(buffer)):
+                if (not started):
+                    if (buffer[position] != '['):
+                        raise ValueError('Not a checklist file: {}'.format(path))
+                    started = True
+                    position += 1
+                    continue
+
+                if (buffer[position] == ']'):
+                    return
+
+                #   Entries are dicts, so one that runs past the buffer fails to decode
+                try:
+                    entry, position = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if (end_of_file):
+                        raise
+                else:
+                    yield entry
+                    continue
+
+            elif (end_of_file):
+                raise ValueError('Unexpected end of checklist file: {}'.format(path))
+
+            #   Read more of the file
+            chunk = infile.read(chunk_size)
+            if (not chunk):
+                end_of_file = True
+
+            read += len(chunk)
+            if (progress):
+                progress(read)
+
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def iter_records(path, chunk_size = CHUNK_SIZE, progress = None):
+    '''
+    Yields the header and then a ChecklistRecord for every item of a checklist file
+
+    Binary files build the records straight from their columns.
+    '''
+    if (binary.is_binary_checklist(path)):
+        with binary.BinaryChecklist(path) as binary_checklist:
+            yield binary_checklist.info
+            for record in binary_checklist.iter_records():
+                yield record
+
+        if (progress):
+            progress(os.path.getsize(path))
+        return
+
+    entries = iter_checklist(path, chunk_size = chunk_size, progress = progress)
+    for entry in entries:
+        yield entry
+        break
+    for row, entry in enumerate(entries):
+        record = ChecklistRecord.from_dict(entry)
+        if (not entry.get('id')):
+            record.uid = content_uid(row, record)
+        yield record
+
+
+def check_header(header, path):
+    '''
+    Raises ValueError if header isn't the header of a checklist file
+    '''
+    if (not isinstance(header, dict)):
+        raise ValueError('Checklist file has no header: {}'.format(path))
+
+    missing = [field for field in HEADER_FIELDS if (field not in header)]
+    if (missing):
+        raise ValueError('Checklist header is missing {}: {}'.format(', '.join(missing), path))
+
+
+def find_checklists(root):
+    '''
+    Yields every checklist file under root
+    '''
+    for directory, folders, files in os.walk(root):
+        folders.sort()
+        for each_file in sorted(files):
+            if (each_file.lower().endswith(CHECKLIST_EXTENSIONS)):
+                yield os.path.join(directory, each_file)
+
+
+def read_checklist(path):
+    '''
+    Returns the header and item records of a checklist file
+    '''
+    header = None
+    records = []
+
+    for i, entry in enumerate(iter_records(path)):
+        if (i == 0):
+            check_header(entry, path)
+            header = entry
+        else:
+            records.append(entry)
+
+    return header, records
+
+
+def checklist_data(info, records):
+    '''
+    Returns the contents of a checklist file for a header dict and records
+    '''
+    data = [info]
+    data.extend(record.to_dict() for record in records)
+    return data
+
+
+def write_checklist(path, data):
+    '''
+    Writes checklist data to path atomically
+    '''
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix = '.{}.'.format(os.path.basename(path)),
+        suffix = '.tmp',
+        dir = directory)
+
+    try:
+        if (path.lower().endswith(binary.BINARY_EXTENSION)):
+            with os.fdopen(handle, 'wb') as outfile:
+                outfile.write(binary.dumps(data))
+                outfile.flush()
+                os.fsync(outfile.fileno())
+        else:
+            with os.fdopen(handle, 'w') as outfile:
+                json.dump(data, outfile)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+
+        #   Keep the permissions of the file being replaced
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = DEFAULT_MODE
+        os.chmod(temp_path, mode)
+
+        replace_file(temp_path, path)
+    except:
+        if (os.path.exists(temp_path)):
+            os.remove(temp_path)
+        raise
+
+
+def file_stamp(path):
+    '''
+    Returns what tells if a file changed, None if it doesn't exist
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (getattr(stat, 'st_mtime_ns', stat.st_mtime), stat.st_size)
+
+
+def save_checklist(path, data, base = None, stamp = None):
+    '''
+    Writes checklist data to path under its lock file
+
+    base holds the item dicts the data was edited from and stamp the
+    file_stamp of path when they were read. If the file changed since,
+    its changes are merged into data before writing.
+
+    Returns the data written, the stamp of the file after writing and the
+    conflicting item ids, conflicts is None if nothing was merged.
+    '''
+    with FileLock(path):
+        conflicts = None
+        current = file_stamp(path)
+
+        if ((base is not None) and (current is not None) and (current != stamp)):
+            theirs = list(iter_checklist(path))[1:]
+            items, conflicts = merge.merge_items(base, data[1:], theirs)
+            data = [data[0]] + items
+
+        write_checklist(path, data)
+        return data, file_stamp(path), conflicts
+
+
+def convert_checklist(source, target):
+    '''
+    Converts between JSON and binary checklist files, by target extension
+    '''
+    write_checklist(target, list(iter_checklist(source)))
+
+
+def replace_file(source, target):
+    '''
+    Renames source over target
+    '''
+    if (hasattr(os, 'replace')):
+        os.replace(source, target)
+        return
+
+    #   Python 2 can't rename over an existing file on Windows
+    if ((os.name == 'nt') and (os.path.exists(target))):
+        os.remove(target)
+    os.rename(source, target)
+
+
+class ChecklistWriter(object):
+    '''
+    Writes checklist files on a worker thread, in the order they were submitted
+    '''
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, path, data, callback = None, base = None, stamp = None):
+        '''
+        Queues data to be written to path with save_checklist
+
+        callback(path, error, result) is called from the worker thread once
+        the file is in place. error is None if the write succeeded, result is
+        what save_checklist returned.
+        '''
+        with self._lock:
+            if ((self._thread is None) or (not self._thread.is_alive())):
+                self._thread = threading.Thread(target = self._run, name = 'ChecklistWriter')
+                self._thread.daemon = True
+                self._thread.start()
+
+        self._queue.put((path, data, callback, base, stamp))
+
+    def wait(self):
+        '''
+        Blocks until every submitted file has been written
+        '''
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            path, data, callback, base, stamp = self._queue.get()
+
+            error = None
+            result = None
+            try:
+                result = save_checklist(path, data, base = base, stamp = stamp)
+            except Exception as write_error:
+                error = write_error
+
+            #   A failing callback mustn't stop the thread, the saves queued after it would never be written
+            try:
+                if (callback):
+                    callback(path, error, result)
+            except Exception:
+                logger.exception('Checklist save callback failed: {}'.format(path))
+            finally:
+                self._queue.task_done()
+
+
+class ChecklistLoader(object):
+    '''
+    Parses a checklist file on a worker thread and hands it over in batches
+    '''
+
+    #   The first batch is small so the first screenful shows up right away
+    FIRST_BATCH_SIZE = 50
+    BATCH_SIZE = 1000
+
+    def __init__(self, path, batch_size = None):
+        self.path = path
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+        self.total_size = max(1, os.path.getsize(path))
+        #   The file as it was when loading started
+        self.stamp = file_stamp(path)
+        self.read_size = 0
+
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    @property
+    def progress(self):
+        '''
+        Fraction of the file parsed so far
+        '''
+        return min(1.0, float(self.read_size) / self.total_size)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def start(self):
+        '''
+        Starts parsing on a worker thread
+        '''
+        self._thread = threading.Thread(target = self._run, name = 'ChecklistLoader')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def cancel(self):
+        '''
+        Stops parsing, messages that are still queued are dropped
+        '''
+        self._cancelled.set()
+
+    def poll(self, max_items = None):
+        '''
+        Returns the queued (message, data) pairs without blocking
+
+        Stops early once max_items records have been returned
+        '''
+        messages = []
+        count = 0
+
+        while ((max_items is None) or (count < max_items)):
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            messages.append(message)
+            if (message[0] == ITEMS):
+                count += len(message[1])
+
+        return messages
+
+    def _set_read_size(self, size):
+        self.read_size = size
+
+    def _run(self):
+        batch = []
+        batch_size = self.FIRST_BATCH_SIZE
+
+        try:
+            for i, entry in enumerate(iter_records(self.path, progress = self._set_read_size)):
+                if (self.cancelled):
+                    return
+
+                if (i == 0):
+                    check_header(entry, self.path)
+                    self._queue.put((HEADER, entry))
+                    continue
+
+                batch.append(entry)
+                if (len(batch) >= batch_size):
+                    self._queue.put((ITEMS, batch))
+                    batch = []
+                    batch_size = self.batch_size
+
+            if (batch):
+                self._queue.put((ITEMS, batch))
+
+        except Exception as error:
+            self._queue.put((ERROR, error))
+            return
+
+        self._queue.put((DONE, None))
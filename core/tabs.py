@@ -0,0 +1,79 @@
+'''
+Tabs @ core
+
+Registry of the open checklist tabs of one window. Tabs are keyed by an id
+given when they are added, which stays the same while tabs are moved or
+other tabs are closed.
+
+=========================================================
+@command:
+-----------------------
+tabs = TabRegistry()
+tab_id = tabs.add(tab)
+tabs.set_current(tab)
+tabs.current
+tabs.remove(tab)
+-----------------------
+
+@notes:
+*   The registry doesn't know the order of the tabs, the tab widget does.
+*   Every tab gets a tab_id attribute, ids are never reused.
+
+=========================================================
+Maya Tanaka
+'''
+
+
+class TabRegistry(object):
+    '''
+    Open tabs keyed by tab id, and the current tab
+    '''
+
+    def __init__(self):
+        #   tab_id: tab
+        self.tabs = {}
+        self.current = None
+
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def __iter__(self):
+        return iter(list(self.tabs.values()))
+
+    def __contains__(self, tab):
+        return self.tabs.get(getattr(tab, 'tab_id', None)) is tab
+
+    def add(self, tab):
+        '''
+        Registers tab and returns its id
+        '''
+        tab_id = self._next_id
+        self._next_id += 1
+
+        tab.tab_id = tab_id
+        self.tabs[tab_id] = tab
+        return tab_id
+
+    def remove(self, tab):
+        '''
+        Forgets tab, it stops being the current tab
+        '''
+        if (tab not in self):
+            raise KeyError('Tab is not registered: {}'.format(tab))
+
+        del self.tabs[tab.tab_id]
+        if (self.current is tab):
+            self.current = None
+
+    def get(self, tab_id, default = None):
+        return self.tabs.get(tab_id, default)
+
+    def set_current(self, tab):
+        '''
+        Makes tab the current tab, None when there is none
+        '''
+        if ((tab is not None) and (tab not in self)):
+            raise KeyError('Tab is not registered: {}'.format(tab))
+        self.current = tab
@@ -0,0 +1,411 @@
+'''
+Undo @ core
+
+Undo and redo for a ChecklistModel. Every change to the checklist is kept
+as the delta that reverses it, not as a copy of the checklist, so undoing
+a change to thousands of items is one change back.
+
+=========================================================
+@command:
+-----------------------
+undo_stack = UndoStack(checklist)
+checklist.sort(key = lambda item : item.frame)
+undo_stack.undo()
+undo_stack.redo()
+
+with undo_stack.group('Paste'):
+    checklist.extend(records)
+    checklist.update(0, check = True)
+
+with undo_stack.amend():
+    checklist.remove(0)
+-----------------------
+
+@notes:
+*   The stack follows the checklist through its notifications, anything
+    that edits the checklist can be undone. Turn recording off while
+    loading, a freshly loaded checklist has nothing to undo.
+*   Deltas hold the records themselves, not copies. Records are only ever
+    changed through the checklist, and undo goes back through every change
+    in order, so each record is as the delta expects when it is undone.
+*   Check toggles within COALESCE_SECONDS of each other are undone
+    together, as are repeated edits of the same row.
+*   History is capped at max_bytes and max_commands, the oldest commands
+    are dropped first. The last command is always kept.
+
+=========================================================
+Maya Tanaka
+'''
+import time
+import collections
+import contextlib
+
+from mayaChecklist.core import checklist as core_checklist
+
+#   History kept per checklist
+MAX_BYTES = 32 * 1024 * 1024
+MAX_COMMANDS = 500
+
+#   Seconds between edits that are undone together
+COALESCE_SECONDS = 1.0
+
+#   Rough bytes held by a delta, per record, per row of old values and per
+#   row of a saved order
+DELTA_BYTES = 100
+RECORD_BYTES = 160
+VALUES_BYTES = 80
+ROW_BYTES = 8
+
+#   Deltas, each reverses one checklist notification
+#   (REMOVE, first, last)
+REMOVE = 'remove'
+#   (INSERT, first, records)
+INSERT = 'insert'
+#   (UPDATE, first, values), a ChecklistRecord.values tuple per row
+UPDATE = 'update'
+#   (ORDER, records)
+ORDER = 'order'
+#   (RESET, records)
+RESET = 'reset'
+
+#   Commands that merge with the command before them
+COALESCED = ('Check', 'Edit')
+
+#   Index of check in ChecklistRecord.values
+CHECK_FIELD = core_checklist.FIELDS.index('check')
+
+
+def delta_size(delta):
+    '''
+    Returns the rough bytes held by a delta
+    '''
+    kind = delta[0]
+    if (kind == REMOVE):
+        return DELTA_BYTES
+    if (kind == INSERT):
+        return DELTA_BYTES + len(delta[2]) * RECORD_BYTES
+    if (kind == UPDATE):
+        return DELTA_BYTES + len(delta[2]) * VALUES_BYTES
+    if (kind == ORDER):
+        return DELTA_BYTES + len(delta[1]) * ROW_BYTES
+    return DELTA_BYTES + len(delta[1]) * RECORD_BYTES
+
+
+class UndoCommand(object):
+    '''
+    One undoable step, the deltas are applied last to first
+    '''
+
+    __slots__ = ('label', 'deltas', 'size', 'time', 'rows')
+
+    def __init__(self, label):
+        self.label = label
+        self.deltas = []
+        self.size = 0
+        self.time = time.time()
+        #   Rows the command restores, None unless it only holds updates
+        self.rows = set()
+
+    def _add_rows(self, delta):
+        if (delta[0] != UPDATE):
+            self.rows = None
+        elif (self.rows is not None):
+            self.rows.update(range(delta[1], delta[1] + len(delta[2])))
+
+    def add(self, delta):
+        self.deltas.append(delta)
+        self.size += delta_size(delta)
+        self._add_rows(delta)
+
+    def add_update(self, delta):
+        '''
+        Adds an update delta, joining it onto the last one if the rows follow
+        on from it, and returns the bytes added
+        '''
+        previous = self.deltas[-1] if self.deltas else None
+        if ((previous) and (previous[0] == UPDATE) and (delta[1] == previous[1] + len(previous[2]))):
+            previous[2].extend(delta[2])
+            size = len(delta[2]) * VALUES_BYTES
+        else:
+            self.deltas.append(delta)
+            size = delta_size(delta)
+
+        self.size += size
+        self._add_rows(delta)
+        return size
+
+
+class UndoStack(object):
+    '''
+    Undo and redo history of a ChecklistModel
+    '''
+
+    def __init__(self, checklist, max_bytes = None, max_commands = None):
+        self.checklist = checklist
+        self.max_bytes = max_bytes or MAX_BYTES
+        self.max_commands = max_commands or MAX_COMMANDS
+
+        #   Oldest first
+        self.undo_commands = collections.deque()
+        self.redo_commands = collections.deque()
+        #   Bytes held by both stacks
+        self.size = 0
+
+        #   False while changes should not be undoable, like loading
+        self.recording = True
+
+        self._group = None
+        #   Command collecting the reverse of an undo or redo being applied
+        self._applying = None
+        #   Row values or order from before the change being notified
+        self._before = None
+
+        self.checklist.subscribe(self._checklist_changed)
+
+    def __len__(self):
+        return len(self.undo_commands)
+
+    def detach(self):
+        self.checklist.unsubscribe(self._checklist_changed)
+        self.clear()
+
+    def clear(self):
+        self.undo_commands.clear()
+        self.redo_commands.clear()
+        self.size = 0
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_commands)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_commands)
+
+    @property
+    def applying(self):
+        '''
+        True while an undo or redo is being applied
+        '''
+        return self._applying is not None
+
+    @property
+    def undo_label(self):
+        return self.undo_commands[-1].label if self.undo_commands else None
+
+    @property
+    def redo_label(self):
+        return self.redo_commands[-1].label if self.redo_commands else None
+
+    @contextlib.contextmanager
+    def group(self, label):
+        '''
+        Every change made in the with block is undone in one step
+        '''
+        if (self._group is not None):
+            yield
+            return
+
+        self._group = UndoCommand(label)
+        try:
+            yield
+        finally:
+            command, self._group = self._group, None
+            if (command.deltas):
+                self._add_command(command)
+
+    @contextlib.contextmanager
+    def amend(self):
+        '''
+        Every change made in the with block is undone with the last command,
+        for changes that follow on from it like moving an edited row
+        '''
+        if ((self._group is not None) or (self._applying is not None) or (not self.undo_commands)):
+            yield
+            return
+
+        command = self.undo_commands.pop()
+        self.size -= command.size
+        self._group = command
+        try:
+            yield
+        finally:
+            self._group = None
+            self.undo_commands.append(command)
+            self.size += command.size
+            self._evict()
+
+    def undo(self):
+        '''
+        Reverses the last command, returns its label or None if there was nothing to undo
+        '''
+        if (not self.undo_commands):
+            return None
+
+        command = self.undo_commands.pop()
+        self.size -= command.size
+        self._apply(command, self.redo_commands)
+        return command.label
+
+    def redo(self):
+        '''
+        Repeats the last undone command, returns its label or None
+        '''
+        if (not self.redo_commands):
+            return None
+
+        command = self.redo_commands.pop()
+        self.size -= command.size
+        self._apply(command, self.undo_commands)
+        return command.label
+
+    def _apply(self, command, target):
+        '''
+        Applies the deltas of command, their reverse goes onto target
+        '''
+        reverse = UndoCommand(command.label)
+        self._applying = reverse
+        try:
+            for delta in reversed(command.deltas):
+                self._apply_delta(delta)
+        finally:
+            self._applying = None
+
+        target.append(reverse)
+        self.size += reverse.size
+        self._evict()
+
+    def _apply_delta(self, delta):
+        kind = delta[0]
+        if (kind == REMOVE):
+            self.checklist.remove(delta[1], delta[2])
+        elif (kind == INSERT):
+            self.checklist.insert(delta[1], delta[2])
+        elif (kind == UPDATE):
+            self.checklist.update_rows(delta[1], delta[2])
+        elif (kind == ORDER):
+            self.checklist.reorder(delta[1])
+        elif (kind == RESET):
+            self.checklist.reset(delta[1])
+
+    def _record(self, delta, label):
+        if (self._applying is not None):
+            self._applying.add(delta)
+            return
+
+        if (self._group is not None):
+            self._group.add(delta)
+            return
+
+        command = UndoCommand(label)
+        command.add(delta)
+        self._add_command(command)
+
+    def _add_command(self, command):
+        '''
+        Adds a new edit, anything undone before it can't be redone anymore
+        '''
+        for each in self.redo_commands:
+            self.size -= each.size
+        self.redo_commands.clear()
+
+        if (self._coalesce(command)):
+            return
+
+        self.undo_commands.append(command)
+        self.size += command.size
+        self._evict()
+
+    def _coalesce(self, command):
+        '''
+        Merges command into the last command, returns False if it can't be
+        '''
+        if (not self.undo_commands):
+            return False
+
+        last = self.undo_commands[-1]
+        if ((command.label != last.label) or (command.label not in COALESCED) or
+                (command.time - last.time > COALESCE_SECONDS)):
+            return False
+
+        rows = command.rows
+        last_rows = last.rows
+        if ((rows is None) or (last_rows is None)):
+            return False
+
+        if (rows <= last_rows):
+            #   The last command already goes back to before these rows changed
+            pass
+        elif ((command.label == 'Check') and (not (rows & last_rows))):
+            for delta in command.deltas:
+                self.size += last.add_update(delta)
+        else:
+            return False
+
+        #   The window runs from the latest edit, a storm of toggles stays one command
+        last.time = command.time
+        return True
+
+    def _evict(self):
+        '''
+        Drops the oldest commands until the history fits, keeping the last one
+        '''
+        while (((self.size > self.max_bytes) or
+                (len(self.undo_commands) + len(self.redo_commands) > self.max_commands)) and
+                (len(self.undo_commands) > 1)):
+            self.size -= self.undo_commands.popleft().size
+
+        while (((self.size > self.max_bytes) or
+                (len(self.undo_commands) + len(self.redo_commands) > self.max_commands)) and
+                (len(self.redo_commands) > 1)):
+            self.size -= self.redo_commands.popleft().size
+
+    def _checklist_changed(self, event, first, last):
+        if (not self.recording):
+            return
+
+        items = self.checklist.items
+
+        if (event == core_checklist.INSERT):
+            self._record((REMOVE, first, last), 'Add')
+
+        elif (event == core_checklist.BEFORE_REMOVE):
+            self._record((INSERT, first, items[first:last + 1]), 'Delete')
+
+        elif (event == core_checklist.BEFORE_CHANGE):
+            self._before = [record.values() for record in items[first:last + 1]]
+
+        elif (event == core_checklist.CHANGE):
+            before, self._before = self._before, None
+            if (before is None):
+                return
+
+            after = [record.values() for record in items[first:last + 1]]
+            if (before == after):
+                return
+
+            #   Toggles are told apart from edits so they can be coalesced
+            label = 'Check'
+            for old, new in zip(before, after):
+                if (old[:CHECK_FIELD] + old[CHECK_FIELD + 1:] != new[:CHECK_FIELD] + new[CHECK_FIELD + 1:]):
+                    label = 'Edit'
+                    break
+
+            self._record((UPDATE, first, before), label)
+
+        elif (event == core_checklist.BEFORE_LAYOUT):
+            self._before = list(items)
+
+        elif (event == core_checklist.LAYOUT):
+            before, self._before = self._before, None
+            if ((before is not None) and (before != items)):
+                self._record((ORDER, before), 'Sort')
+
+        elif (event == core_checklist.BEFORE_RESET):
+            #   reset replaces the list, this one is left as it is
+            self._before = items
+
+        elif (event == core_checklist.RESET):
+            before, self._before = self._before, None
+            if ((before is not None) and (before or items)):
+                self._record((RESET, before), 'Replace' if items else 'Clear')
@@ -1 +0,0 @@
-import marker
\ No newline at end of file
@@ -1 +0,0 @@
-import main
\ No newline at end of file
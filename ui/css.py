@@ -2,4 +2,16 @@ CSS = (
     '''
 
     '''
-)
\ No newline at end of file
+)
+#   Color button style sheets by color, shared by every button in that color
+BUTTON_STYLES = {}
+
+
+def button_style(color):
+    '''
+    Returns the style sheet of a color button, formatted once per color
+    '''
+    style = BUTTON_STYLES.get(color)
+    if (style is None):
+        style = BUTTON_STYLES[color] = 'QWidget { background-color: %s}' % color
+    return style
@@ -0,0 +1,155 @@
+'''
+Debug @ ui
+
+Debug panel: recent timings and totals from core.profiling, counters, and
+the item, widget and memory counts of every open tab
+
+=========================================================
+@command:
+-----------------------
+panel = DebugPanel(tab_statistics, parent)
+panel.show()
+-----------------------
+
+@notes:
+*   tab_statistics returns a list of dicts, one per tab, see
+    MayaChecklistUI.tab_statistics.
+*   The panel refreshes itself every REFRESH_INTERVAL while it is shown.
+*   Export writes everything shown to a JSON file to attach to bug reports.
+
+=========================================================
+Maya Tanaka
+'''
+import time
+
+from Qt import QtWidgets, QtCore
+
+from mayaChecklist.core import profiling
+
+
+class DebugPanel(QtWidgets.QDialog):
+    '''
+    Shows what the profiler collected and what the open tabs hold
+    '''
+
+    WINDOWTITLE = 'Checklist Debug'
+
+    #   Milliseconds between refreshes while shown
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, tab_statistics, parent = None):
+        super(DebugPanel, self).__init__(parent)
+
+        self.tab_statistics = tab_statistics
+
+        self._build_ui()
+
+    def _build_ui(self):
+        self.setWindowTitle(self.WINDOWTITLE)
+        self.setMinimumWidth(520)
+        self.setMinimumHeight(480)
+
+        debug_layout = QtWidgets.QVBoxLayout(self)
+
+        self.enabled_check = QtWidgets.QCheckBox('Collect timings', self)
+        self.enabled_check.setToolTip('Also on when MAYACHECKLIST_PROFILE is set')
+        self.enabled_check.setChecked(profiling.is_enabled())
+        self.enabled_check.toggled.connect(profiling.enable)
+        debug_layout.addWidget(self.enabled_check)
+
+        tab_widget = QtWidgets.QTabWidget(self)
+        debug_layout.addWidget(tab_widget)
+
+        self.totals_tree = self._add_tree(tab_widget, 'Timings', ('Operation', 'Calls', 'Total ms', 'Mean ms', 'Max ms'))
+        self.recent_tree = self._add_tree(tab_widget, 'Recent', ('Time', 'Operation', 'ms', 'Details'))
+        self.counters_tree = self._add_tree(tab_widget, 'Counters', ('Counter', 'Count'))
+        self.tabs_tree = self._add_tree(tab_widget, 'Tabs', ('Checklist', 'Items', 'Widgets', 'Memory KB', 'Built'))
+
+        button_widget = QtWidgets.QWidget(self)
+        button_layout = QtWidgets.QHBoxLayout(button_widget)
+        button_layout.setContentsMargins(0, 0, 0, 0)
+
+        reset_button = QtWidgets.QPushButton('Reset', button_widget)
+        reset_button.clicked.connect(self._reset)
+        export_button = QtWidgets.QPushButton('Export JSON...', button_widget)
+        export_button.clicked.connect(self._export)
+
+        button_layout.addStretch()
+        button_layout.addWidget(reset_button)
+        button_layout.addWidget(export_button)
+        debug_layout.addWidget(button_widget)
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def _add_tree(self, tab_widget, name, columns):
+        tree = QtWidgets.QTreeWidget(tab_widget)
+        tree.setRootIsDecorated(False)
+        tree.setHeaderLabels(columns)
+        tree.setSortingEnabled(True)
+        tab_widget.addTab(tree, name)
+        return tree
+
+    def showEvent(self, event):
+        super(DebugPanel, self).showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super(DebugPanel, self).hideEvent(event)
+
+    def _fill_tree(self, tree, rows):
+        '''
+        Replaces the rows of tree, numbers sort as numbers
+        '''
+        tree.setSortingEnabled(False)
+        tree.clear()
+
+        for row in rows:
+            item = QtWidgets.QTreeWidgetItem(tree)
+            for column, value in enumerate(row):
+                if (isinstance(value, float)):
+                    item.setData(column, QtCore.Qt.DisplayRole, round(value, 2))
+                else:
+                    item.setData(column, QtCore.Qt.DisplayRole, value)
+
+        tree.setSortingEnabled(True)
+
+    def refresh(self):
+        profiler = profiling.PROFILER
+
+        self._fill_tree(self.totals_tree,
+            [(name, calls, total * 1000.0, total * 1000.0 / calls, peak * 1000.0)
+                for name, (calls, total, peak) in profiler.totals.items()])
+
+        self._fill_tree(self.recent_tree,
+            [(time.strftime('%H:%M:%S', time.localtime(stamp)), name, seconds * 1000.0,
+                ', '.join('{}={}'.format(key, value) for key, value in sorted(details.items())))
+                for stamp, name, seconds, details in reversed(profiler.recent)])
+
+        self._fill_tree(self.counters_tree, sorted(profiler.counters.items()))
+
+        self._fill_tree(self.tabs_tree,
+            [(tab['name'], tab['items'], tab['widgets'], tab['memory'] / 1024.0,
+                'yes' if tab['materialized'] else 'no')
+                for tab in self.tab_statistics()])
+
+    def _reset(self):
+        profiling.PROFILER.reset()
+        self.refresh()
+
+    def _export(self):
+        path = QtWidgets.QFileDialog.getSaveFileName(self,
+            'Export Debug Report',
+            'checklist_debug.json',
+            'JSON Files (*.json)')[0]
+        if (not path):
+            return
+
+        try:
+            profiling.PROFILER.export(path, extra = {'tabs' : self.tab_statistics()})
+        except (IOError, OSError) as error:
+            QtWidgets.QMessageBox.warning(self, self.WINDOWTITLE,
+                'Could not write {}: {}'.format(path, error))
@@ -17,7 +17,6 @@ mayaChecklist.ui.main.main()
 @todo: 
 *   Change main window from window to widget
 *   Edit/Delete checklist item
-*   Save as preset
 *   Sort by check/archive checks
 *   Sort by frame
 *   Reorder checklist item functionality
@@ -25,17 +24,30 @@ mayaChecklist.ui.main.main()
 =========================================================
 Maya Tanaka
 '''
-import maya.cmds as mc
-import pymel.core as pm
-
 import os
-import json
-
-import css
+import time
+
+import mayaChecklist.ui.views as views
+import mayaChecklist.ui.search as search
+import mayaChecklist.ui.debug as debug
+from mayaChecklist.core import checklist as core_checklist
+from mayaChecklist.core.checklist import ChecklistModel, ChecklistRecord, DEFAULT_COLOR, parse_note_lines
+from mayaChecklist.core import storage
+from mayaChecklist.core import merge
+from mayaChecklist.core.storage import ChecklistLoader, ChecklistWriter
+from mayaChecklist.core import journal
+from mayaChecklist.core.journal import ChecklistJournal
+from mayaChecklist.core.registry import PresetRegistry
+from mayaChecklist.core.frames import FrameIndex
+from mayaChecklist.core.session import ChecklistSession
+from mayaChecklist.core.filters import ChecklistFilter, RowFilter
+from mayaChecklist.core.search import TrigramIndex, ChecklistSearchFeed
+from mayaChecklist.core.tabs import TabRegistry
+from mayaChecklist.core import profiling
+from mayaChecklist.core.undo import UndoStack
+from mayaChecklist.core.sorting import ChecklistSort, SORT_KEYS
+from mayaChecklist.core.scene import SceneChecklists
 
-import mayaChecklist.presets.marker as marker
-
-from maya import OpenMayaUI as omui
 from Qt import QtWidgets, QtCore, QtGui
 import Qt
 
@@ -48,22 +60,43 @@ logging.basicConfig()
 logger = logging.getLogger('MayaChecklist')
 logger.setLevel(logging.INFO)
 
+#   Writes every checklist file in order on one worker thread
+CHECKLIST_WRITER = ChecklistWriter()
+
+#   Preset folders are scanned once per Maya session
+PRESET_REGISTRY = PresetRegistry()
 
-if Qt.__binding__ == 'PySide':
-    #    shiboken converts Qt elements into PySide elements
-    from shiboken import wrapInstance
-elif Qt.__binding__.startswith('PyQt'):
-    #    sip converts Qt elements into PyQt
-    from sip import wrapinstance as wrapInstance
-else:
-    from shiboken2 import wrapInstance
+#   Closed tabs, the session file is read the first time they are needed
+SESSION = ChecklistSession()
+
+#   Checklists stored in the fileInfo of the open scene
+SCENE_CHECKLISTS = SceneChecklists()
+
+#   The open checklist window, main() shows it again instead of rebuilding it
+DIALOG = None
 
 def get_maya_main_window():
+    #    The Maya bindings are only imported once a window is built
+    from maya import OpenMayaUI as omui
+
     #    Get the memory address of the main window
     win = omui.MQtUtil_mainWindow()
+    if (win is None):
+        return None
+
+    if Qt.__binding__ == 'PySide':
+        #    shiboken converts Qt elements into PySide elements
+        from shiboken import wrapInstance
+    elif Qt.__binding__.startswith('PyQt'):
+        #    sip converts Qt elements into PyQt
+        from sip import wrapinstance as wrapInstance
+    elif Qt.__binding__ == 'PySide6':
+        from shiboken6 import wrapInstance
+    else:
+        from shiboken2 import wrapInstance
 
     #    Convert it into a wrap instance
-    mainWindowPointer = wrapInstance(long(win), QtWidgets.QMainWindow)
+    mainWindowPointer = wrapInstance(int(win), QtWidgets.QMainWindow)
     return mainWindowPointer
 
 
@@ -72,20 +105,216 @@ class MayaChecklistUI(QtWidgets.QDialog):
     WINDOWTITLE = 'Maya Checklist'
     OBJECTNAME = 'mayaChecklistUI'
 
-    TABS = dict()
+    #   Milliseconds between highlight updates during playback
+    PLAYBACK_THROTTLE = 100
+
+    #   Tabs that keep their widgets built, counting the current one, 0 keeps every tab built
+    MAX_LIVE_TABS = int(os.environ.get('MAYACHECKLIST_MAX_LIVE_TABS', 8))
+    #   Seconds a tab has to be hidden before its widgets can be released
+    RELEASE_AFTER = 600
+    #   Milliseconds after the last change to a checklist file before open tabs reload it
+    RELOAD_DELAY = 500
 
-    def __init__(self, parent = get_maya_main_window()):
+    def __init__(self, parent = None):
+        import maya.cmds as mc
 
         #   Delete previous windows
-        try:
-            pm.deleteUI(self.OBJECTNAME)
-        except:
+        if (mc.window(self.OBJECTNAME, exists = True)):
+            mc.deleteUI(self.OBJECTNAME)
+        else:
             logger.debug('No previous window')
 
+        if (parent is None):
+            parent = get_maya_main_window()
+
         super(MayaChecklistUI, self).__init__(parent = parent)
+
+        #   Notes of every open tab, see _show_search
+        self.search_index = TrigramIndex()
+        self.search_dialog = None
+        self.debug_panel = None
+
+        #   Open tabs by id, tab indices change when tabs are moved or closed
+        self.tabs = TabRegistry()
+
+        #   Checklist files of the open tabs, changes saved by someone else are reloaded
+        self.file_watcher = QtCore.QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self._file_changed)
+        self.changed_files = set()
+        self.reload_timer = QtCore.QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.RELOAD_DELAY)
+        self.reload_timer.timeout.connect(self._reload_changed_files)
         
         self._build_ui()
 
+        #   Offer to bring back checklists that were open when Maya crashed
+        self._recover_journals()
+
+        #   Highlight the notes at the current time, the scriptJob only runs while the window is shown
+        self.time_timer = QtCore.QTimer(self)
+        self.time_timer.setSingleShot(True)
+        self.time_timer.timeout.connect(self._highlight_current_time)
+        self.time_job = None
+        self.tab_widget.currentChanged.connect(lambda index : self._time_changed())
+
+        #   Follows the open scene for the checklists stored in it, only while the window is shown
+        self.scene_jobs = []
+        self.save_callback = None
+        #   Scene the stored checklists were last opened from, None before the first show
+        self.scene_name = None
+
+    def showEvent(self, event):
+        '''
+        Starts following the current time and the open scene
+        '''
+        import maya.cmds as mc
+        import maya.api.OpenMaya as om
+
+        if (self.time_job is None):
+            self.time_job = mc.scriptJob(event = ['timeChanged', self._time_changed])
+            self._time_changed()
+
+        if (not self.scene_jobs):
+            self.scene_jobs = [mc.scriptJob(event = ['SceneOpened', self._scene_opened]),
+                mc.scriptJob(event = ['NewSceneOpened', self._scene_opened])]
+            self.save_callback = om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeSave, self._write_to_scene)
+
+            #   The scene may have changed while the window was hidden
+            if (mc.file(query = True, sceneName = True) != self.scene_name):
+                self._scene_opened()
+
+        super(MayaChecklistUI, self).showEvent(event)
+
+    def closeEvent(self, event):
+        '''
+        Hides the window, its tabs and journals stay open until it is shown again
+        '''
+        import maya.cmds as mc
+        import maya.api.OpenMaya as om
+
+        if (self.time_job is not None):
+            mc.scriptJob(kill = self.time_job, force = True)
+            self.time_job = None
+
+        #   Nothing is written while hidden, anything pending goes into the scene now
+        self._write_to_scene()
+        for job in self.scene_jobs:
+            mc.scriptJob(kill = job, force = True)
+        self.scene_jobs = []
+        if (self.save_callback is not None):
+            om.MMessage.removeCallback(self.save_callback)
+            self.save_callback = None
+
+        super(MayaChecklistUI, self).closeEvent(event)
+
+    def _time_changed(self):
+        '''
+        timeChanged scriptJob, throttled while Maya is playing back
+        '''
+        import maya.cmds as mc
+
+        if (self.time_timer.isActive()):
+            return
+
+        if (mc.play(query = True, state = True)):
+            self.time_timer.start(self.PLAYBACK_THROTTLE)
+        else:
+            self.time_timer.start(0)
+
+    def _highlight_current_time(self):
+        '''
+        Highlights the notes of the current tab around the current frame
+        '''
+        import maya.cmds as mc
+
+        if (not self.current_tab):
+            return
+
+        frame = int(round(mc.currentTime(query = True)))
+        self.current_tab.highlight_frame(frame)
+
+    def _scene_opened(self):
+        '''
+        SceneOpened scriptJob, swaps the checklists of the previous scene for the ones stored in this one
+        '''
+        import maya.cmds as mc
+
+        self.scene_name = mc.file(query = True, sceneName = True)
+
+        #   The previous scene is gone, its checklists can't be written to it anymore
+        for tab in self._tabs():
+            if (tab.scene_key):
+                tab.unlink_scene()
+                self._delete_tab(self.tab_widget.indexOf(tab))
+
+        for key in SCENE_CHECKLISTS.keys():
+            self._open_from_scene(key, select = False)
+
+    def _write_to_scene(self, *args):
+        '''
+        Writes every checklist stored in the scene that changed since it was last written
+        '''
+        for tab in self.tabs:
+            tab.write_to_scene()
+
+    def _recover_journals(self):
+        '''
+        Replays journals left behind by a previous session
+
+        Journals of another Maya that is still running are left alone.
+        '''
+        recoverable = []
+
+        for path in journal.orphaned_journals():
+            if (not journal.claim_journal(path)):
+                continue
+
+            try:
+                info, records, unsaved = journal.replay_journal(path)
+            except (IOError, OSError, ValueError, KeyError) as error:
+                logger.warning('Could not read journal {}: {}'.format(path, error))
+                journal.remove_owner(path)
+                continue
+
+            if (unsaved):
+                recoverable.append((path, info, records))
+            else:
+                self._discard_journal(path)
+
+        if (not recoverable):
+            return
+
+        answer = QtWidgets.QMessageBox.question(self,
+            'Recover Checklists',
+            '{} checklist(s) have unsaved changes from a previous session.\n'
+            'Recover them?'.format(len(recoverable)),
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+
+        for path, info, records in recoverable:
+            if (answer != QtWidgets.QMessageBox.Yes):
+                #   Kept so the changes can still be got back by hand
+                try:
+                    logger.info('Kept unrecovered journal: {}'.format(journal.set_aside_journal(path)))
+                except (IOError, OSError) as error:
+                    logger.warning('Could not set aside journal {}: {}'.format(path, error))
+                continue
+
+            tab = self._add_tab()
+            if (info):
+                tab._apply_header(info)
+            tab.checklist.extend(records)
+            tab.checklist_sort.sort()
+            tab.undo_stack.clear()
+
+            #   The tab journals the recovered checklist itself
+            self._discard_journal(path)
+
+    def _discard_journal(self, path):
+        try:
+            journal.discard_journal(path)
+        except OSError as error:
+            logger.warning('Could not delete journal {}: {}'.format(path, error))
 
     def _build_ui(self):
 
@@ -94,107 +323,135 @@ class MayaChecklistUI(QtWidgets.QDialog):
         self.setMinimumWidth(320)
         self.setMinimumHeight(500)
 
-        self.layout = QtGui.QVBoxLayout(self)
+        self.layout = QtWidgets.QVBoxLayout(self)
 
         #    Base vertical layout
         base_widget = QtWidgets.QWidget()
         self.base_layout = QtWidgets.QVBoxLayout(base_widget)
         self.layout.addWidget(base_widget)
         
-        size_policy = QtGui.QSizePolicy(QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Expanding)
+        size_policy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         base_widget.setSizePolicy(size_policy)
 
         #    Menu Bar
-        menu_bar = QtGui.QMenuBar()
+        menu_bar = QtWidgets.QMenuBar()
         file_menu = menu_bar.addMenu('File') 
+        self.edit_menu = menu_bar.addMenu('Edit')
         view_menu = menu_bar.addMenu('View') 
         help_menu = menu_bar.addMenu('Help') 
         self.base_layout.addWidget(menu_bar)
 
         #   File Menu
-        file_new = QtGui.QAction('New', self)
+        file_new = QtWidgets.QAction('New', self)
         file_new.setStatusTip('Create a new checklist')
         file_new.triggered.connect(self._add_tab)
 
-        file_open = QtGui.QAction('Open', self)
+        file_open = QtWidgets.QAction('Open', self)
         file_open.setStatusTip('Load Checklist')
         file_open.triggered.connect(self._load_checklist) 
 
-        file_save = QtGui.QAction('Save', self)  
+        file_save = QtWidgets.QAction('Save', self)  
         file_save.setStatusTip('Save Checklist')
         file_save.triggered.connect(self._save_checklist) 
 
-        file_save_as = QtGui.QAction('Save As', self)  
+        file_save_as = QtWidgets.QAction('Save As', self)  
         file_save_as.setStatusTip('Save Checklist As')
         file_save_as.triggered.connect(self._save_as_checklist) 
 
-        file_presets = QtGui.QMenu('Presets', self) 
+        self.file_presets = QtWidgets.QMenu('Presets', self) 
+        self._build_presets_menu()
+
+        self.file_reopen = QtWidgets.QMenu('Reopen Closed', self)
+        self.file_reopen.aboutToShow.connect(self._build_reopen_menu)
 
-        file_preset_arcs = QtGui.QAction('Arcs', self) 
-        file_preset_arcs.triggered.connect(lambda preset = 'arcs': self._load_preset(preset)) 
-        file_preset_basic = QtGui.QAction('Basic', self) 
-        file_preset_basic.triggered.connect(lambda preset = 'basic': self._load_preset(preset)) 
-        file_preset_polish = QtGui.QAction('Polish', self) 
-        file_preset_polish.triggered.connect(lambda preset = 'polish': self._load_preset(preset)) 
-        file_preset_face = QtGui.QAction('Face', self) 
-        file_preset_face.triggered.connect(lambda preset = 'face': self._load_preset(preset)) 
+        self.file_scene = QtWidgets.QMenu('Scene', self)
+        self.file_scene.aboutToShow.connect(self._build_scene_menu)
 
-        file_rename = QtGui.QAction('Rename', self)  
+        file_rename = QtWidgets.QAction('Rename', self)  
         file_rename.triggered.connect(self._rename_checklist) 
 
-        file_exit = QtGui.QAction('Quit', self) 
-        file_exit.triggered.connect(self.test) 
+        file_exit = QtWidgets.QAction('Quit', self) 
+        file_exit.triggered.connect(self.close) 
 
         file_menu.addAction(file_new)
         file_menu.addAction(file_open)
+        file_menu.addMenu(self.file_reopen)
         file_menu.addAction(file_save)
         file_menu.addAction(file_save_as)
+        file_menu.addMenu(self.file_scene)
         file_menu.addSeparator()
         file_menu.addAction(file_rename)
-        file_menu.addMenu(file_presets)
-        file_presets.addAction(file_preset_arcs)
-        file_presets.addAction(file_preset_basic)
-        file_presets.addAction(file_preset_polish)
-        file_presets.addAction(file_preset_face)
+        file_menu.addMenu(self.file_presets)
         file_menu.addSeparator()
         file_menu.addAction(file_exit)
 
         
-        debug = QtGui.QAction('Debug', self)  
-        debug.triggered.connect(self.debug) 
-        file_menu.addAction(debug)
+        file_debug = QtWidgets.QAction('Debug', self)
+        file_debug.setStatusTip('Show timings, item counts and memory of the open checklists')
+        file_debug.triggered.connect(self._show_debug)
+        file_menu.addAction(file_debug)
+
+        #   Edit Menu
+        self.edit_undo = QtWidgets.QAction('Undo', self)
+        self.edit_undo.setShortcut(QtGui.QKeySequence.Undo)
+        self.edit_undo.triggered.connect(self._undo)
+
+        self.edit_redo = QtWidgets.QAction('Redo', self)
+        self.edit_redo.setShortcut(QtGui.QKeySequence.Redo)
+        self.edit_redo.triggered.connect(self._redo)
+
+        self.edit_menu.addAction(self.edit_undo)
+        self.edit_menu.addAction(self.edit_redo)
+        self.edit_menu.aboutToShow.connect(self._update_edit_menu)
 
         #   View Menu
-        view_all = QtGui.QAction('All', self)
+        view_all = QtWidgets.QAction('All', self)
         view_all.setStatusTip('Show all items')
-        view_all.triggered.connect(lambda filter = 'all' : self._view_filter(filter))
+        view_all.triggered.connect(lambda checked = False, filter = 'all' : self._view_filter(filter))
         
-        view_unchecked = QtGui.QAction('Unchecked', self)
+        view_unchecked = QtWidgets.QAction('Unchecked', self)
         view_unchecked.setStatusTip('Show only unchecked items')
-        view_unchecked.triggered.connect(lambda filter = 'unchecked' : self._view_filter(filter))
+        view_unchecked.triggered.connect(lambda checked = False, filter = 'unchecked' : self._view_filter(filter))
+
+        view_playback = QtWidgets.QAction('Playback Range', self)
+        view_playback.setStatusTip('Show only items in the playback range')
+        view_playback.triggered.connect(lambda checked = False, filter = 'playback' : self._view_filter(filter))
         
-        sort_by_frame = QtGui.QAction('Frame', self)
+        sort_by_frame = QtWidgets.QAction('Frame', self)
         sort_by_frame.setStatusTip('Sort by frame')
-        sort_by_frame.triggered.connect(lambda sort = 'frame' : self._sort_list(sort))
+        sort_by_frame.triggered.connect(lambda checked = False, sort = 'frame' : self._sort_list(sort))
 
-        sort_by_checkstate = QtGui.QAction('Checkstate', self)
+        sort_by_checkstate = QtWidgets.QAction('Checkstate', self)
         sort_by_checkstate.setStatusTip('Sort by checkstate')
-        sort_by_checkstate.triggered.connect(lambda sort = 'checkstate' : self._sort_list(sort))
+        sort_by_checkstate.triggered.connect(lambda checked = False, sort = 'checkstate' : self._sort_list(sort))
 
-        sort_by_color = QtGui.QAction('Color', self)
+        sort_by_color = QtWidgets.QAction('Color', self)
         sort_by_color.setStatusTip('Sort by color')
-        sort_by_color.triggered.connect(lambda sort = 'color' : self._sort_list(sort))
+        sort_by_color.triggered.connect(lambda checked = False, sort = 'color' : self._sort_list(sort))
+
+        sort_unsorted = QtWidgets.QAction('Unsorted', self)
+        sort_unsorted.setStatusTip('Stop keeping the checklist sorted, items stay where they are')
+        sort_unsorted.triggered.connect(lambda : self._sort_list(None))
 
-        filter_separator = QtGui.QMenu.addSeparator(view_menu)
+        filter_separator = QtWidgets.QMenu.addSeparator(view_menu)
         filter_separator.setText('Filter')
         view_menu.addAction(view_all)
         view_menu.addAction(view_unchecked)
+        view_menu.addAction(view_playback)
 
-        sort_separator = QtGui.QMenu.addSeparator(view_menu)
+        sort_separator = QtWidgets.QMenu.addSeparator(view_menu)
         sort_separator.setText('Sort')
         view_menu.addAction(sort_by_frame)
         view_menu.addAction(sort_by_checkstate)
         view_menu.addAction(sort_by_color)
+        view_menu.addAction(sort_unsorted)
+
+        view_menu.addSeparator()
+        view_search = QtWidgets.QAction('Search...', self)
+        view_search.setStatusTip('Search the notes of every checklist')
+        view_search.setShortcut('Ctrl+F')
+        view_search.triggered.connect(self._show_search)
+        view_menu.addAction(view_search)
 
         #    Tabbed Layout
         self.tab_widget = QtWidgets.QTabWidget()
@@ -202,34 +459,211 @@ class MayaChecklistUI(QtWidgets.QDialog):
         self.tab_widget.setTabsClosable(True)
         self.tab_widget.tabCloseRequested.connect(self._delete_tab)
         self.tab_widget.setMovable(True)
+        self.tab_widget.currentChanged.connect(self._current_tab_changed)
         self._add_tab()
         self.base_layout.addWidget(self.tab_widget)
     
-    def test(self):
-        print('Tabs dict: {}'.format(self.TABS))
+    def _build_presets_menu(self):
+        '''
+        Fills the Presets menu from the preset registry
+        '''
+        self.file_presets.clear()
 
-        for i, each in enumerate(self.TABS):
-            print('Tab no: {}'.format(i))
-            print('Tab: {}'.format(self.TABS[i]))
-            print('Checklist items: {}'.format(self.TABS[i].ITEMS))
+        for name in PRESET_REGISTRY.names():
+            file_preset = self.file_presets.addAction(PRESET_REGISTRY.preset(name).label)
+            file_preset.triggered.connect(lambda checked = False, preset = name: self._load_preset(preset))
 
-        pass
+        self.file_presets.addSeparator()
 
-    def debug(self):
-        
-        print('Current checklist index: {}'.format(self.TABS[self.tab_widget.currentIndex()]))
-        print('Current checklist index items: {}'.format(self.TABS[self.tab_widget.currentIndex()].ITEMS))
-        print('Checklist dict: ')
+        file_save_as_preset = self.file_presets.addAction('Save As Preset')
+        file_save_as_preset.setStatusTip('Save current checklist as a preset')
+        file_save_as_preset.triggered.connect(self._save_as_preset)
+
+        file_refresh_presets = self.file_presets.addAction('Refresh')
+        file_refresh_presets.setStatusTip('Look for new presets on disk')
+        file_refresh_presets.triggered.connect(self._refresh_presets)
+
+    def _build_reopen_menu(self):
+        '''
+        Fills the Reopen Closed menu from the session file
+        '''
+        self.file_reopen.clear()
+
+        for index, entry in enumerate(SESSION.closed):
+            label = entry.get('name') or 'Untitled'
+            if (not entry.get('path')):
+                label += ' (unsaved)'
+
+            file_reopen_tab = self.file_reopen.addAction(label)
+            file_reopen_tab.setStatusTip(entry.get('path') or 'Closed with unsaved changes')
+            file_reopen_tab.triggered.connect(lambda checked = False, index = index: self._reopen_closed(index))
+
+        if (not SESSION.closed):
+            self.file_reopen.addAction('No closed checklists').setEnabled(False)
+            return
+
+        self.file_reopen.addSeparator()
+        file_reopen_all = self.file_reopen.addAction('Reopen All')
+        file_reopen_all.setStatusTip('Reopen every closed checklist, each is built when it is first shown')
+        file_reopen_all.triggered.connect(self._reopen_all_closed)
+
+    def _build_scene_menu(self):
+        '''
+        Fills the Scene menu with the checklists stored in the open scene
+        '''
+        import maya.cmds as mc
+
+        self.file_scene.clear()
+
+        file_store_in_scene = self.file_scene.addAction('Store In Scene')
+        file_store_in_scene.setStatusTip('Save the current checklist with the Maya scene')
+        file_store_in_scene.setCheckable(True)
+        file_store_in_scene.setEnabled(bool(self.current_tab))
+        file_store_in_scene.setChecked(bool((self.current_tab) and (self.current_tab.scene_key)))
+        file_store_in_scene.triggered.connect(self._store_in_scene)
+
+        self.file_scene.addSeparator()
 
+        keys = SCENE_CHECKLISTS.keys()
+        for key in keys:
+            try:
+                info = SCENE_CHECKLISTS.read_data(key)[0]
+            except (KeyError, ValueError) as error:
+                mc.warning('Could not read checklist {} from the scene: {}'.format(key, error))
+                continue
 
-        for each in self.TABS[self.tab_widget.currentIndex()].ITEMS:
-            print('--------------------')
-            print('Frame: {}'.format(each.frame))
-            print('Color: {}'.format(each.color))
-            print('Text: {}'.format(each.text))
-            print('Check: {}'.format(each.check))
+            file_scene_tab = self.file_scene.addAction(info.get('checklist_name') or 'Untitled')
+            file_scene_tab.triggered.connect(lambda checked = False, key = key: self._open_from_scene(key))
 
-        pass
+        if (not keys):
+            self.file_scene.addAction('No checklists in the scene').setEnabled(False)
+
+    def _store_in_scene(self, store = True):
+        '''
+        Starts or stops saving the current checklist with the scene
+        '''
+        tab = self.current_tab
+        if (not tab):
+            return
+
+        if (store):
+            if (not tab.scene_key):
+                tab.store_in_scene(SCENE_CHECKLISTS.new_key())
+        else:
+            tab.remove_from_scene()
+
+    def _open_from_scene(self, key, select = True):
+        '''
+        Opens a checklist stored in the scene, or switches to it if it is open
+        '''
+        import maya.cmds as mc
+
+        for tab in self.tabs:
+            if (tab.scene_key == key):
+                if (select):
+                    self.tab_widget.setCurrentWidget(tab)
+                return tab
+
+        try:
+            with profiling.timed('load_scene'):
+                info, records = SCENE_CHECKLISTS.read(key)
+        except (KeyError, ValueError) as error:
+            mc.warning('Could not read checklist {} from the scene: {}'.format(key, error))
+            return None
+
+        tab = self._add_tab(select = select)
+        tab.populate(info, records)
+        tab.link_scene(key)
+        profiling.count('items_loaded', len(records))
+
+        return tab
+
+    def _reopen_closed(self, index = 0, select = True):
+        '''
+        Reopens a closed tab from the session file
+        '''
+        import maya.cmds as mc
+
+        entry = SESSION.pop_closed(index)
+
+        if (entry.get('path')):
+            if (not os.path.exists(entry['path'])):
+                mc.warning('Checklist file no longer exists: {}'.format(entry['path']))
+                return
+            self._load_checklist(entry['path'], select = select)
+            return
+
+        tab = self._add_tab(select = select)
+        tab.populate(entry['info'], [ChecklistRecord.from_dict(each) for each in entry['items']])
+
+        #   The items were never saved
+        tab.checklist.touch()
+
+    def _reopen_all_closed(self):
+        '''
+        Reopens every closed tab without switching to them
+        '''
+        while (SESSION.closed):
+            self._reopen_closed(0, select = False)
+
+    def _refresh_presets(self):
+        '''
+        Rescans the preset folders
+        '''
+        PRESET_REGISTRY.scan()
+        self._build_presets_menu()
+
+    @property
+    def current_tab(self):
+        return self.tabs.current
+
+    def _show_debug(self):
+        '''
+        Opens the debug panel
+        '''
+        if (not self.debug_panel):
+            self.debug_panel = debug.DebugPanel(self.tab_statistics, self)
+
+        self.debug_panel.show()
+        self.debug_panel.raise_()
+
+    def tab_statistics(self):
+        '''
+        Returns item, widget and memory counts of every tab, in tab order
+        '''
+        statistics = []
+        for tab in self._tabs():
+            statistics.append({'name' : tab.tab_name,
+                'id' : tab.tab_id,
+                'items' : len(tab.checklist),
+                'widgets' : len(tab.findChildren(QtWidgets.QWidget)),
+                'memory' : profiling.checklist_memory(tab.checklist),
+                'materialized' : tab.materialized,
+                'dirty' : tab.dirty,
+                'current' : tab is self.current_tab})
+
+        return statistics
+
+    def _update_edit_menu(self):
+        '''
+        Names the edit Undo and Redo would revert in the current tab
+        '''
+        undo_stack = self.current_tab.undo_stack if self.current_tab else None
+        undo_label = undo_stack.undo_label if undo_stack else None
+        redo_label = undo_stack.redo_label if undo_stack else None
+
+        self.edit_undo.setText('Undo {}'.format(undo_label) if undo_label else 'Undo')
+        self.edit_undo.setEnabled(bool(undo_label))
+        self.edit_redo.setText('Redo {}'.format(redo_label) if redo_label else 'Redo')
+        self.edit_redo.setEnabled(bool(redo_label))
+
+    def _undo(self):
+        if (self.current_tab):
+            self.current_tab.undo()
+
+    def _redo(self):
+        if (self.current_tab):
+            self.current_tab.redo()
 
     def _view_filter(self, show):
         '''
@@ -239,7 +673,8 @@ class MayaChecklistUI(QtWidgets.QDialog):
 
         func_dic = {
             'all' : self._view_filter_all,
-            'unchecked' : self._view_filter_unchecked
+            'unchecked' : self._view_filter_unchecked,
+            'playback' : self._view_filter_playback
         }
 
         func_dic.get(show, None)()
@@ -248,149 +683,181 @@ class MayaChecklistUI(QtWidgets.QDialog):
         '''
         Filter checklist: show all
         '''
-        logger.info('Filtering checklist: show all')
-
-        for each in self.TABS[self.tab_widget.currentIndex()].ITEMS:
-            #   Hide the widget if it is checked
-            each.show()
+        if (self.current_tab):
+            self.current_tab.set_filter(ChecklistFilter())
 
     def _view_filter_unchecked(self):
         '''
         Filter checklist: show only unchecked
         '''
-        logger.info('Filtering checklist: show unchecked only')
+        if (self.current_tab):
+            self.current_tab.set_filter(ChecklistFilter(check = False))
+
+    def _view_filter_playback(self):
+        '''
+        Filter checklist: show only items on or overlapping the playback range
+        '''
+        import maya.cmds as mc
 
-        for each in self.TABS[self.tab_widget.currentIndex()].ITEMS:
-            #   Hide the widget if it is checked
-            if (each.check):
-                each.hide()                
+        start = int(mc.playbackOptions(query = True, minTime = True))
+        end = int(mc.playbackOptions(query = True, maxTime = True))
 
+        if (self.current_tab):
+            self.current_tab.set_filter(ChecklistFilter(frames = (start, end)))
 
     def _sort_list(self, sort):
         '''
-        Sort checklist by
+        Keeps the current checklist sorted by sort, then by the keys it was sorted by before
+
+        None stops sorting
         '''
-        logger.info('Sorting by {}'.format(sort))
+        current_tab = self.current_tab
+        if (not current_tab):
+            return
 
-        func_dic = {
-            'frame' : self._sort_list_frame,
-            'checkstate' : self._sort_list_checkstate,
-            'color' : self._sort_list_color
-        }
+        keys = ()
+        if (sort):
+            keys = (sort,) + tuple(key for key in current_tab.checklist_sort.keys if (key != sort))
 
-        func_dic.get(sort, None)()
+        logger.info('Sorting checklist: {}'.format(', '.join(keys) or 'unsorted'))
+        current_tab.set_sort(keys)
 
-    def _sort_list_frame(self):
+    def _add_tab(self, tab_name = 'Untitled', select = True):
         '''
-        Sort checklist by frame number
+        Adds a tab, its widgets are built once it is shown
         '''
-        logger.info('Sorting checklist: sort by frame')
+        tab = ChecklistTab(layout = self.tab_widget, tab_name = tab_name, search_index = self.search_index)
+        tab.source_changed.connect(self._watch_sources)
 
-        checklist_items = self.TABS[self.tab_widget.currentIndex()].ITEMS
+        #   Add to master dictionary
+        self.tabs.add(tab)
 
-        #   Sort by frame
-        checklist_items = sorted(checklist_items, key = lambda item : item.frame)
+        #   Switch to new tab
+        if (select):
+            self.tab_widget.setCurrentIndex(self.tab_widget.count() - 1)
 
-        self._refresh_checklist(checklist_items)
+        #   The first tab is current as soon as it is added
+        self._current_tab_changed(self.tab_widget.currentIndex())
 
-    def _sort_list_checkstate(self):
+        #   Return newly created tab
+        return tab
+
+    def _current_tab_changed(self, index):
         '''
-        Sort checklist by checkstate
+        Builds the widgets of the tab being shown
         '''
-        logger.info('Sorting checklist: sort by checkstate')
+        tab = self.tab_widget.widget(index)
+        #   Tabs are registered once they are added, see _add_tab
+        if ((tab is self.tabs.current) or ((tab is not None) and (tab not in self.tabs))):
+            return
 
-        checklist_items = self.TABS[self.tab_widget.currentIndex()].ITEMS
+        now = time.time()
+        if (self.tabs.current):
+            self.tabs.current.last_shown = now
+        self.tabs.set_current(tab)
 
-        #   Sort by checkstate
-        checklist_items = sorted(checklist_items, key = lambda item : item.check)
+        if (tab):
+            tab.materialize()
+            tab.last_shown = now
 
-        self._refresh_checklist(checklist_items)
+        self._release_inactive_tabs()
 
-    def _sort_list_color(self):
+    def _release_inactive_tabs(self):
         '''
-        Sort checklist by color
+        Releases the widgets of the tabs hidden the longest, down to MAX_LIVE_TABS
         '''
-        logger.info('Sorting checklist: sort by color')
+        if (not self.MAX_LIVE_TABS):
+            return
 
-        checklist_items = self.TABS[self.tab_widget.currentIndex()].ITEMS
+        hidden = [tab for tab in self.tabs if ((tab.materialized) and (tab is not self.tabs.current))]
+        hidden.sort(key = lambda tab : tab.last_shown)
 
-        #   Sort by checkstate
-        checklist_items = sorted(checklist_items, key = lambda item : item.color)
-        self._refresh_checklist(checklist_items)
+        now = time.time()
+        for tab in hidden[:max(0, len(hidden) + 1 - self.MAX_LIVE_TABS)]:
+            if (now - tab.last_shown >= self.RELEASE_AFTER):
+                tab.release()
 
-    def _refresh_checklist(self, items):
+    def _delete_tab(self, index, remember = True):
         '''
-        Refreshes checklist
+        Deletes specified tab, remember keeps it in the Reopen Closed menu
         '''
-        #   Current checklist
-        current_tab = self.TABS[self.tab_widget.currentIndex()]
+        tab = self.tab_widget.widget(index)
+        if (tab not in self.tabs):
+            return
 
-        #   Clear checklist
-        current_tab._clear_list()
-        # print('current items')
-        # print(current_tab.ITEMS)
+        if (remember):
+            entry = tab.session_entry()
+            if (entry):
+                try:
+                    SESSION.push_closed(entry)
+                except (IOError, OSError) as error:
+                    logger.warning('Could not write session file {}: {}'.format(SESSION.path, error))
+
+        #   Removing the tab makes the next one current
+        if (tab is self.tabs.current):
+            self.tabs.set_current(None)
+        self.tab_widget.removeTab(index)
 
-        #   Populate
-        for item in items:
-            print('Adding {}'.format(item))
-            current_tab._add_item(frame = item.frame, 
-                text = item.text, 
-                color = item.color, 
-                check = item.check)
+        #   Remove from master dictionary
+        self.tabs.remove(tab)
+        tab.close_tab()
+        self._watch_sources()
 
-    def _add_tab(self, tab_name = 'Untitled'):
+    def _watch_sources(self):
         '''
-        Adds a tab
+        Watches the checklist file of every open tab, and only those
         '''
-        tab = ChecklistTab(layout = self.tab_widget, tab_name = tab_name)
-
-        #   Add to master dictionary
-        self.TABS[self.tab_widget.count() - 1] = tab
+        paths = set(tab.source for tab in self.tabs if ((tab.source) and (not tab.preset)))
+        watched = set(self.file_watcher.files())
 
-        #   Switch to new tab
-        self.tab_widget.setCurrentIndex(self.tab_widget.count() - 1)
+        if (watched - paths):
+            self.file_watcher.removePaths(list(watched - paths))
+        for path in paths - watched:
+            if (os.path.exists(path)):
+                self.file_watcher.addPath(path)
 
-        #   Return newly created tab
-        return tab
+    def _file_changed(self, path):
+        '''
+        Waits for the file to stop changing before reloading it
+        '''
+        self.changed_files.add(path)
+        self.reload_timer.start()
 
-    def _delete_tab(self, index):
+    def _reload_changed_files(self):
         '''
-        Deletes specified tab
+        Brings changes to the checklist files into the tabs that have them open
         '''
-        self.tab_widget.removeTab(index)
+        paths, self.changed_files = self.changed_files, set()
 
-        #   Remove from master dictionary
-        # print('deleting {}'.format(index))
-        # print(self.TABS.items())
-        del self.TABS[index]
-        #   Shift all the other tabs in dictionary by 1
-        for key, value in self.TABS.items():
-            if (key > index):
-                # print('setting {} to {}'.format(key, key - 1))
-                self.TABS[key - 1] = self.TABS[key]
-            elif (key == 0):
-                # print('setting {} to {}'.format(key + 1, key))
-                self.TABS[key + 1] = self.TABS[key]
-        # print('also deleting {}'.format(max(self.TABS.keys())))
-        if self.TABS:
-            del self.TABS[max(self.TABS.keys())]
+        for tab in list(self.tabs):
+            if (tab.source in paths):
+                tab.reload_source()
+
+        #   Files saved by renaming over them stop being watched
+        self._watch_sources()
 
     def _save_checklist(self):
         '''
         Saves current checklist at stored directory
         '''
 
-        print('Current index: {}'.format(self.tab_widget.currentIndex()))
-        print('Dictionary: {}'.format(self.TABS[self.tab_widget.currentIndex()]))
+        current_tab = self.current_tab
+        if (not current_tab):
+            return
 
         #   Get saved checklist directory
-        export_file = self.TABS[self.tab_widget.currentIndex()].save_directory
+        export_file = current_tab.save_directory
 
         #   If save directory is blank or if it is a preset checklist, run save as function
-        if (not export_file) or (self.TABS[self.tab_widget.currentIndex()].preset):
+        if (not export_file) or (current_tab.preset):
             self._save_as_checklist()
             return
 
+        #   Nothing changed since the last save
+        if (not current_tab.dirty):
+            logger.info('No changes to save')
+            return
+
         #   Write to file
         self._write_to_file(export_file)
 
@@ -398,9 +865,11 @@ class MayaChecklistUI(QtWidgets.QDialog):
         '''
         Save current checklist as new file
         '''
+        import maya.cmds as mc
 
-        print('Current index: {}'.format(self.tab_widget.currentIndex()))
-        print('Dictionary: {}'.format(self.TABS[self.tab_widget.currentIndex()]))
+        current_tab = self.current_tab
+        if (not current_tab):
+            return
 
         #    Get current scene directory
         currentSceneName = mc.workspace(query = True, dir = True)
@@ -410,13 +879,20 @@ class MayaChecklistUI(QtWidgets.QDialog):
             self, 
             'Save file',
             currentSceneName,
-            "JSON Files (*.json)"
+            "JSON Files (*.json);;Binary Checklist Files (*.mcb)"
             )
         
         export_file = selectedFile[0]
+        if (not export_file):
+            return
+
+        #   The extension picks the format, the dialog doesn't always add the one of the chosen filter
+        if (not export_file.lower().endswith(storage.CHECKLIST_EXTENSIONS)):
+            extensions = [each for each in storage.CHECKLIST_EXTENSIONS if ('*' + each in selectedFile[1])]
+            export_file += extensions[0] if extensions else storage.CHECKLIST_EXTENSIONS[0]
 
         #   Set save directory in checklist class
-        self.TABS[self.tab_widget.currentIndex()].save_directory = export_file
+        current_tab.save_directory = export_file
 
         #   Write to file
         self._write_to_file(export_file)
@@ -425,69 +901,76 @@ class MayaChecklistUI(QtWidgets.QDialog):
         '''
         Save current checklist as a preset
         '''
-        pass
+        import maya.cmds as mc
 
-    def _write_to_file(self, export_file):
-        '''
-        Writes checklist data to export file
-        '''
-        with open(export_file, 'w') as outfile:
+        current_tab = self.current_tab
+        if (not current_tab):
+            return
+
+        name, accepted = QtWidgets.QInputDialog.getText(self,
+            'Save As Preset',
+            'Preset name',
+            text = current_tab.tab_name)
+        name = name.strip()
+        if ((not accepted) or (not name)):
+            return
 
-            data = []
+        info = current_tab.header_info()
+        info['checklist_name'] = name
+        info['save_directory'] = ''
+        info['preset'] = True
 
-            #   Create info dictionary
-            logger.debug('Checklist name: {}'.format(self.TABS[self.tab_widget.currentIndex()].tab_name))
-            logger.debug('Save Directory: {}'.format(self.TABS[self.tab_widget.currentIndex()].save_directory))
-            logger.debug('Preset: {}'.format(self.TABS[self.tab_widget.currentIndex()].preset))
+        #   Presets always start unchecked, every checklist made from one gets its own uids
+        data = storage.checklist_data(info, current_tab.checklist)
+        for each in data[1:]:
+            each['check'] = False
+            del each['id']
 
-            info = {'checklist_name' : self.TABS[self.tab_widget.currentIndex()].tab_name,
-                'save_directory' : self.TABS[self.tab_widget.currentIndex()].save_directory,
-                'preset' : self.TABS[self.tab_widget.currentIndex()].preset}
-                
-            data.append(info)
+        try:
+            PRESET_REGISTRY.save(name.lower().replace(' ', '_'), data)
+        except (IOError, OSError) as error:
+            mc.warning('Could not save preset {}: {}'.format(name, error))
+            return
 
-            for each in self.TABS[self.tab_widget.currentIndex()].ITEMS:
-                each_dict = {}
-                each_dict['frame'] = each.frame
-                each_dict['text'] = each.text
-                each_dict['color'] = each.color
-                each_dict['check'] = each.check
+        self._build_presets_menu()
 
-                logger.debug(each_dict)
+    def _write_to_file(self, export_file):
+        '''
+        Writes checklist data to export file
+        '''
+        current_tab = self.current_tab
 
-                data.append(each_dict)
+        logger.debug('Checklist name: {}'.format(current_tab.tab_name))
+        logger.debug('Save Directory: {}'.format(current_tab.save_directory))
+        logger.debug('Preset: {}'.format(current_tab.preset))
 
-            json.dump(data, outfile)
+        #   The snapshot is taken now, the file is written on a worker thread
+        current_tab.save_to(export_file)
 
     def _load_preset(self, preset):
         '''
         Load preset
         '''
-        logger.info('Loading preset checklist: {}'.format(preset))
+        import maya.cmds as mc
 
-        #   Query all the lists in the presets folder
-        presets_folder_directory = os.path.abspath(os.path.join(marker.__file__, os.pardir))
-        all_preset_checklists = [each_file for each_file in os.listdir(presets_folder_directory) if (each_file.lower()).endswith('json')]
-        logger.debug('All files in presets folder: {}'.format(all_preset_checklists))
+        logger.info('Loading preset checklist: {}'.format(preset))
 
-        #   Check for specified preset in the presets folder
-        preset_name = '{}.json'.format(preset)
-        if not (preset_name in all_preset_checklists):
+        #   Parsed presets are cached, reopening one doesn't touch the disk
+        try:
+            info, records = PRESET_REGISTRY.get(preset)
+        except KeyError:
             mc.warning('Specified preset does not exist!')
             return False
 
-        #   Generate load path
-        load_checklist = os.path.join(presets_folder_directory, preset_name)
+        with profiling.timed('load_preset', items = len(records)):
+            tab = self._add_tab()
+            tab.populate(info, records, source = PRESET_REGISTRY.preset(preset).path)
 
-        #   Load preset
-        self._load_checklist(checklist = load_checklist)
-
-    def _load_checklist(self, checklist = None):
+    def _load_checklist(self, checklist = None, select = True):
         '''
         Loads checklist
         '''
-        #   Open new tab
-        tab = self._add_tab()
+        import maya.cmds as mc
 
         import_file = checklist
         #   If the chekclist isn't specified, load prompt dialog box
@@ -500,34 +983,70 @@ class MayaChecklistUI(QtWidgets.QDialog):
                 self, 
                 'Open file',
                 currentSceneName,
-                "JSON Files (*.json)"
+                "Checklist Files (*.json *.mcb)"
                 )
             
             import_file = selectedFile[0]
-            
+
+        if (not import_file):
+            return
+
+        #   Open new tab
+        tab = self._add_tab(select = select)
 
         #   Set save directory
-        self.TABS[self.tab_widget.currentIndex()].save_directory = import_file
-
-        with open(import_file) as infile:
-            data = infile.read()
-            imported_checklist = json.loads(data)
-
-            #   Add checklist items to new tab
-            for i, checklist_item in enumerate(imported_checklist):
-                
-                #   Get checklist info from first dictionary item
-                if (i == 0):
-                    self._rename_checklist(name = checklist_item['checklist_name'])
-                    tab.save_directory = checklist_item['save_directory']
-                    tab.preset = checklist_item['preset']
-                else:
-                    print(checklist_item['text'])
-                    print(checklist_item['color'])
-                    tab._add_item(frame = checklist_item['frame'], 
-                        text = checklist_item['text'], 
-                        color = checklist_item['color'], 
-                        check = checklist_item['check'])
+        tab.save_directory = import_file
+
+        #   The file is parsed on a worker thread and added to the tab in batches
+        tab.load_cancelled.connect(lambda tab = tab: self._delete_tab(self.tab_widget.indexOf(tab), remember = False))
+        tab.begin_load(ChecklistLoader(import_file))
+
+        return tab
+
+    def _show_search(self):
+        '''
+        Opens the search window
+        '''
+        if (not self.search_dialog):
+            self.search_dialog = search.SearchDialog(self.search_index, self._checklist_tab_name, self)
+            self.search_dialog.tab_result_activated.connect(self._show_search_result)
+            self.search_dialog.file_result_activated.connect(self._open_search_result)
+
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+
+    def _tabs(self):
+        return [self.tab_widget.widget(index) for index in range(self.tab_widget.count())]
+
+    def _checklist_tab_name(self, checklist):
+        for tab in self.tabs:
+            if (tab.checklist is checklist):
+                return tab.tab_name
+        return ''
+
+    def _show_search_result(self, checklist, record):
+        '''
+        Switches to the tab of a search result and shows its row
+        '''
+        for tab in self.tabs:
+            if (tab.checklist is checklist):
+                self.tab_widget.setCurrentWidget(tab)
+                tab.show_row(checklist.row_of(record))
+                return
+
+    def _open_search_result(self, path, row):
+        '''
+        Shows a row of a checklist file, loading the file unless a tab has it open
+        '''
+        for tab in self.tabs:
+            if ((tab.source == path) or ((tab.loader) and (tab.loader.path == path))):
+                self.tab_widget.setCurrentWidget(tab)
+                tab.show_row(row)
+                return
+
+        tab = self._load_checklist(path)
+        if (tab):
+            tab.show_row(row)
 
     def _rename_checklist(self, name = None):
         '''
@@ -536,16 +1055,14 @@ class MayaChecklistUI(QtWidgets.QDialog):
 
         if (not name):
             #   Prompt user for new name
-            input_tab_name_dialog = QtGui.QInputDialog()
+            input_tab_name_dialog = QtWidgets.QInputDialog()
             input_tab_name_dialog.setLabelText("Rename checklist")
             input_tab_name_dialog.setWindowTitle("Rename Checklist")
             input_tab_name_dialog.exec_()
             name = input_tab_name_dialog.textValue()
 
-            print('input: {}'.format(name))
-
-        self.TABS[self.tab_widget.currentIndex()].tab_name = name
-        self.tab_widget.setTabText(self.tab_widget.currentIndex(), name)
+        if (self.current_tab):
+            self.current_tab.rename(name)
 
 
 
@@ -555,49 +1072,164 @@ class ChecklistTab(QtWidgets.QWidget):
     Checklist Class
     '''
 
-    ITEMS = []
-
-    def __init__(self, layout, tab_name, preset = False):
+    #   Seconds of each event loop slice spent adding loaded items
+    LOAD_SLICE = 0.01
+    #   Journal edits before the journal is compacted into the checklist file
+    COMPACT_EVERY = 500
+    #   Frames either side of the current time that count as near it
+    HIGHLIGHT_TOLERANCE = 0
+    #   Milliseconds after the last edit before the checklist is written to the scene
+    SCENE_WRITE_DELAY = 1000
+
+    load_cancelled = QtCore.Signal()
+    #   The checklist file the tab matches changed, see source
+    source_changed = QtCore.Signal()
+    #   Emitted from the writer thread, Qt queues it back onto the ui thread
+    save_finished = QtCore.Signal(str, int, object, object)
+
+    def __init__(self, layout, tab_name, preset = False, search_index = None):
         logger.debug('Checklist tab!')
 
         super(ChecklistTab, self).__init__()
 
         self.base_layout = layout
         self.tab_name = tab_name
-        self.ITEMS = []
+        self.checklist = ChecklistModel()
 
-        self.setSizePolicy(QtGui.QSizePolicy.Expanding,QtGui.QSizePolicy.Expanding)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding,QtWidgets.QSizePolicy.Expanding)
 
         self.save_directory = ''
         self.preset = preset
+
+        #   Checklist file the tab was loaded from or last saved to
+        self.source = None
+
+        self.loader = None
+        #   time.time() the current load and save started
+        self.load_started = None
+        self.save_started = None
+
+        #   Color of new items
+        self.color = None
+
+        #   Kept while the widgets are released
+        self.checklist_filter = ChecklistFilter()
+
+        #   The widgets are only built once the tab is first shown, see materialize
+        self.content = None
+        self.list_model = None
+        #   time.time() the tab was last the current tab
+        self.last_shown = None
+        self.scroll_position = 0
+        #   Row to show once loading is done
+        self.pending_row = None
+
+        #   Checklist revision that matches the file on disk
+        self.saved_revision = self.checklist.revision
+        #   Items of the source file as they were read or written, and its
+        #   file_stamp then. Saving merges in whatever changed since.
+        self.base_items = None
+        self.source_stamp = None
+        #   Saves submitted and not finished yet
+        self.pending_saves = 0
+        #   True once the tab is closed, it is deleted when its saves are done
+        self.closed = False
+
+        #   fileInfo key of the checklist when it is stored in the scene, and
+        #   the revision last written there
+        self.scene_key = None
+        self.scene_revision = None
+
+        #   Notes sorted by frame for the timeline highlight
+        self.frame_index = FrameIndex(self.checklist)
+
+        #   Every edit is appended to the journal as it happens
+        self.journal = ChecklistJournal()
+        #   Every edit can be undone, loading can't
+        self.undo_stack = UndoStack(self.checklist)
+        #   Sort mode of the tab, new and edited items go to their sorted rows
+        self.checklist_sort = ChecklistSort(self.checklist)
+        self.journal.compact(self.header_info())
+        self._compacting = False
+        self.checklist.subscribe(self._checklist_changed)
+
+        #   Every note goes into the search index of the window
+        self.search_feed = None
+        if (search_index is not None):
+            self.search_feed = ChecklistSearchFeed(search_index, self.checklist)
         
         self._build_ui()
 
+        self.save_finished.connect(self._save_finished)
+
+    @property
+    def ITEMS(self):
+        '''
+        Checklist records in display order
+        '''
+        return self.checklist.items
 
     def _build_ui(self):
         '''
-        Create the main ui
+        Create the tab page, its contents are built by materialize
         '''
-        tab_layout = QtWidgets.QVBoxLayout(self)
+        self.tab_layout = QtWidgets.QVBoxLayout(self)
+        self.tab_layout.setContentsMargins(0, 0, 0, 0)
         self.base_layout.addTab(self, self.tab_name)
 
+        self.load_timer = QtCore.QTimer(self)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self._load_next_batch)
+
+        #   Edited items are moved to their sorted rows once the edit is done
+        self.sort_timer = QtCore.QTimer(self)
+        self.sort_timer.setSingleShot(True)
+        self.sort_timer.setInterval(0)
+        self.sort_timer.timeout.connect(self._place_changed)
+
+        #   Edits are written to the scene once they stop coming
+        self.scene_timer = QtCore.QTimer(self)
+        self.scene_timer.setSingleShot(True)
+        self.scene_timer.setInterval(self.SCENE_WRITE_DELAY)
+        self.scene_timer.timeout.connect(self.write_to_scene)
+
+    @property
+    def materialized(self):
+        return self.content is not None
+
+    def materialize(self):
+        '''
+        Builds the tab widgets, called when the tab is first shown
+        '''
+        if (self.content):
+            return
+
+        logger.debug('Building tab: {}'.format(self.tab_name))
+
+        self.content = QtWidgets.QWidget(self)
+        content_layout = QtWidgets.QVBoxLayout(self.content)
+
         #   Create add checklist item button
-        add_checklist_widget = QtWidgets.QWidget(self)
+        add_checklist_widget = QtWidgets.QWidget(self.content)
         add_checklist_layout = QtWidgets.QHBoxLayout(add_checklist_widget)
 
         #   Color picker
-        self.color = None
-        self.color_picker_button = QtWidgets.QPushButton(self)
+        self.color_picker_button = QtWidgets.QPushButton(self.content)
         self.color_picker_button.setMaximumWidth(30)
         self.color_picker_button.clicked.connect(lambda target = self.color_picker_button: self._pick_color(target))
         self.color_picker_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.color_picker_button.customContextMenuRequested.connect(self._color_right_click_menu)
+        if (self.color):
+            views.set_button_color(self.color_picker_button, self.color)
 
-        self.checklist_text = QtWidgets.QLineEdit(self)
-        self.checklist_frame = QtWidgets.QLineEdit(self)
+        self.checklist_text = views.NoteLineEdit(self.content)
+        self.checklist_text.setToolTip('Paste several lines to add a note per line')
+        self.checklist_text.lines_pasted.connect(self._paste_items)
+        self.checklist_frame = QtWidgets.QLineEdit(self.content)
         # self.checklist_frame.setMinimumWidth(20)
-        self.checklist_frame.setMaximumWidth(50)
-        add_button = QtWidgets.QPushButton(self)
+        self.checklist_frame.setMaximumWidth(70)
+        self.checklist_frame.setToolTip('Frame or frame range, e.g. 1012-1040')
+        add_button = QtWidgets.QPushButton(self.content)
         add_button.setText('+')
         add_button.clicked.connect(self._add_item)
 
@@ -606,371 +1238,798 @@ class ChecklistTab(QtWidgets.QWidget):
         add_checklist_layout.addWidget(self.checklist_text)
         add_checklist_layout.addWidget(add_button)
         
-        tab_layout.addWidget(add_checklist_widget)
+        content_layout.addWidget(add_checklist_widget)
+
+        self.filter_bar = views.ChecklistFilterBar(self.content)
+        self.filter_bar.set_filter(self.checklist_filter)
+        self.filter_bar.filter_changed.connect(self.set_filter)
+        content_layout.addWidget(self.filter_bar)
+
+        #   Checklist view
+        #    The delegate paints every row, so only the visible rows cost anything
+        self.list_model = views.ChecklistListModel(self.checklist, self.content)
+        self.item_delegate = views.ChecklistItemDelegate(self.content)
+        self.item_delegate.frame_clicked.connect(self._jump_to_frame)
+
+        self.list_view = QtWidgets.QListView(self.content)
+        self.list_view.setModel(self.list_model)
+        self.list_view.setItemDelegate(self.item_delegate)
+        #    All rows share one height, so the view never measures rows it is not showing
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.list_view.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._right_click_menu)
+        content_layout.addWidget(self.list_view)
+
+        #   Only added and edited rows are tested again
+        self.row_filter = RowFilter(self.checklist, self.list_view.setRowHidden)
+        self.row_filter.set_filter(self.checklist_filter)
+
+        #   Loading progress
+        self.load_widget = QtWidgets.QWidget(self.content)
+        load_layout = QtWidgets.QHBoxLayout(self.load_widget)
+        load_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.load_progress = QtWidgets.QProgressBar(self.load_widget)
+        self.load_progress.setRange(0, 100)
+        load_cancel_button = QtWidgets.QPushButton(self.load_widget)
+        load_cancel_button.setText('Cancel')
+        load_cancel_button.clicked.connect(self._cancel_load)
+
+        load_layout.addWidget(self.load_progress)
+        load_layout.addWidget(load_cancel_button)
+        content_layout.addWidget(self.load_widget)
+        if (self.loader):
+            self.load_progress.setValue(int(self.loader.progress * 100))
+        else:
+            self.load_widget.hide()
 
-        #   Create scroll area
-        scroll_widget = QtWidgets.QWidget()
-        #    This makes sure the scroll doesn't act weird when there are only a few items
-        scroll_widget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Maximum)        
-        self.scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
+        self.tab_layout.addWidget(self.content)
 
-        #   Scroll Area
-        scroll_area = QtWidgets.QScrollArea()
-        
-        #    Make resizable
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(scroll_widget)
-        tab_layout.addWidget(scroll_area)
+        #   Back where it was before the widgets were released, once the view is laid out
+        if (self.scroll_position):
+            QtCore.QTimer.singleShot(0, self._restore_scroll_position)
 
-    def _pick_color(self, target = None):
+    def set_filter(self, checklist_filter):
         '''
-        Color picker dialog box
+        Shows only the items that pass checklist_filter
         '''
-        color = QtGui.QColorDialog.getColor()
-        self.color = color.name()
-        target.setStyleSheet('QWidget { background-color: %s}' % self.color)
+        logger.info('Filtering checklist: {}'.format(self.tab_name))
 
+        self.checklist_filter = checklist_filter
+        if (self.content):
+            with profiling.timed('filter', items = len(self.checklist)):
+                self.row_filter.set_filter(checklist_filter)
+            self.filter_bar.set_filter(checklist_filter)
 
-    def _color_right_click_menu(self, point):
+    def _restore_scroll_position(self):
+        if (self.content):
+            self.list_view.verticalScrollBar().setValue(self.scroll_position)
+
+    def release(self):
         '''
-        Show right click menu of color picker
+        Deletes the tab widgets, the checklist itself is kept
         '''
-        menu = QtGui.QMenu()
+        if (not self.content):
+            return
 
-        menu_default = menu.addAction('Default')
-        menu.addSeparator()
-        menu_red = menu.addAction('Red')
-        menu_blue = menu.addAction('Blue')
-        menu_green = menu.addAction('Green')
-        menu_yellow = menu.addAction('Yellow')
-
-        palette_dict = {
-            menu_default : 'Default',
-            menu_red : '#733230',
-            menu_blue : '#002D40',
-            menu_green : '#2C594F',
-            menu_yellow : '#998A2F'
-        }
+        logger.debug('Releasing tab: {}'.format(self.tab_name))
+
+        self.scroll_position = self.list_view.verticalScrollBar().value()
+        self.list_model.detach()
+        self.row_filter.detach()
+
+        self.content.hide()
+        self.content.deleteLater()
+
+        self.content = None
+        self.list_model = None
+        self.row_filter = None
+        self.filter_bar = None
+        self.item_delegate = None
+        self.list_view = None
+        self.load_widget = None
+        self.load_progress = None
+        self.color_picker_button = None
+        self.checklist_text = None
+        self.checklist_frame = None
+
+    @property
+    def dirty(self):
+        '''
+        True if the checklist changed since it was loaded or saved
+        '''
+        return self.checklist.revision != self.saved_revision
 
-        action = menu.exec_(self.mapToGlobal(point))
-        self.color = palette_dict.get(action, 'Default')
+    def header_info(self):
+        '''
+        Returns the header dict of the checklist file
+        '''
+        return {'checklist_name' : self.tab_name,
+            'save_directory' : self.save_directory,
+            'preset' : self.preset,
+            'sort' : list(self.checklist_sort.keys)}
+
+    def snapshot(self):
+        '''
+        Returns the checklist file contents for the current state
+        '''
+        return storage.checklist_data(self.header_info(), self.checklist)
 
-        self.color_picker_button.setStyleSheet('QWidget { background-color: %s}' % self.color)
+    def populate(self, info, records, source = None):
+        '''
+        Fills the tab with parsed checklist data
 
-    def _add_item(self, frame = None, text = None, color = None, check = False):
+        source is the checklist file the data came from, if any
         '''
-        Adds a checklist item
+        self._apply_header(info)
+        self.checklist.extend(records)
+        self.checklist_sort.sort()
+        self.undo_stack.clear()
+
+        self.source = source
+        self.saved_revision = self.checklist.revision
+        if (self.journal):
+            self.journal.compact(self.header_info(), self.checklist, source = source)
+        self.source_changed.emit()
+
+    def session_entry(self):
         '''
-        #   Check if text and frame are specified
-        if (not frame):
-            frame = self.checklist_frame.text()
-        if (not text):
-            text = self.checklist_text.text()
-        if (not color):
-            color = self.color
+        Returns what the session file needs to reopen this tab, None if it is empty
+        '''
+        if (self.loader):
+            return {'name' : self.tab_name, 'path' : self.loader.path}
 
-        if (not color):
-            color = 'Default'
+        if ((self.source) and (not self.dirty)):
+            return {'name' : self.tab_name, 'path' : self.source}
 
-        item = ChecklistItem(checklist = self, 
-            layout = self.scroll_layout,
-            frame = frame,
-            text = text,
-            color = color,
-            check = check)
+        if (not len(self.checklist)):
+            return None
 
-        #   Reset text
-        self.checklist_frame.setText('')
-        self.checklist_text.setText('')
+        return {'name' : self.tab_name,
+            'info' : self.header_info(),
+            'items' : [record.to_dict() for record in self.checklist]}
 
-    def _clear_list(self):
+    def rename(self, name):
         '''
-        Clear checklist
+        Renames the checklist and its tab
         '''
-        for i, each in enumerate(self.ITEMS):
+        self.tab_name = name
+        self.checklist.touch()
+        self.base_layout.setTabText(self.base_layout.indexOf(self), name)
+        self._scene_changed()
 
-            #    Remove widget from UI
-            each.setParent(None)
-            each.setVisible(False)
+        if (self.journal):
+            self.journal.header(self.header_info())
 
-            #    Theoretically, this line should be enough, but since there is 
-            #    often a time lag, the above 2 methods are also recommended
-            each.deleteLater()
+    def _checklist_changed(self, event, first, last):
+        '''
+        Journals every edit, loading is covered by the checklist file itself
+        '''
+        if (self.loader):
+            return
 
-        self.ITEMS = []
+        if ((event == core_checklist.CHANGE) and (self.checklist_sort.changed)):
+            if (self.undo_stack.applying):
+                #   Undo and redo put the rows back themselves
+                self.checklist_sort.changed = []
+            else:
+                self.sort_timer.start()
 
+        self._scene_changed()
 
-class ChecklistItem(QtWidgets.QWidget):
-    
-    PALETTE = {
-        'default' : QtCore.Qt.lightGray,
-        'disabled' : QtCore.Qt.gray,
-        'white' : QtCore.Qt.white,
-        'yellow' : QtCore.Qt.yellow,
-        'red' : QtCore.Qt.red,
-        'cyan' : QtCore.Qt.cyan,
-        'green' : QtCore.Qt.green
-        }
+        if (not self.journal):
+            return
 
-    def __init__(self, checklist, layout, frame = None, text = None, check = False, color = 'Default'):
-        logger.debug('Checklist item!')
+        self.journal.record(event, first, last, self.checklist)
 
-        super(ChecklistItem, self).__init__()
+        if ((self.journal.edits >= self.COMPACT_EVERY) and (not self._compacting)):
+            self._compact_journal()
 
-        self.checklist = checklist
-        self.base_layout = layout
-        self.setSizePolicy(QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Expanding)
-        self.setMinimumSize(self.sizeHint())
-
-        if (not frame.lstrip('-').isdigit()):
-            frame = None
-        self.text = text
-        self.frame = frame
-        self.check = check
-        self.color = color
+    def _compact_journal(self):
+        '''
+        Autosaves to the checklist file and shrinks the journal down to it
+        '''
+        if ((self.save_directory) and (not self.preset)):
+            #   The journal is compacted once the save is done
+            self._compacting = True
+            self.save_to(self.save_directory)
+        else:
+            self.journal.compact(self.header_info(), self.checklist)
 
-        #   Add to checklist dictionary
-        self.checklist.ITEMS.append(self)
+    def close_journal(self, discard = False):
+        '''
+        Stops journaling, discard deletes the journal file
+        '''
+        if (self.journal):
+            self.journal.close(discard = discard)
+            self.journal = None
 
+    def close_search_feed(self):
+        '''
+        Drops the notes of the tab from the search index
+        '''
+        if (self.search_feed):
+            self.search_feed.detach()
+            self.search_feed = None
 
-        self._build_ui()
+    def link_scene(self, key):
+        '''
+        Marks the checklist as the one stored in the scene under key, as it is now
+        '''
+        self.scene_key = key
+        self.scene_revision = self.checklist.revision
 
-    def _build_ui(self):
-        
-        #    Base horizontal layout
-        self.item_layout = QtWidgets.QHBoxLayout(self)
-        self.base_layout.addWidget(self)
-
-        # ---------------------------------------------------------------------#
-        #    Main Content
-        # ---------------------------------------------------------------------#
-        #   Check box
-        self.check_box = QtWidgets.QCheckBox()
-        self.check_box.setMinimumWidth(15)
-        self.check_box.setMaximumWidth(15)
-        self.item_layout.addWidget(self.check_box)
-
-        #    Frame block
-        self.frame_block = QtWidgets.QPushButton(self.frame)
-        self.frame_block.setMinimumWidth(30)
-        self.frame_block.setMaximumWidth(30)
-        self.frame_block.clicked.connect(self._jump_to_frame)
-        self.item_layout.addWidget(self.frame_block)
-
-        #    Text block
-        self.text_block = QtWidgets.QLabel(self.text)
-        self.text_block.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.text_block.customContextMenuRequested.connect(self._right_click_menu)
-        self.text_block.setSizePolicy(QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Expanding)
-        self.text_block.setWordWrap(True)
-        # self.text_block.setMinimumWidth(120)
-        # self.text_block.setMaximumWidth(180)
-        self.item_layout.addWidget(self.text_block)
-
-        #    Palette
-        self.palette = QtGui.QPalette()
-        self._refresh_properties()
-        
-        self.check_box.stateChanged.connect(self._toggle_widget)
-        self.check_box.setChecked(self.check)
+    def unlink_scene(self):
+        '''
+        Stops writing the checklist to the scene, what is stored there is left alone
+        '''
+        self.scene_timer.stop()
+        self.scene_key = None
+        self.scene_revision = None
 
-    def _refresh_properties(self):
+    def store_in_scene(self, key):
         '''
-        Refresh color, frame block, text block
+        Starts saving the checklist with the scene under key
         '''
-        #   Color
-        print('refresh properties')
-        print(self.color)
+        self.scene_key = key
+        self.scene_revision = None
+        self.write_to_scene()
 
-        if ((self.color) and (self.color != 'Default')):
-            self.palette.setColor(QtGui.QPalette.Background, self.color)
-            self.setAutoFillBackground(True)
-            self.setPalette(self.palette)
-            print('a')
-        else:
-            self.setAutoFillBackground(False)
-            print('b')
+    def remove_from_scene(self):
+        '''
+        Deletes the checklist from the scene
+        '''
+        if (not self.scene_key):
+            return
 
+        SCENE_CHECKLISTS.remove(self.scene_key)
+        self.unlink_scene()
 
-        #   Frame block
-        self.frame_block.setText(self.frame)
+    def _scene_changed(self):
+        '''
+        Schedules a write to the scene, the scene is marked as modified right away so Maya asks to save it
+        '''
+        import maya.cmds as mc
 
-        #   Text block
-        self.text_block.setText(self.text)
+        if ((not self.scene_key) or (self.scene_timer.isActive())):
+            return
 
+        mc.file(modified = True)
+        self.scene_timer.start()
 
-    def _destroy(self):
+    def write_to_scene(self):
         '''
-        Delete Checklist item instance
+        Writes the checklist to the scene unless it is already there as it is
         '''
-        logger.debug('Deleting item!')
-        print('Deleting item {}!'.format(self))
+        self.scene_timer.stop()
+        if ((not self.scene_key) or (self.loader) or (self.checklist.revision == self.scene_revision)):
+            return False
 
-        #   Remove from dictionary
-        self.checklist.ITEMS.remove(self)
-        print(self.checklist.ITEMS)
+        revision = self.checklist.revision
+        with profiling.timed('save_scene', items = len(self.checklist)):
+            SCENE_CHECKLISTS.write(self.scene_key, self.snapshot())
+        self.scene_revision = revision
+        return True
 
-        #    Remove widget from UI
-        self.setParent(None)
-        self.setVisible(False)
+    def set_sort(self, keys):
+        '''
+        Keeps the checklist sorted by keys, most significant first, no keys stops sorting
+        '''
+        keys = tuple(keys)
+        if (keys == self.checklist_sort.keys):
+            with profiling.timed('sort', items = len(self.checklist)):
+                self.checklist_sort.sort()
+            return
 
-        #    Theoretically, this line should be enough, but since there is 
-        #    often a time lag, the above 2 methods are also recommended
-        self.deleteLater()
+        #   The existing rows are moved, the view keeps its selection and hidden rows
+        with profiling.timed('sort', items = len(self.checklist)):
+            self.checklist_sort.set_keys(keys)
 
-        return
+        #   The sort is saved with the checklist
+        self.checklist.touch()
+        if (self.journal):
+            self.journal.header(self.header_info())
 
-    def _jump_to_frame(self):
+    def _place_changed(self):
         '''
-        Jump to frame in Maya Timeline
+        Moves edited items to their sorted rows, undone together with the edit
+        '''
+        with self.undo_stack.amend():
+            self.checklist_sort.place()
+
+    def close_tab(self):
+        '''
+        Stops loading, journaling and indexing once the tab is closed, then deletes it
+        '''
+        if (self.loader):
+            self.loader.cancel()
+            self._finish_load()
+
+        #   The scene keeps the checklist, closing the tab only closes the view
+        self.write_to_scene()
+        self.unlink_scene()
+
+        self.close_search_feed()
+        self.undo_stack.detach()
+        self.checklist_sort.detach()
+        self.sort_timer.stop()
+        self.release()
+
+        #   A closed tab doesn't need recovering, once what it was saving is in the file
+        self.closed = True
+        if (not self.pending_saves):
+            self.close_journal(discard = True)
+            self.deleteLater()
+
+    def save_to(self, export_file):
+        '''
+        Saves a snapshot of the checklist without blocking the ui
+        '''
+        revision = self.checklist.revision
+        self.save_started = time.time()
+
+        with profiling.timed('save_snapshot', items = len(self.checklist)):
+            data = self.snapshot()
+
+        #   Changes someone else saved to the file since it was read are merged in, not overwritten
+        base = stamp = None
+        if (export_file == self.source):
+            base, stamp = self.base_items, self.source_stamp
+
+        def finished(path, error, result, revision = revision, data = data):
+            self.save_finished.emit(path, revision, error, None if error else (data,) + tuple(result))
+
+        self.pending_saves += 1
+        CHECKLIST_WRITER.submit(export_file, data, finished, base = base, stamp = stamp)
+
+    def _save_finished(self, path, revision, error, saved):
+        '''
+        Called on the ui thread once the writer is done with a file
+
+        saved holds the data submitted, then what storage.save_checklist returned
+        '''
+        import maya.cmds as mc
+
+        self._compacting = False
+        self.pending_saves -= 1
+
+        if (error):
+            mc.warning('Could not save checklist {}: {}'.format(path, error))
+            if (self.closed):
+                #   Left behind for recovery, the file doesn't have the edits of the closed tab
+                self.close_journal()
+
+        if (self.closed):
+            if (not self.pending_saves):
+                self.close_journal(discard = True)
+                self.deleteLater()
+            return
+
+        if (error):
+            return
+
+        submitted, written, stamp, conflicts = saved
+        unchanged = (revision == self.checklist.revision)
+
+        logger.info('Saved checklist: {}'.format(path))
+        profiling.record('save', time.time() - self.save_started, items = len(self.checklist))
+        self.base_items = written[1:]
+        self.source_stamp = stamp
+        self.source = path
+
+        if (conflicts is not None):
+            self._apply_merged(submitted[1:], written[1:], conflicts)
+
+        #   Without edits while saving, the checklist matches the file
+        if (unchanged):
+            self.saved_revision = self.checklist.revision
+        elif (conflicts is None):
+            self.saved_revision = revision
+
+        #   Nothing was edited while saving, the file holds everything in the journal
+        if ((self.journal) and (unchanged)):
+            self.journal.compact(self.header_info(), source = path)
+
+        self.source_changed.emit()
+
+    def reload_source(self):
+        '''
+        Brings in changes someone else saved to the checklist file, keeping the edits not saved here
+
+        Only the rows that differ are touched. Returns True if the file had changed.
+        '''
+        import maya.cmds as mc
+
+        #   A save in progress merges the file itself
+        if ((not self.source) or (self.loader) or (self.pending_saves) or (self.base_items is None)):
+            return False
+
+        stamp = storage.file_stamp(self.source)
+        if ((stamp is None) or (stamp == self.source_stamp)):
+            return False
+
+        try:
+            with profiling.timed('reload_read'):
+                theirs = list(storage.iter_checklist(self.source))[1:]
+        except (IOError, OSError, ValueError) as error:
+            #   Another change is coming if the file was caught half written
+            mc.warning('Could not reload checklist {}: {}'.format(self.source, error))
+            return False
+
+        was_dirty = self.dirty
+        current = [record.to_dict() for record in self.checklist]
+
+        with profiling.timed('reload', items = len(theirs)):
+            items, conflicts = merge.merge_items(self.base_items, current, theirs)
+            with self.undo_stack.group('Reload'):
+                removed, changed, added = self._apply_items(items)
+
+        #   merge_items gave the items of an older file their ids
+        self.base_items = theirs
+        self.source_stamp = stamp
+
+        logger.info('Reloaded {}: {} removed, {} changed, {} added'.format(self.source, removed, changed, added))
+        if (conflicts):
+            mc.warning('{} item(s) of {} were also changed by someone else, kept your changes'.format(len(conflicts),
+                self.tab_name))
+
+        #   Without unsaved edits the checklist still matches the file
+        if (not was_dirty):
+            self.saved_revision = self.checklist.revision
+            if (self.journal):
+                self.journal.compact(self.header_info(), source = self.source)
+        elif ((self.journal) and (self.journal.edits >= self.COMPACT_EVERY) and (not self._compacting)):
+            self._compact_journal()
+
+        return True
+
+    def _apply_items(self, items):
+        '''
+        Applies merged item dicts with merge.apply_items and sorts them, the
+        journal isn't compacted until every row is in place
         '''
-        if (self.frame):
-            mc.currentTime(self.frame)
+        compacting, self._compacting = self._compacting, True
+        try:
+            counts = merge.apply_items(self.checklist, items)
+            #   Merged rows come in the order of the file
+            self.checklist_sort.sort()
+            return counts
+        finally:
+            self._compacting = compacting
+
+    def _apply_merged(self, submitted, written, conflicts):
+        '''
+        Brings changes merged in from the file into the checklist, keeping edits made while saving
+        '''
+        import maya.cmds as mc
+
+        current = [record.to_dict() for record in self.checklist]
+        items = merge.merge_items(submitted, current, written)[0]
+
+        with self.undo_stack.group('Merge'):
+            removed, changed, added = self._apply_items(items)
+
+        logger.info('Merged changes from {}: {} removed, {} changed, {} added'.format(self.source,
+            removed, changed, added))
+        if (conflicts):
+            mc.warning('{} item(s) of {} were also changed by someone else, kept your changes'.format(len(conflicts),
+                self.tab_name))
+
+    def begin_load(self, loader):
+        '''
+        Starts filling the tab from a ChecklistLoader
+        '''
+        self.loader = loader
+        self.load_started = time.time()
+        self.undo_stack.recording = False
+
+        if (self.content):
+            self.load_progress.setValue(0)
+            self.load_widget.show()
+
+        self.loader.start()
+        self.load_timer.start()
+
+    def _load_next_batch(self):
+        '''
+        Adds whatever the loader has parsed, for at most LOAD_SLICE seconds
+        '''
+        import maya.cmds as mc
+
+        end_time = time.time() + self.LOAD_SLICE
+        records = []
+        finished = False
+        error = None
+
+        try:
+            while (time.time() < end_time) and (not finished):
+                messages = self.loader.poll(max_items = self.loader.batch_size)
+                if (not messages):
+                    break
+
+                for message, data in messages:
+                    if (message == storage.HEADER):
+                        self._apply_header(data)
+                    elif (message == storage.ITEMS):
+                        records.extend(data)
+                    elif (message == storage.ERROR):
+                        finished = True
+                        error = data
+                    elif (message == storage.DONE):
+                        finished = True
+        except Exception as load_error:
+            #   Left running, the timer would fire forever on a tab stuck loading
+            error = load_error
+
+        #   A partly loaded checklist is closed, saving it would overwrite the file with part of it
+        if (error):
+            mc.warning('Could not load checklist {}: {}'.format(self.loader.path, error))
+            self.loader.cancel()
+            self._finish_load()
+            self.save_directory = None
+            self.load_cancelled.emit()
+            return
+
+        #   One insert per slice, the view only paints what is visible
+        with profiling.timed('load_batch', items = len(records)):
+            self.checklist.extend(records)
+        profiling.count('items_loaded', len(records))
+        if (self.content):
+            self.load_progress.setValue(int(self.loader.progress * 100))
+
+        if (finished):
+            path = self.loader.path
+            stamp = self.loader.stamp
+            self.checklist_sort.sort()
+            self._finish_load()
+            profiling.record('load', time.time() - self.load_started, items = len(self.checklist))
+
+            #   What was just loaded matches the file
+            self.saved_revision = self.checklist.revision
+            self.source = path
+            self.base_items = [record.to_dict() for record in self.checklist]
+            self.source_stamp = stamp
+            self.source_changed.emit()
+
+            if (self.journal):
+                self.journal.compact(self.header_info(), self.checklist, source = path)
+
+            if ((self.pending_row is not None) and (self.pending_row < len(self.checklist))):
+                self.show_row(self.pending_row)
+            self.pending_row = None
+
+    def _finish_load(self):
+        self.undo_stack.recording = True
+        self.undo_stack.clear()
+        self.load_timer.stop()
+        if (self.content):
+            self.load_widget.hide()
+        self.loader = None
+
+    def _cancel_load(self):
+        '''
+        Stops loading and discards the partly loaded checklist
+        '''
+        if (not self.loader):
+            return
+
+        logger.info('Cancelled loading {}'.format(self.loader.path))
+        self.loader.cancel()
+        self._finish_load()
+
+        self.load_cancelled.emit()
+
+    def _apply_header(self, info):
+        '''
+        Applies the checklist info from the first entry of a checklist file
+        '''
+        self.tab_name = info['checklist_name']
+        self.save_directory = info['save_directory']
+        self.preset = info['preset']
+        #   The rows are sorted once every item is in
+        self.checklist_sort.set_keys([key for key in (info.get('sort') or ()) if (key in SORT_KEYS)], sort = False)
+
+        self.base_layout.setTabText(self.base_layout.indexOf(self), self.tab_name)
+
+        if ((self.journal) and (not self.loader)):
+            self.journal.header(self.header_info())
+
+    def _pick_color(self, target = None):
+        '''
+        Color picker dialog box
+        '''
+        color = QtWidgets.QColorDialog.getColor()
+        if (not color.isValid()):
+            return
+        self.color = color.name()
+        views.set_button_color(target, self.color)
+
+    def _color_right_click_menu(self, point):
+        '''
+        Show right click menu of color picker
+        '''
+        color = views.color_right_click_menu(self.color_picker_button, point)
+        if (not color):
+            return
+
+        self.color = color
+        views.set_button_color(self.color_picker_button, self.color)
 
     def _right_click_menu(self, point):
         '''
-        Show right click menu
+        Show right click menu of a checklist item
         '''
-        menu = QtGui.QMenu()
+        index = self.list_view.indexAt(point)
+        if (not index.isValid()):
+            return
+
+        menu = QtWidgets.QMenu()
 
         edit_menu = menu.addAction('Edit')
         menu.addSeparator()
         delete_menu = menu.addAction('Delete')
 
-        action = menu.exec_(self.mapToGlobal(point))
+        action = menu.exec_(self.list_view.viewport().mapToGlobal(point))
         
         if action == edit_menu:
-            self._edit_checklist_item()
+            self._edit_checklist_item(index.row())
             
         elif action == delete_menu:
-            print('delete!')
-            self._destroy()
+            self._destroy(index.row())
 
-    def _toggle_widget(self):
+    def undo(self):
         '''
-        Toggle the wigets on and off depending on check state
+        Reverts the last edit of the checklist
         '''
-        # print('Item: {}'.format(self.text))
-        if (self.check_box.checkState()):
-            self.check = True
-            self.frame_block.setEnabled(False)
-            self.palette.setColor(QtGui.QPalette.Foreground, self.PALETTE['disabled'])
-            self.text_block.setPalette(self.palette)
-        else:
-            self.check = False
-            self.frame_block.setEnabled(True)
-            self.palette.setColor(QtGui.QPalette.Foreground, self.PALETTE[self.color])
-            self.text_block.setPalette(self.palette)
+        with profiling.timed('undo', items = len(self.checklist)):
+            label = self.undo_stack.undo()
+        if (label):
+            logger.info('Undo {}'.format(label))
+            self._check_sort()
 
-    def _edit_checklist_item(self):
+    def redo(self):
         '''
-        Edits the current checklist item
+        Repeats the last reverted edit
         '''
-        logger.debug('Edit checklist item!')
+        with profiling.timed('redo', items = len(self.checklist)):
+            label = self.undo_stack.redo()
+        if (label):
+            logger.info('Redo {}'.format(label))
+            self._check_sort()
 
-        #   Hide previous widgets
-        self.check_box.hide()
-        self.frame_block.hide()
-        self.text_block.hide()
-
-        #   Color button
-        self.edit_color_picker_button = QtWidgets.QPushButton(self)
-        self.edit_color_picker_button.setMaximumWidth(30)
-        self.edit_color_picker_button.clicked.connect(lambda target = self.edit_color_picker_button: self._pick_color(target))
-        self.edit_color_picker_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.edit_color_picker_button.customContextMenuRequested.connect(self._color_right_click_menu)
-        self.item_layout.addWidget(self.edit_color_picker_button)
-
-        #    Frame block
-        edit_frame_block = QtWidgets.QLineEdit(self.frame)
-        edit_frame_block.setMinimumWidth(30)
-        edit_frame_block.setMaximumWidth(30)
-        self.item_layout.addWidget(edit_frame_block)
-
-        #    Text block
-        edit_text_block = QtWidgets.QLineEdit(self.text)
-        edit_text_block.setMinimumWidth(120)
-        edit_text_block.setMaximumWidth(180)
-        self.item_layout.addWidget(edit_text_block)
-        
-        def _apply_edits():
-            logger.debug('Applying edits!')
-
-            #   Gather new info
-            self.text = edit_text_block.text()
-            frame = edit_frame_block.text()
-            if (not frame.lstrip('-').isdigit()):
-                frame = None
-            self.frame = frame
-
-            #   Apply new info
-            self._refresh_properties()
-
-            #   Destroy edit widgets
-            self.edit_color_picker_button.setParent(None)
-            self.edit_color_picker_button.setVisible(False)
-            self.edit_color_picker_button.deleteLater()
-
-            edit_frame_block.setParent(None)
-            edit_frame_block.setVisible(False)
-            edit_frame_block.deleteLater()
-
-            edit_text_block.setParent(None)
-            edit_text_block.setVisible(False)
-            edit_text_block.deleteLater()
-
-            apply_edit_button.setParent(None)
-            apply_edit_button.setVisible(False)
-            apply_edit_button.deleteLater()
-
-            #   Show previous widgets
-            self.check_box.show()
-            self.frame_block.show()
-            self.text_block.show()
-
-        apply_edit_button = QtWidgets.QPushButton(self)
-        apply_edit_button.setText('OK')
-        apply_edit_button.clicked.connect(_apply_edits)
-        self.item_layout.addWidget(apply_edit_button)
+    def _check_sort(self):
+        '''
+        Stops sorting when undo or redo left the items out of order, like undoing the sort itself
+        '''
+        if ((self.checklist_sort.keys) and (not self.checklist_sort.in_order())):
+            logger.info('Checklist is no longer sorted by {}'.format(', '.join(self.checklist_sort.keys)))
+            self.set_sort(())
 
-    def _pick_color(self, target = None):
+    def highlight_frame(self, frame):
         '''
-        Color picker dialog box
+        Highlights the notes at or near frame
         '''
-        color = QtGui.QColorDialog.getColor()
-        self.color = color.name()
-        target.setStyleSheet('QWidget { background-color: %s}' % self.color)
+        if (not self.content):
+            return
 
+        self.list_model.set_highlighted(self.frame_index.near(frame, self.HIGHLIGHT_TOLERANCE))
 
-    def _color_right_click_menu(self, point):
+    def show_row(self, row):
         '''
-        Show right click menu of color picker
+        Scrolls to and selects a row, clearing the filter if it hides the row
         '''
-        menu = QtGui.QMenu()
+        if (self.loader):
+            self.pending_row = row
+            return
 
-        menu_default = menu.addAction('Default')
-        menu.addSeparator()
-        menu_red = menu.addAction('Red')
-        menu_blue = menu.addAction('Blue')
-        menu_green = menu.addAction('Green')
-        menu_yellow = menu.addAction('Yellow')
-
-        palette_dict = {
-            menu_default : 'Default',
-            menu_red : '#733230',
-            menu_blue : '#002D40',
-            menu_green : '#2C594F',
-            menu_yellow : '#998A2F'
-        }
+        self.materialize()
+
+        if (self.list_view.isRowHidden(row)):
+            self.set_filter(ChecklistFilter())
+
+        index = self.list_model.index(row)
+        self.list_view.scrollTo(index, QtWidgets.QAbstractItemView.PositionAtCenter)
+        self.list_view.setCurrentIndex(index)
+
+    def _jump_to_frame(self, frame):
+        '''
+        Jump to frame in Maya Timeline
+        '''
+        import maya.cmds as mc
+
+        if (frame):
+            mc.currentTime(int(frame))
+
+    def _add_item(self, frame = None, text = None, color = None, check = False):
+        '''
+        Adds a checklist item
+        '''
+        #   Check if text and frame are specified
+        if (not frame):
+            frame = self.checklist_frame.text()
+        if (not text):
+            text = self.checklist_text.text()
+
+        if (not color):
+            color = self.color
+
+        self.add_items([ChecklistRecord(frame = frame, text = text, color = color, check = check)])
+
+        #   Reset text
+        self.checklist_frame.setText('')
+        self.checklist_text.setText('')
+
+    def add_items(self, items, color = None):
+        '''
+        Adds checklist items in one insert, so views, filters and indices
+        update once however many items there are
+
+        items are ChecklistRecords or (frame, text) pairs, pairs get color or
+        the color of new items
+        '''
+        if (not color):
+            color = self.color or DEFAULT_COLOR
 
-        action = menu.exec_(self.mapToGlobal(point))
-        self.color = palette_dict.get(action, None)
+        records = []
+        for item in items:
+            if (not isinstance(item, ChecklistRecord)):
+                frame, text = item
+                item = ChecklistRecord(frame = frame, text = text, color = color)
+            records.append(item)
+
+        #   Sorted checklists take new items at their sorted rows
+        with profiling.timed('add', items = len(records)):
+            with self.undo_stack.group('Add'):
+                self.checklist_sort.add(records)
+        profiling.count('items_added', len(records))
+        return records
+
+    def _paste_items(self, text):
+        '''
+        Adds a note per pasted line, lines without a frame get the frame typed in
+        '''
+        frame = self.checklist_frame.text()
+
+        self.add_items([(note_frame or frame, note) for note_frame, note in parse_note_lines(text)])
+
+        self.checklist_frame.setText('')
+        self.checklist_text.setText('')
 
-        self.edit_color_picker_button.setStyleSheet('QWidget { background-color: %s}' % self.color)
+    def _edit_checklist_item(self, row):
+        '''
+        Opens the inline editor on a checklist item
+        '''
+        logger.debug('Edit checklist item!')
+        self.list_view.edit(self.list_model.index(row))
 
+    def _destroy(self, row):
+        '''
+        Delete checklist item
+        '''
+        with profiling.timed('delete'):
+            self.checklist.remove(row)
+        profiling.count('items_deleted')
 
+    def _clear_list(self):
+        '''
+        Clear checklist
+        '''
+        with profiling.timed('clear', items = len(self.checklist)):
+            self.checklist.clear()
 
 
 def main():
-    dialog = MayaChecklistUI()
-    dialog.show()
\ No newline at end of file
+    '''
+    Shows the checklist window, reusing the open one with its tabs
+    '''
+    global DIALOG
+
+    if ((DIALOG is None) or (not Qt.QtCompat.isValid(DIALOG))):
+        DIALOG = MayaChecklistUI()
+
+    DIALOG.show()
+    DIALOG.raise_()
+    DIALOG.activateWindow()
+
+    return DIALOG
\ No newline at end of file
@@ -0,0 +1,170 @@
+'''
+Search @ ui
+
+Search window for the notes of the open checklist tabs and of the checklist
+files in the indexed folders
+
+=========================================================
+@command:
+-----------------------
+dialog = SearchDialog(tab_index, source_name, parent)
+dialog.tab_result_activated.connect(show_record)
+dialog.file_result_activated.connect(open_file_row)
+dialog.show()
+-----------------------
+
+@notes:
+*   The folder index is loaded and refreshed the first time the window
+    is shown, after that only when Refresh is pressed.
+
+=========================================================
+Maya Tanaka
+'''
+import os
+
+from Qt import QtWidgets, QtCore
+
+from mayaChecklist.core.search import FolderSearchIndex
+
+#   Indexed checklist folders, shared by every search window
+FOLDER_INDEX = FolderSearchIndex()
+
+
+class SearchDialog(QtWidgets.QDialog):
+    '''
+    Search the open tabs and indexed folders for a note
+    '''
+
+    WINDOWTITLE = 'Search Checklists'
+
+    #   Results listed per source
+    RESULT_LIMIT = 200
+    #   Milliseconds of no typing before searching
+    DEBOUNCE = 150
+
+    RESULT_ROLE = QtCore.Qt.UserRole + 1
+
+    #   checklist, record
+    tab_result_activated = QtCore.Signal(object, object)
+    #   path, row
+    file_result_activated = QtCore.Signal(str, int)
+
+    def __init__(self, tab_index, source_name, parent = None):
+        '''
+        tab_index is the TrigramIndex of the open tabs, source_name returns
+        the tab name of one of their checklists
+        '''
+        super(SearchDialog, self).__init__(parent)
+
+        self.tab_index = tab_index
+        self.source_name = source_name
+        self.folders_refreshed = False
+
+        self._build_ui()
+
+    def _build_ui(self):
+        self.setWindowTitle(self.WINDOWTITLE)
+        self.setMinimumWidth(420)
+        self.setMinimumHeight(360)
+
+        search_layout = QtWidgets.QVBoxLayout(self)
+
+        self.query_edit = QtWidgets.QLineEdit(self)
+        self.query_edit.setPlaceholderText('Search notes')
+        search_layout.addWidget(self.query_edit)
+
+        self.result_list = QtWidgets.QListWidget(self)
+        self.result_list.itemActivated.connect(self._result_activated)
+        search_layout.addWidget(self.result_list)
+
+        folder_widget = QtWidgets.QWidget(self)
+        folder_layout = QtWidgets.QHBoxLayout(folder_widget)
+        folder_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.folder_label = QtWidgets.QLabel(folder_widget)
+        add_folder_button = QtWidgets.QPushButton('Add Folder', folder_widget)
+        add_folder_button.clicked.connect(self._add_folder)
+        refresh_button = QtWidgets.QPushButton('Refresh', folder_widget)
+        refresh_button.clicked.connect(self._refresh_folders)
+
+        folder_layout.addWidget(self.folder_label)
+        folder_layout.addStretch()
+        folder_layout.addWidget(add_folder_button)
+        folder_layout.addWidget(refresh_button)
+        search_layout.addWidget(folder_widget)
+
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.DEBOUNCE)
+        self.search_timer.timeout.connect(self.search)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.query_edit.returnPressed.connect(self.search)
+
+    def showEvent(self, event):
+        super(SearchDialog, self).showEvent(event)
+
+        if (not self.folders_refreshed):
+            self._refresh_folders()
+
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def _update_folder_label(self):
+        self.folder_label.setText('{} folder(s), {} notes indexed'.format(
+            len(FOLDER_INDEX.directories), len(FOLDER_INDEX)))
+
+    def _add_folder(self):
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, 'Index Folder')
+        if (not directory):
+            return
+
+        FOLDER_INDEX.add_directory(directory)
+        self._refresh_folders()
+
+    def _refresh_folders(self):
+        '''
+        Indexes new and changed checklist files in the indexed folders
+        '''
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            FOLDER_INDEX.refresh()
+        except (IOError, OSError) as error:
+            QtWidgets.QMessageBox.warning(self, self.WINDOWTITLE,
+                'Could not update the search index: {}'.format(error))
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+        self.folders_refreshed = True
+        self._update_folder_label()
+        self.search()
+
+    def search(self):
+        '''
+        Lists the notes matching the query, open tabs first
+        '''
+        self.search_timer.stop()
+        self.result_list.clear()
+
+        query = self.query_edit.text()
+        if (not query.strip()):
+            return
+
+        for checklist, record in self.tab_index.search(query, limit = self.RESULT_LIMIT):
+            item = QtWidgets.QListWidgetItem('{}    [{}]'.format(record.text, self.source_name(checklist)))
+            item.setData(self.RESULT_ROLE, ('tab', checklist, record))
+            self.result_list.addItem(item)
+
+        for path, row, text in FOLDER_INDEX.search(query, limit = self.RESULT_LIMIT):
+            name = FOLDER_INDEX.files[path]['name'] or os.path.basename(path)
+            item = QtWidgets.QListWidgetItem('{}    [{}, {}]'.format(text, name, os.path.basename(path)))
+            item.setToolTip(path)
+            item.setData(self.RESULT_ROLE, ('file', path, row))
+            self.result_list.addItem(item)
+
+    def _result_activated(self, item):
+        kind, source, target = item.data(self.RESULT_ROLE)
+
+        if (kind == 'tab'):
+            self.tab_result_activated.emit(source, target)
+        else:
+            self.file_result_activated.emit(source, target)
@@ -0,0 +1,557 @@
+'''
+Views @ ui
+
+Qt model, delegate and editor used to show a ChecklistModel in a QListView.
+Rows are painted by the delegate, so only the visible rows cost anything
+and there is no widget per checklist item.
+
+=========================================================
+@command:
+-----------------------
+list_model = ChecklistListModel(checklist)
+list_view.setModel(list_model)
+list_view.setItemDelegate(ChecklistItemDelegate(list_view))
+-----------------------
+
+=========================================================
+Maya Tanaka
+'''
+from Qt import QtWidgets, QtCore, QtGui
+
+import mayaChecklist.ui.css as css
+from mayaChecklist.core import checklist as core_checklist
+from mayaChecklist.core.checklist import DEFAULT_COLOR
+from mayaChecklist.core.filters import ChecklistFilter, parse_frames
+
+
+#   Right click color menu entries
+COLOR_PRESETS = (
+    ('Red', '#733230'),
+    ('Blue', '#002D40'),
+    ('Green', '#2C594F'),
+    ('Yellow', '#998A2F')
+    )
+
+#   Row background brushes by color, shared by every row in that color
+BRUSHES = {}
+
+
+def color_right_click_menu(widget, point):
+    '''
+    Shows the preset color menu and returns the picked color, or None
+    '''
+    menu = QtWidgets.QMenu()
+
+    menu_default = menu.addAction('Default')
+    menu.addSeparator()
+
+    palette_dict = {menu_default : DEFAULT_COLOR}
+    for name, color in COLOR_PRESETS:
+        palette_dict[menu.addAction(name)] = color
+
+    action = menu.exec_(widget.mapToGlobal(point))
+    return palette_dict.get(action, None)
+
+
+def set_button_color(button, color):
+    '''
+    Shows the color on a color picker button
+    '''
+    if ((color) and (color != DEFAULT_COLOR)):
+        style = css.button_style(color)
+    else:
+        style = ''
+
+    #   Setting a style sheet polishes the button again, even an identical one
+    if (button.styleSheet() != style):
+        button.setStyleSheet(style)
+
+
+def color_brush(color):
+    '''
+    Returns the brush of a row color, built once per color
+    '''
+    brush = BRUSHES.get(color)
+    if (brush is None):
+        brush = BRUSHES[color] = QtGui.QBrush(QtGui.QColor(color))
+    return brush
+
+
+class ChecklistListModel(QtCore.QAbstractListModel):
+    '''
+    Qt adapter around a headless ChecklistModel
+    '''
+
+    RECORD_ROLE = QtCore.Qt.UserRole + 1
+    HIGHLIGHT_ROLE = QtCore.Qt.UserRole + 2
+
+    def __init__(self, checklist, parent = None):
+        super(ChecklistListModel, self).__init__(parent)
+
+        self.checklist = checklist
+        self.checklist.subscribe(self._checklist_changed)
+
+        #   Records behind the persistent indexes while the layout changes
+        self._layout_records = []
+
+        #   ids of the records at the current time
+        self.highlighted = set()
+
+    def detach(self):
+        '''
+        Stops following the checklist, before the model is thrown away
+        '''
+        self.checklist.unsubscribe(self._checklist_changed)
+
+    def rowCount(self, parent = QtCore.QModelIndex()):
+        if (parent.isValid()):
+            return 0
+        return len(self.checklist)
+
+    def data(self, index, role = QtCore.Qt.DisplayRole):
+        if (not index.isValid()):
+            return None
+
+        record = self.checklist[index.row()]
+
+        if (role == self.RECORD_ROLE):
+            return record
+        elif (role == self.HIGHLIGHT_ROLE):
+            return id(record) in self.highlighted
+        elif (role in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole)):
+            return record.text
+        elif (role == QtCore.Qt.CheckStateRole):
+            return QtCore.Qt.Checked if record.check else QtCore.Qt.Unchecked
+
+        return None
+
+    def setData(self, index, value, role = QtCore.Qt.EditRole):
+        if ((not index.isValid()) or (role != QtCore.Qt.CheckStateRole)):
+            return False
+
+        self.checklist.update(index.row(), check = (value == QtCore.Qt.Checked))
+        return True
+
+    def flags(self, index):
+        if (not index.isValid()):
+            return QtCore.Qt.NoItemFlags
+
+        return (QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable |
+            QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEditable)
+
+    def set_highlighted(self, records):
+        '''
+        Highlights the given records, the views only repaint their visible rows
+        '''
+        highlighted = set(id(record) for record in records)
+        if ((highlighted == self.highlighted) or (not len(self.checklist))):
+            self.highlighted = highlighted
+            return
+
+        self.highlighted = highlighted
+        self.dataChanged.emit(self.index(0), self.index(len(self.checklist) - 1))
+
+    def apply_edits(self, row, frame, text, color):
+        '''
+        Applies the values from the item editor
+        '''
+        self.checklist.update(row, frame = frame, text = text, color = color)
+
+    def _checklist_changed(self, event, first, last):
+        '''
+        Forwards ChecklistModel notifications to the attached views
+        '''
+        root = QtCore.QModelIndex()
+
+        if (event == core_checklist.BEFORE_INSERT):
+            self.beginInsertRows(root, first, last)
+        elif (event == core_checklist.INSERT):
+            self.endInsertRows()
+        elif (event == core_checklist.BEFORE_REMOVE):
+            self.beginRemoveRows(root, first, last)
+        elif (event == core_checklist.REMOVE):
+            self.endRemoveRows()
+        elif (event == core_checklist.CHANGE):
+            self.dataChanged.emit(self.index(first), self.index(last))
+        elif (event == core_checklist.BEFORE_LAYOUT):
+            self.layoutAboutToBeChanged.emit()
+            self._layout_records = [(index, self.checklist[index.row()])
+                for index in self.persistentIndexList()]
+        elif (event == core_checklist.LAYOUT):
+            self._move_persistent_indexes()
+            self.layoutChanged.emit()
+        elif (event == core_checklist.BEFORE_RESET):
+            self.beginResetModel()
+        elif (event == core_checklist.RESET):
+            self.endResetModel()
+
+    def _move_persistent_indexes(self):
+        '''
+        Points selection, hidden rows and open editors at the records' new rows
+        '''
+        if (not self._layout_records):
+            return
+
+        rows = dict((id(record), row) for row, record in enumerate(self.checklist))
+
+        old_indexes = []
+        new_indexes = []
+        for index, record in self._layout_records:
+            old_indexes.append(index)
+            new_indexes.append(self.index(rows[id(record)]))
+
+        self._layout_records = []
+        self.changePersistentIndexList(old_indexes, new_indexes)
+
+
+class ChecklistItemDelegate(QtWidgets.QStyledItemDelegate):
+    '''
+    Paints a checklist row: check box, frame button and text
+    '''
+
+    ROW_HEIGHT = 26
+    MARGIN = 4
+    SPACING = 6
+    CHECK_SIZE = 15
+    FRAME_WIDTH = 60
+    HIGHLIGHT_WIDTH = 3
+
+    frame_clicked = QtCore.Signal(str)
+
+    def __init__(self, parent = None):
+        super(ChecklistItemDelegate, self).__init__(parent)
+
+        #   Highlight rgba: translucent selection brush
+        self._selection_brushes = {}
+
+    def _selection_brush(self, palette):
+        highlight = palette.color(QtGui.QPalette.Highlight)
+        brush = self._selection_brushes.get(highlight.rgba())
+        if (brush is None):
+            color = QtGui.QColor(highlight)
+            color.setAlpha(90)
+            brush = self._selection_brushes[highlight.rgba()] = QtGui.QBrush(color)
+        return brush
+
+    def _rects(self, rect):
+        '''
+        Returns the check box, frame and text rectangles of a row
+        '''
+        check_rect = QtCore.QRect(rect.left() + self.MARGIN,
+            rect.top() + (rect.height() - self.CHECK_SIZE) // 2,
+            self.CHECK_SIZE,
+            self.CHECK_SIZE)
+
+        frame_rect = QtCore.QRect(check_rect.right() + self.SPACING,
+            rect.top() + 2,
+            self.FRAME_WIDTH,
+            rect.height() - 4)
+
+        text_left = frame_rect.right() + self.SPACING
+        text_rect = QtCore.QRect(text_left,
+            rect.top(),
+            max(0, rect.right() - self.MARGIN - text_left),
+            rect.height())
+
+        return check_rect, frame_rect, text_rect
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        record = index.data(ChecklistListModel.RECORD_ROLE)
+        if (record is None):
+            return
+
+        widget = option.widget
+        style = widget.style() if widget else QtWidgets.QApplication.style()
+        check_rect, frame_rect, text_rect = self._rects(option.rect)
+
+        painter.save()
+
+        #   Background
+        if (record.color != DEFAULT_COLOR):
+            painter.fillRect(option.rect, color_brush(record.color))
+        if (option.state & QtWidgets.QStyle.State_Selected):
+            painter.fillRect(option.rect, self._selection_brush(option.palette))
+
+        #   Notes at the current time get a bar down their left edge
+        if (index.data(ChecklistListModel.HIGHLIGHT_ROLE)):
+            painter.fillRect(QtCore.QRect(option.rect.left(), option.rect.top(),
+                    self.HIGHLIGHT_WIDTH, option.rect.height()),
+                option.palette.color(QtGui.QPalette.Highlight))
+
+        #   Check box
+        check_option = QtWidgets.QStyleOptionButton()
+        check_option.rect = check_rect
+        check_option.state = QtWidgets.QStyle.State_Enabled
+        if (record.check):
+            check_option.state |= QtWidgets.QStyle.State_On
+        else:
+            check_option.state |= QtWidgets.QStyle.State_Off
+        style.drawPrimitive(QtWidgets.QStyle.PE_IndicatorCheckBox, check_option, painter, widget)
+
+        #   Frame block, disabled once the item is checked
+        frame_option = QtWidgets.QStyleOptionButton()
+        frame_option.rect = frame_rect
+        frame_option.text = record.frame_label
+        frame_option.state = QtWidgets.QStyle.State_Raised
+        if (not record.check):
+            frame_option.state |= QtWidgets.QStyle.State_Enabled
+        style.drawControl(QtWidgets.QStyle.CE_PushButton, frame_option, painter, widget)
+
+        #   Text block
+        if (record.check):
+            text_color = option.palette.color(QtGui.QPalette.Disabled, QtGui.QPalette.WindowText)
+        else:
+            text_color = option.palette.color(QtGui.QPalette.Active, QtGui.QPalette.WindowText)
+        painter.setPen(text_color)
+        text = option.fontMetrics.elidedText(record.text, QtCore.Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft, text)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        '''
+        Handles clicks on the check box and frame block
+        '''
+        if ((event.type() == QtCore.QEvent.MouseButtonRelease) and
+                (event.button() == QtCore.Qt.LeftButton)):
+
+            record = index.data(ChecklistListModel.RECORD_ROLE)
+            check_rect, frame_rect, text_rect = self._rects(option.rect)
+
+            if (check_rect.contains(event.pos())):
+                check_state = QtCore.Qt.Unchecked if record.check else QtCore.Qt.Checked
+                model.setData(index, check_state, QtCore.Qt.CheckStateRole)
+                return True
+
+            if (frame_rect.contains(event.pos())):
+                if ((record.frame) and (not record.check)):
+                    self.frame_clicked.emit(record.frame)
+                return True
+
+        return super(ChecklistItemDelegate, self).editorEvent(event, model, option, index)
+
+    def createEditor(self, parent, option, index):
+        editor = ChecklistItemEditor(parent)
+        editor.accepted.connect(lambda editor = editor: self._commit_and_close(editor))
+        return editor
+
+    def _commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QtWidgets.QAbstractItemDelegate.NoHint)
+
+    def setEditorData(self, editor, index):
+        record = index.data(ChecklistListModel.RECORD_ROLE)
+        editor.set_values(record.frame_label, record.text, record.color)
+
+    def setModelData(self, editor, model, index):
+        frame, text, color = editor.values()
+        model.apply_edits(index.row(), frame, text, color)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+class NoteLineEdit(QtWidgets.QLineEdit):
+    '''
+    Line edit for new notes, pasting several lines emits lines_pasted
+    instead of joining them into one note
+    '''
+
+    #   Pasted text
+    lines_pasted = QtCore.Signal(str)
+
+    def keyPressEvent(self, event):
+        if (event.matches(QtGui.QKeySequence.Paste)):
+            self.paste_notes()
+            return
+
+        super(NoteLineEdit, self).keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        menu = self.createStandardContextMenu()
+
+        for action in menu.actions():
+            if (action.objectName() == 'edit-paste'):
+                action.triggered.disconnect()
+                action.triggered.connect(self.paste_notes)
+
+        menu.exec_(event.globalPos())
+        menu.deleteLater()
+
+    def paste_notes(self):
+        '''
+        Pastes the clipboard, a block of lines goes to lines_pasted
+        '''
+        text = QtWidgets.QApplication.clipboard().text()
+
+        if (len(text.strip().splitlines()) > 1):
+            self.lines_pasted.emit(text)
+        else:
+            self.paste()
+
+
+class ChecklistItemEditor(QtWidgets.QWidget):
+    '''
+    Inline editor for a checklist row
+    '''
+
+    accepted = QtCore.Signal()
+
+    def __init__(self, parent = None):
+        super(ChecklistItemEditor, self).__init__(parent)
+
+        self.color = DEFAULT_COLOR
+        self.setAutoFillBackground(True)
+
+        editor_layout = QtWidgets.QHBoxLayout(self)
+        editor_layout.setContentsMargins(2, 0, 2, 0)
+
+        #   Color button
+        self.color_picker_button = QtWidgets.QPushButton(self)
+        self.color_picker_button.setMaximumWidth(30)
+        self.color_picker_button.clicked.connect(self._pick_color)
+        self.color_picker_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.color_picker_button.customContextMenuRequested.connect(self._color_right_click_menu)
+        editor_layout.addWidget(self.color_picker_button)
+
+        #    Frame block
+        self.frame_edit = QtWidgets.QLineEdit(self)
+        self.frame_edit.setMaximumWidth(70)
+        self.frame_edit.setToolTip('Frame or frame range, e.g. 1012-1040')
+        editor_layout.addWidget(self.frame_edit)
+
+        #    Text block
+        self.text_edit = QtWidgets.QLineEdit(self)
+        self.text_edit.returnPressed.connect(self.accepted.emit)
+        editor_layout.addWidget(self.text_edit)
+
+        apply_edit_button = QtWidgets.QPushButton(self)
+        apply_edit_button.setText('OK')
+        apply_edit_button.clicked.connect(self.accepted.emit)
+        editor_layout.addWidget(apply_edit_button)
+
+    def set_values(self, frame, text, color):
+        self.frame_edit.setText(frame or '')
+        self.text_edit.setText(text)
+        self._set_color(color)
+
+    def values(self):
+        return self.frame_edit.text(), self.text_edit.text(), self.color
+
+    def _set_color(self, color):
+        self.color = color or DEFAULT_COLOR
+        set_button_color(self.color_picker_button, self.color)
+
+    def _pick_color(self):
+        '''
+        Color picker dialog box
+        '''
+        color = QtWidgets.QColorDialog.getColor()
+        if (color.isValid()):
+            self._set_color(color.name())
+
+    def _color_right_click_menu(self, point):
+        '''
+        Show right click menu of color picker
+        '''
+        color = color_right_click_menu(self.color_picker_button, point)
+        if (color):
+            self._set_color(color)
+
+
+class ChecklistFilterBar(QtWidgets.QWidget):
+    '''
+    Text, color, check state and frame range filter for a checklist tab
+    '''
+
+    #   Milliseconds of no typing before the filter is applied
+    DEBOUNCE = 200
+
+    filter_changed = QtCore.Signal(object)
+
+    def __init__(self, parent = None):
+        super(ChecklistFilterBar, self).__init__(parent)
+
+        filter_layout = QtWidgets.QHBoxLayout(self)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.color_combo = QtWidgets.QComboBox(self)
+        self.color_combo.addItem('Any Color', None)
+        self.color_combo.addItem(DEFAULT_COLOR, DEFAULT_COLOR)
+        for name, color in COLOR_PRESETS:
+            self.color_combo.addItem(name, color)
+        self.color_combo.currentIndexChanged.connect(self._emit_filter)
+        filter_layout.addWidget(self.color_combo)
+
+        self.check_combo = QtWidgets.QComboBox(self)
+        self.check_combo.addItem('All', None)
+        self.check_combo.addItem('Unchecked', False)
+        self.check_combo.addItem('Checked', True)
+        self.check_combo.currentIndexChanged.connect(self._emit_filter)
+        filter_layout.addWidget(self.check_combo)
+
+        self.frame_edit = QtWidgets.QLineEdit(self)
+        self.frame_edit.setMaximumWidth(70)
+        self.frame_edit.setPlaceholderText('Frames')
+        self.frame_edit.setToolTip('Show notes on or overlapping a frame or frame range, e.g. 1001-1100')
+        filter_layout.addWidget(self.frame_edit)
+
+        self.text_edit = QtWidgets.QLineEdit(self)
+        self.text_edit.setPlaceholderText('Filter')
+        filter_layout.addWidget(self.text_edit)
+
+        #   Typing restarts the timer, so a filter is only compiled once typing stops
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE)
+        self.debounce_timer.timeout.connect(self._emit_filter)
+        self.text_edit.textChanged.connect(self.debounce_timer.start)
+        self.frame_edit.textChanged.connect(self.debounce_timer.start)
+
+    def checklist_filter(self):
+        '''
+        Returns the ChecklistFilter for the current settings
+        '''
+        colors = self.color_combo.itemData(self.color_combo.currentIndex())
+
+        try:
+            frames = parse_frames(self.frame_edit.text().strip())
+        except ValueError:
+            #   Not a frame range (yet), filter as if it was empty
+            frames = None
+
+        return ChecklistFilter(text = self.text_edit.text(),
+            colors = [colors] if colors else None,
+            check = self.check_combo.itemData(self.check_combo.currentIndex()),
+            frames = frames)
+
+    def set_filter(self, checklist_filter):
+        '''
+        Shows the settings of a filter without emitting filter_changed
+        '''
+        widgets = (self.text_edit, self.frame_edit, self.color_combo, self.check_combo)
+        for widget in widgets:
+            widget.blockSignals(True)
+        try:
+            self.text_edit.setText(checklist_filter.text)
+
+            frames = ''
+            if (checklist_filter.frames):
+                start, end = checklist_filter.frames
+                frames = str(start) if (start == end) else '{}-{}'.format(start, end)
+            self.frame_edit.setText(frames)
+
+            colors = checklist_filter.colors
+            color = list(colors)[0] if (colors and len(colors) == 1) else None
+            self.color_combo.setCurrentIndex(max(0, self.color_combo.findData(color)))
+            self.check_combo.setCurrentIndex(max(0, self.check_combo.findData(checklist_filter.check)))
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
+
+    def _emit_filter(self):
+        self.debounce_timer.stop()
+        self.filter_changed.emit(self.checklist_filter())